@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""Run a JSONL file of queries through the MCP client.
+
+Usage:
+    python batch.py --provider deepseek --input queries.jsonl \
+        --output results.jsonl --concurrency 16 servers.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from dotenv import load_dotenv
+
+from mcp_core.batch import run_batch
+from mcp_core.client import MCPClient
+from mcp_core.providers import PROFILES, create_provider
+from mcp_core.servers import load_server_specs
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--provider",
+        choices=sorted(PROFILES),
+        help="LLM backend (default: LLM_PROVIDER or deepseek)",
+    )
+    parser.add_argument("--input", default="-", help="queries JSONL, '-' for stdin")
+    parser.add_argument("--output", required=True, help="results JSONL")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="append to --output, skipping queries that already succeeded",
+    )
+    parser.add_argument(
+        "server", nargs=argparse.REMAINDER, help="server script [args...] or config"
+    )
+    args = parser.parse_args()
+    if not args.server:
+        parser.error("a server script or servers.json is required")
+    return args
+
+
+async def main():
+    load_dotenv()
+    args = parse_args()
+    client = MCPClient(create_provider(args.provider))
+    try:
+        await client.connect_to_servers(load_server_specs(args.server))
+        summary = await run_batch(
+            client, args.input, args.output, args.concurrency, args.resume
+        )
+        print(json.dumps(summary), file=sys.stderr)
+    finally:
+        await client.cleanup()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
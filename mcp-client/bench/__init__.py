@@ -0,0 +1 @@
+"""Benchmarks for the MCP client against the bundled servers."""
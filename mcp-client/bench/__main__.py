@@ -0,0 +1,72 @@
+"""Benchmark the client against the bundled MCP servers.
+
+Usage:
+    python -m bench --output results.json
+    python -m bench --compare old.json new.json
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+
+from bench.harness import BenchConfig, compare, run_benchmarks
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        prog="python -m bench", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument(
+        "--compare",
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="print the change between two saved reports and exit",
+    )
+    parser.add_argument("--startup-runs", type=int, default=5)
+    parser.add_argument("--calls", type=int, default=200, help="latency samples")
+    parser.add_argument("--throughput-calls", type=int, default=400)
+    parser.add_argument(
+        "--concurrency",
+        default="1,4,16",
+        help="comma-separated in-flight call limits for the throughput runs",
+    )
+    parser.add_argument("--sessions", type=int, default=4, help="for memory")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--llm-latency", type=float, default=0.0)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+    if args.compare:
+        with open(args.compare[0]) as old, open(args.compare[1]) as new:
+            print("\n".join(compare(json.load(old), json.load(new))))
+        return
+
+    config = BenchConfig(
+        startup_runs=args.startup_runs,
+        latency_calls=args.calls,
+        throughput_calls=args.throughput_calls,
+        concurrency=tuple(int(c) for c in args.concurrency.split(",")),
+        memory_sessions=args.sessions,
+        queries=args.queries,
+        llm_latency=args.llm_latency,
+    )
+    report = asyncio.run(run_benchmarks(config))
+    if not report["servers"]:
+        print(
+            "No servers found; build mcp-server/filesystem and install "
+            "mcp-server/weather dependencies first",
+            file=sys.stderr,
+        )
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
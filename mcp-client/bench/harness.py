@@ -0,0 +1,316 @@
+"""Measurements run by ``python -m bench``.
+
+Every measurement drives the real stdio servers from ``mcp-server/``
+through ``mcp_core.servers``, so the numbers include process startup,
+JSON-RPC framing and the client-side pooling layers.
+"""
+
+import asyncio
+import dataclasses
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from openai import AsyncOpenAI
+
+from bench.mock_llm import MockLLM
+from mcp_core.budget import QueryRun
+from mcp_core.client import MCPClient
+from mcp_core.executor import ToolExecutor
+from mcp_core.llm import http_client
+from mcp_core.providers import OpenAIProvider
+from mcp_core.servers import ServerPool, ServerSpec
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SERVERS_DIR = REPO_ROOT / "mcp-server"
+
+
+@dataclass
+class Target:
+    """A server to benchmark and the tool call used to exercise it"""
+
+    spec: ServerSpec
+    tool: str
+    arguments: dict
+
+
+@dataclass
+class BenchConfig:
+    startup_runs: int = 5
+    latency_calls: int = 200
+    throughput_calls: int = 400
+    concurrency: tuple = (1, 4, 16)
+    memory_sessions: int = 4
+    queries: int = 50
+    query_concurrency: int = 8
+    llm_latency: float = 0.0
+
+
+def _installed(server_dir: Path) -> bool:
+    return (server_dir / "node_modules").is_dir()
+
+
+def default_targets(workdir: str) -> list[Target]:
+    """The bundled weather and filesystem servers, where they are installed
+
+    Args:
+        workdir: Directory the filesystem server is allowed to read; a
+            small sample file is created in it
+    """
+    targets = []
+    weather = SERVERS_DIR / "weather" / "build" / "index.js"
+    if not weather.exists():
+        weather = SERVERS_DIR / "weather" / "src" / "index.js"
+    if weather.exists() and _installed(weather.parents[1]):
+        targets.append(
+            Target(
+                ServerSpec("weather", "node", [str(weather)]),
+                "get_weather",
+                {"city": "London"},
+            )
+        )
+
+    filesystem = SERVERS_DIR / "filesystem" / "dist" / "index.js"
+    if filesystem.exists() and _installed(filesystem.parents[1]):
+        sample = Path(workdir) / "sample.txt"
+        sample.write_text("benchmark sample\n" * 256)
+        targets.append(
+            Target(
+                ServerSpec("filesystem", "node", [str(filesystem), workdir]),
+                "read_text_file",
+                {"path": str(sample)},
+            )
+        )
+    return targets
+
+
+def summarize(seconds: list[float]) -> dict:
+    """Latency percentiles in milliseconds"""
+    if not seconds:
+        return {}
+    ordered = sorted(seconds)
+
+    def pick(fraction: float) -> float:
+        return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+    return {
+        "n": len(ordered),
+        "mean_ms": round(1000 * sum(ordered) / len(ordered), 3),
+        "min_ms": round(1000 * ordered[0], 3),
+        "p50_ms": round(1000 * pick(0.5), 3),
+        "p90_ms": round(1000 * pick(0.9), 3),
+        "p99_ms": round(1000 * pick(0.99), 3),
+        "max_ms": round(1000 * ordered[-1], 3),
+    }
+
+
+async def measure_startup(spec: ServerSpec, runs: int) -> dict:
+    """Time from spawning a server to an initialized session with its tools"""
+    spec = dataclasses.replace(spec, pool_size=1)
+    samples = []
+    for _ in range(runs):
+        pool = ServerPool(spec)
+        started = time.perf_counter()
+        try:
+            await pool.start()
+            await pool.tool_catalog.tools()
+            samples.append(time.perf_counter() - started)
+        finally:
+            await pool.close()
+    return summarize(samples)
+
+
+async def measure_latency(pool: ServerPool, target: Target, calls: int) -> dict:
+    """Sequential ``call_tool`` round trips"""
+    await pool.call_tool(target.tool, target.arguments)  # warm up
+    samples = []
+    for _ in range(calls):
+        started = time.perf_counter()
+        await pool.call_tool(target.tool, target.arguments)
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+async def measure_throughput(
+    pool: ServerPool, target: Target, calls: int, levels: tuple
+) -> dict:
+    """Completed calls per second with up to N calls in flight"""
+    results = {}
+    for level in levels:
+        executor = ToolExecutor(pool, level)
+        started = time.perf_counter()
+        outcomes = await executor.run([(target.tool, target.arguments)] * calls)
+        elapsed = time.perf_counter() - started
+        errors = sum(isinstance(o, BaseException) for o in outcomes)
+        results[str(level)] = {
+            "calls_per_s": round(calls / elapsed, 1),
+            "errors": errors,
+        }
+    return results
+
+
+def _children() -> set[int]:
+    """PIDs of this process's direct children (Linux only)"""
+    pids = set()
+    me = os.getpid()
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text()
+        except OSError:
+            continue
+        # The command name may contain spaces, so split after its ")"
+        if int(stat.rsplit(")", 1)[1].split()[1]) == me:
+            pids.add(int(entry.name))
+    return pids
+
+
+def _rss_kib(pid: int) -> int:
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+async def measure_memory(spec: ServerSpec, sessions: int) -> Optional[dict]:
+    """Resident memory of the server subprocesses behind a pool"""
+    if not Path("/proc/self/status").exists():
+        return None
+    before = _children()
+    pool = ServerPool(dataclasses.replace(spec, pool_size=sessions))
+    try:
+        await pool.start()
+        spawned = _children() - before
+        total = sum(_rss_kib(pid) for pid in spawned)
+    finally:
+        await pool.close()
+    return {
+        "sessions": sessions,
+        "processes": len(spawned),
+        "rss_total_mib": round(total / 1024, 1),
+        "rss_per_session_mib": round(total / 1024 / max(1, sessions), 1),
+    }
+
+
+async def bench_server(target: Target, config: BenchConfig) -> dict:
+    spec = dataclasses.replace(target.spec, concurrency=max(config.concurrency))
+    result = {
+        "tool": target.tool,
+        "startup": await measure_startup(spec, config.startup_runs),
+        "memory": await measure_memory(spec, config.memory_sessions),
+    }
+    pool = ServerPool(dataclasses.replace(spec, pool_size=1))
+    await pool.start()
+    try:
+        result["call_latency"] = await measure_latency(
+            pool, target, config.latency_calls
+        )
+        result["throughput"] = await measure_throughput(
+            pool, target, config.throughput_calls, config.concurrency
+        )
+    finally:
+        await pool.close()
+    return result
+
+
+async def bench_queries(targets: list[Target], config: BenchConfig) -> dict:
+    """End-to-end ``process_query`` latency against the scripted mock LLM"""
+    weather = [t for t in targets if t.spec.name == "weather"]
+    if not weather:
+        return {}
+    mock = MockLLM(ttft=config.llm_latency)
+    await mock.start()
+    llm = AsyncOpenAI(
+        base_url=mock.base_url,
+        api_key="mock",
+        max_retries=0,
+        http_client=http_client("BENCH"),
+    )
+    client = MCPClient(OpenAIProvider("BENCH", "mock", client=llm), debug=False)
+    try:
+        await client.connect_to_servers([weather[0].spec])
+        semaphore = asyncio.Semaphore(config.query_concurrency)
+        samples = []
+
+        async def one(i: int):
+            async with semaphore:
+                started = time.perf_counter()
+                await client.process_query(f"weather {i}", run=QueryRun())
+                samples.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(i) for i in range(config.queries)))
+        elapsed = time.perf_counter() - started
+    finally:
+        await client.cleanup()
+        await mock.close()
+    return {
+        "llm_latency_s": config.llm_latency,
+        "concurrency": config.query_concurrency,
+        "latency": summarize(samples),
+        "queries_per_s": round(config.queries / elapsed, 1),
+        "llm_requests": mock.requests,
+    }
+
+
+def revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+async def run_benchmarks(
+    config: BenchConfig, targets: Optional[list[Target]] = None
+) -> dict:
+    """Run every measurement and return a JSON-serializable report"""
+    with tempfile.TemporaryDirectory() as workdir:
+        targets = default_targets(workdir) if targets is None else targets
+        report = {
+            "revision": revision(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+            "config": dataclasses.asdict(config),
+            "servers": {},
+        }
+        for target in targets:
+            print(f"benchmarking {target.spec.name} ...", file=sys.stderr)
+            report["servers"][target.spec.name] = await bench_server(target, config)
+        report["queries"] = await bench_queries(targets, config)
+    return report
+
+
+def compare(old: dict, new: dict, prefix: str = "") -> list[str]:
+    """Lines describing how every shared numeric metric changed"""
+    lines = []
+    for key in sorted(set(old) & set(new)):
+        path = f"{prefix}{key}"
+        a, b = old[key], new[key]
+        if isinstance(a, dict) and isinstance(b, dict):
+            lines.extend(compare(a, b, path + "."))
+        elif (
+            isinstance(a, (int, float))
+            and isinstance(b, (int, float))
+            and not isinstance(a, bool)
+            and not path.startswith("config.")
+        ):
+            change = f"{100 * (b - a) / a:+.1f}%" if a else "n/a"
+            lines.append(f"{path}: {a} -> {b} ({change})")
+    return lines
@@ -0,0 +1,512 @@
+"""A local stand-in for the LLM APIs, for offline load tests and profiling.
+
+It speaks both protocols the providers use, with and without streaming:
+
+- OpenAI Chat Completions: ``POST /v1/chat/completions``
+- Anthropic Messages: ``POST /v1/messages``
+
+Point a provider at it with e.g. ``DEEPSEEK_BASE_URL=http://127.0.0.1:8900/v1``
+or ``CLAUDE_BASE_URL=http://127.0.0.1:8900``, or run it standalone:
+
+    python -m bench.mock_llm --port 8900 --script patterns.json \\
+        --ttft lognormal:-1.6,0.4 --token-delay uniform:0.005,0.02
+
+Replies follow a script: a list of steps, one per model call. A step is
+``{"tool_calls": [{"name": ..., "arguments": {...}}]}``, ``{"content": "..."}``
+or ``{"error": {"status": 529, "message": "..."}}`` (to exercise retries).
+The step for a request is picked from the number of assistant messages
+since the user's question, so concurrent queries replay the script
+independently without any server-side state. A script file may also hold
+several patterns, chosen by a substring of the question::
+
+    {"patterns": [
+        {"match": "weather", "steps": [...]},
+        {"steps": [...]}
+    ]}
+
+Latencies are drawn per request (time to first token) and per streamed
+chunk (token delay) from ``fixed:S``, ``uniform:LO,HI``, ``normal:MEAN,SD``,
+``lognormal:MU,SIGMA`` or ``exponential:MEAN``, all in seconds.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import re
+import time
+from dataclasses import dataclass
+from typing import Optional, Union
+
+DEFAULT_SCRIPT = [
+    {"tool_calls": [{"name": "get_weather", "arguments": {"city": "London"}}]},
+    {"content": "It is cloudy in London."},
+]
+
+
+@dataclass
+class Latency:
+    """A delay distribution in seconds"""
+
+    kind: str = "fixed"
+    a: float = 0.0
+    b: float = 0.0
+
+    @classmethod
+    def parse(cls, spec: Union[str, float, None]) -> "Latency":
+        """Parse ``kind:a[,b]``; a bare number means a fixed delay"""
+        if spec is None:
+            return cls()
+        if isinstance(spec, (int, float)):
+            return cls("fixed", float(spec))
+        kind, _, args = spec.partition(":")
+        if not args:
+            return cls("fixed", float(kind))
+        values = [float(v) for v in args.split(",")]
+        if kind not in ("fixed", "uniform", "normal", "lognormal", "exponential"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        return cls(kind, values[0], values[1] if len(values) > 1 else 0.0)
+
+    def sample(self) -> float:
+        if self.kind == "uniform":
+            value = random.uniform(self.a, self.b)
+        elif self.kind == "normal":
+            value = random.gauss(self.a, self.b)
+        elif self.kind == "lognormal":
+            value = random.lognormvariate(self.a, self.b)
+        elif self.kind == "exponential":
+            value = random.expovariate(1 / self.a) if self.a > 0 else 0.0
+        else:
+            value = self.a
+        return max(0.0, value)
+
+
+def load_script(path: str) -> list[dict]:
+    """Read a script file: a list of steps or ``{"patterns": [...]}``"""
+    with open(path) as f:
+        script = json.load(f)
+    if isinstance(script, list):
+        return [{"steps": script}]
+    return script["patterns"]
+
+
+def _is_question(message: dict) -> bool:
+    """A user message that is not just tool results"""
+    if message.get("role") != "user":
+        return False
+    content = message.get("content")
+    if isinstance(content, str):
+        return True
+    return not any(
+        isinstance(block, dict) and block.get("type") == "tool_result"
+        for block in content or []
+    )
+
+
+def _text(content) -> str:
+    if isinstance(content, str):
+        return content
+    return " ".join(
+        block.get("text", "") for block in content or [] if isinstance(block, dict)
+    )
+
+
+def script_step(script: list[dict], messages: list[dict]) -> dict:
+    """The step of the script that answers this conversation
+
+    Args:
+        script: Steps, or patterns of ``{"match": ..., "steps": [...]}``
+        messages: The request's conversation, in either protocol
+    """
+    question = ""
+    step = 0
+    for message in messages:
+        if _is_question(message):
+            question = _text(message.get("content"))
+            step = 0
+        elif message.get("role") == "assistant":
+            step += 1
+
+    steps = script
+    if script and "steps" in script[0]:
+        steps = next(
+            (p["steps"] for p in script if p.get("match", "") in question),
+            script[-1]["steps"],
+        )
+    return steps[min(step, len(steps) - 1)]
+
+
+def _chunks(text: str) -> list[str]:
+    """Split text roughly into tokens, keeping the whitespace"""
+    return re.findall(r"\S+\s*|\s+", text or "")
+
+
+def _estimate_tokens(value) -> int:
+    return max(1, len(json.dumps(value)) // 4)
+
+
+class MockLLM:
+    """Serves scripted replies in the OpenAI and Anthropic protocols"""
+
+    def __init__(
+        self,
+        script: Optional[list[dict]] = None,
+        ttft: Union[str, float, Latency, None] = None,
+        token_delay: Union[str, float, Latency, None] = None,
+    ):
+        """
+        Args:
+            script: Steps or patterns, see the module docstring
+            ttft: Delay before the first byte of each reply
+            token_delay: Delay between streamed chunks
+        """
+        self.script = script or DEFAULT_SCRIPT
+        self.ttft = ttft if isinstance(ttft, Latency) else Latency.parse(ttft)
+        self.token_delay = (
+            token_delay
+            if isinstance(token_delay, Latency)
+            else Latency.parse(token_delay)
+        )
+        self.requests = 0
+        self.by_protocol = {"openai": 0, "anthropic": 0}
+        self.port: Optional[int] = None
+        self._ids = itertools.count(1)
+        self._server: Optional[asyncio.AbstractServer] = None
+
+    @property
+    def base_url(self) -> str:
+        """Base URL for OpenAI-compatible clients"""
+        return f"http://127.0.0.1:{self.port}/v1"
+
+    @property
+    def anthropic_base_url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self, port: int = 0, host: str = "127.0.0.1"):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = (await reader.readline()).decode("latin-1").strip()
+                    if not line:
+                        break
+                    key, _, value = line.partition(":")
+                    headers[key.lower()] = value.strip()
+                body = await reader.readexactly(int(headers.get("content-length", 0)))
+                path = request_line.decode("latin-1").split()[1].split("?")[0]
+                await self._dispatch(writer, path, body)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, writer, path: str, body: bytes):
+        if path.endswith("/chat/completions"):
+            protocol = "openai"
+        elif path.endswith("/messages"):
+            protocol = "anthropic"
+        else:
+            await self._send_json(writer, 404, {"error": {"message": f"no route {path}"}})
+            return
+
+        self.requests += 1
+        self.by_protocol[protocol] += 1
+        request = json.loads(body)
+        step = script_step(self.script, request.get("messages", []))
+        await asyncio.sleep(self.ttft.sample())
+
+        if "error" in step:
+            error = step["error"]
+            await self._send_json(
+                writer,
+                error.get("status", 500),
+                {
+                    "type": "error",
+                    "error": {
+                        "type": error.get("type", "api_error"),
+                        "message": error.get("message", "mock error"),
+                    },
+                },
+            )
+            return
+
+        prompt_tokens = _estimate_tokens(request.get("messages", []))
+        model = request.get("model", "mock")
+        if protocol == "openai":
+            if request.get("tool_choice") == "none":
+                step = {"content": step.get("content") or "Done."}
+            if request.get("stream"):
+                await self._stream(writer, self._openai_events(step, model, prompt_tokens))
+            else:
+                await self._send_json(
+                    writer, 200, self._openai_completion(step, model, prompt_tokens)
+                )
+        else:
+            if (request.get("tool_choice") or {}).get("type") == "none":
+                step = {"content": step.get("content") or "Done."}
+            if request.get("stream"):
+                await self._stream(
+                    writer, self._anthropic_events(step, model, prompt_tokens)
+                )
+            else:
+                await self._send_json(
+                    writer, 200, self._anthropic_message(step, model, prompt_tokens)
+                )
+
+    async def _send_json(self, writer, status: int, payload: dict):
+        data = json.dumps(payload).encode()
+        writer.write(
+            f"HTTP/1.1 {status} {'OK' if status == 200 else 'Error'}\r\n"
+            "Content-Type: application/json\r\n"
+            f"Content-Length: {len(data)}\r\n\r\n".encode()
+            + data
+        )
+        await writer.drain()
+
+    async def _stream(self, writer, events):
+        """Send server-sent events with chunked transfer encoding"""
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Transfer-Encoding: chunked\r\n\r\n"
+        )
+        first = True
+        for event, data, delay in events:
+            if delay and not first:
+                await asyncio.sleep(self.token_delay.sample())
+            first = False
+            payload = data if isinstance(data, str) else json.dumps(data)
+            frame = (f"event: {event}\n" if event else "") + f"data: {payload}\n\n"
+            encoded = frame.encode()
+            writer.write(f"{len(encoded):x}\r\n".encode() + encoded + b"\r\n")
+            await writer.drain()
+        writer.write(b"0\r\n\r\n")
+        await writer.drain()
+
+    def _tool_calls(self, step: dict, prefix: str) -> list[tuple[str, dict]]:
+        return [
+            (f"{prefix}{next(self._ids)}", call) for call in step.get("tool_calls", [])
+        ]
+
+    # OpenAI Chat Completions
+
+    def _openai_completion(self, step: dict, model: str, prompt_tokens: int) -> dict:
+        message = {"role": "assistant", "content": step.get("content")}
+        calls = self._tool_calls(step, "call_")
+        if calls:
+            message["tool_calls"] = [
+                {
+                    "id": id,
+                    "type": "function",
+                    "function": {
+                        "name": call["name"],
+                        "arguments": json.dumps(call.get("arguments", {})),
+                    },
+                }
+                for id, call in calls
+            ]
+        completion_tokens = _estimate_tokens(message)
+        return {
+            "id": f"chatcmpl-{next(self._ids)}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [
+                {
+                    "index": 0,
+                    "message": message,
+                    "finish_reason": "tool_calls" if calls else "stop",
+                }
+            ],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }
+
+    def _openai_events(self, step: dict, model: str, prompt_tokens: int):
+        """Yield ``(event, data, delayed)`` for a streamed completion"""
+        base = {
+            "id": f"chatcmpl-{next(self._ids)}",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+        }
+
+        def chunk(delta: dict, finish_reason=None) -> dict:
+            return {
+                **base,
+                "choices": [
+                    {"index": 0, "delta": delta, "finish_reason": finish_reason}
+                ],
+            }
+
+        yield None, chunk({"role": "assistant", "content": ""}), False
+        completion_tokens = 0
+        for piece in _chunks(step.get("content")):
+            completion_tokens += 1
+            yield None, chunk({"content": piece}), True
+        calls = self._tool_calls(step, "call_")
+        for index, (id, call) in enumerate(calls):
+            arguments = json.dumps(call.get("arguments", {}))
+            yield None, chunk(
+                {
+                    "tool_calls": [
+                        {
+                            "index": index,
+                            "id": id,
+                            "type": "function",
+                            "function": {"name": call["name"], "arguments": ""},
+                        }
+                    ]
+                }
+            ), True
+            for piece in _chunks(arguments):
+                completion_tokens += 1
+                yield None, chunk(
+                    {"tool_calls": [{"index": index, "function": {"arguments": piece}}]}
+                ), True
+        yield None, chunk({}, "tool_calls" if calls else "stop"), False
+        yield None, {
+            **base,
+            "choices": [],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        }, False
+        yield None, "[DONE]", False
+
+    # Anthropic Messages
+
+    def _anthropic_blocks(self, step: dict) -> list[dict]:
+        blocks = []
+        if step.get("content"):
+            blocks.append({"type": "text", "text": step["content"]})
+        for id, call in self._tool_calls(step, "toolu_mock_"):
+            blocks.append(
+                {
+                    "type": "tool_use",
+                    "id": id,
+                    "name": call["name"],
+                    "input": call.get("arguments", {}),
+                }
+            )
+        return blocks
+
+    def _anthropic_message(self, step: dict, model: str, prompt_tokens: int) -> dict:
+        blocks = self._anthropic_blocks(step)
+        return {
+            "id": f"msg_mock_{next(self._ids)}",
+            "type": "message",
+            "role": "assistant",
+            "model": model,
+            "content": blocks,
+            "stop_reason": "tool_use"
+            if any(b["type"] == "tool_use" for b in blocks)
+            else "end_turn",
+            "stop_sequence": None,
+            "usage": {
+                "input_tokens": prompt_tokens,
+                "output_tokens": _estimate_tokens(blocks),
+            },
+        }
+
+    def _anthropic_events(self, step: dict, model: str, prompt_tokens: int):
+        """Yield ``(event, data, delayed)`` for a streamed message"""
+        message = self._anthropic_message(step, model, prompt_tokens)
+        blocks = message["content"]
+        yield "message_start", {
+            "type": "message_start",
+            "message": {
+                **message,
+                "content": [],
+                "stop_reason": None,
+                "usage": {"input_tokens": prompt_tokens, "output_tokens": 1},
+            },
+        }, False
+        for index, block in enumerate(blocks):
+            if block["type"] == "text":
+                start = {"type": "text", "text": ""}
+                pieces = [
+                    {"type": "text_delta", "text": piece}
+                    for piece in _chunks(block["text"])
+                ]
+            else:
+                start = {**block, "input": {}}
+                pieces = [
+                    {"type": "input_json_delta", "partial_json": piece}
+                    for piece in _chunks(json.dumps(block["input"]))
+                ]
+            yield "content_block_start", {
+                "type": "content_block_start",
+                "index": index,
+                "content_block": start,
+            }, True
+            for delta in pieces:
+                yield "content_block_delta", {
+                    "type": "content_block_delta",
+                    "index": index,
+                    "delta": delta,
+                }, True
+            yield "content_block_stop", {
+                "type": "content_block_stop",
+                "index": index,
+            }, False
+        yield "message_delta", {
+            "type": "message_delta",
+            "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+            "usage": {"output_tokens": message["usage"]["output_tokens"]},
+        }, False
+        yield "message_stop", {"type": "message_stop"}, False
+
+
+async def serve(args):
+    mock = MockLLM(
+        load_script(args.script) if args.script else None,
+        ttft=args.ttft,
+        token_delay=args.token_delay,
+    )
+    await mock.start(args.port, args.host)
+    print(f"OpenAI-compatible base URL: {mock.base_url}")
+    print(f"Anthropic base URL:         {mock.anthropic_base_url}", flush=True)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await mock.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        prog="python -m bench.mock_llm", description=__doc__.splitlines()[0]
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--script", help="JSON steps or patterns file")
+    parser.add_argument("--ttft", default="0", help="time to first token")
+    parser.add_argument("--token-delay", default="0", help="delay per chunk")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
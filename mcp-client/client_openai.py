@@ -1,192 +1,21 @@
 import asyncio
-import json
-from typing import Optional
-from contextlib import AsyncExitStack
+import sys
 
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from openai import OpenAI
+from mcp_core.client import MCPClient, run_chat
+from mcp_core.providers import create_provider
 from dotenv import load_dotenv
-import os
 
 load_dotenv()  # load environment variables from .env
 
 
-class MCPClient:
-    def __init__(self):
-        # Initialize session and client objects
-        self.session: Optional[ClientSession] = None
-        self.exit_stack = AsyncExitStack()
-        self.client = OpenAI(
-            base_url=os.getenv("DEEPSEEK_BASE_URL"),
-            api_key=os.getenv("DEEPSEEK_API_KEY"),
-        )
-
-    async def connect_to_server(self, server_script_path: str):
-        """Connect to an MCP server
-
-        Args:
-            server_script_path: Path to the server script (.py or .js)
-        """
-        is_python = server_script_path.endswith(".py")
-        is_js = server_script_path.endswith(".js")
-        if not (is_python or is_js):
-            raise ValueError("Server script must be a .py or .js file")
-
-        command = "python" if is_python else "node"
-        server_params = StdioServerParameters(
-            command=command, args=[server_script_path], env=None
-        )
-
-        stdio_transport = await self.exit_stack.enter_async_context(
-            stdio_client(server_params)
-        )
-        self.stdio, self.write = stdio_transport
-        self.session = await self.exit_stack.enter_async_context(
-            ClientSession(self.stdio, self.write)
-        )
-
-        await self.session.initialize()
-
-        # List available tools
-        response = await self.session.list_tools()
-        tools = response.tools
-        print("\nConnected to server with tools:", [tool.name for tool in tools])
-
-    async def process_query(self, query: str) -> str:
-        """Process a query using DeepSeek and available tools"""
-        messages = [{"role": "user", "content": query}]
-
-        response = await self.session.list_tools()
-        # Convert MCP tools to OpenAI tools format
-        available_tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": tool.name,
-                    "description": tool.description or f"Tool for {tool.name}",
-                    "parameters": tool.inputSchema,
-                }
-            }
-            for tool in response.tools
-        ]
-
-        # Initial DeepSeek API call
-        response = self.client.chat.completions.create(
-            model=os.getenv("DEEPSEEK_MODEL", "deepseek-chat"),
-            max_tokens=int(os.getenv("MAX_TOKENS", "1000")),
-            messages=messages,
-            tools=available_tools,
-        )
-
-        # Process response and handle tool calls
-        tool_results = []
-        final_text = []
-        
-        message = response.choices[0].message
-        
-        # If the model made tool calls, we must include the assistant message with tool_calls
-        if getattr(message, "tool_calls", None):
-            # Add assistant message capturing tool_calls (content may be empty)
-            assistant_msg = {
-                "role": "assistant",
-                "content": message.content or "",
-                "tool_calls": [
-                    {
-                        "id": tc.id,
-                        "type": "function",
-                        "function": {
-                            "name": tc.function.name,
-                            "arguments": tc.function.arguments,
-                        },
-                    }
-                    for tc in message.tool_calls
-                ],
-            }
-            messages.append(assistant_msg)
-
-            # Execute each tool call and append tool messages
-            for tc in message.tool_calls:
-                tool_name = tc.function.name
-                tool_args = json.loads(tc.function.arguments)
-                final_text.append(f"[Calling tool {tool_name} with args {tool_args}]")
-
-                result = await self.session.call_tool(tool_name, tool_args)
-                tool_results.append({"call": tool_name, "result": result})
-
-                # Normalize MCP result content to text
-                result_text = ""
-                if getattr(result, "content", None):
-                    parts = []
-                    for p in result.content:
-                        if getattr(p, "type", None) == "text":
-                            parts.append(p.text)
-                        else:
-                            parts.append(str(p))
-                    result_text = "\n".join(parts)
-                else:
-                    result_text = str(result)
-
-                messages.append({
-                    "role": "tool",
-                    "tool_call_id": tc.id,
-                    "content": result_text,
-                })
-
-            # Follow-up completion including tool results
-            follow = self.client.chat.completions.create(
-                model=os.getenv("DEEPSEEK_MODEL", "deepseek-chat"),
-                max_tokens=int(os.getenv("MAX_TOKENS", "1000")),
-                messages=messages,
-            )
-            follow_msg = follow.choices[0].message
-            if follow_msg.content:
-                final_text.append(follow_msg.content)
-        else:
-            # No tool calls: just add assistant content
-            if message.content:
-                final_text.append(message.content)
-                messages.append({"role": "assistant", "content": message.content})
-
-        return "\n".join(final_text)
-
-    async def chat_loop(self):
-        """Run an interactive chat loop"""
-        print("\nMCP Client Started !!!")
-        print("Type your queries or 'quit' to exit.")
-
-        while True:
-            try:
-                query = input("\nQuery: ").strip()
-
-                if query.lower() == "quit":
-                    break
-
-                response = await self.process_query(query)
-                print("\n" + response)
-
-            except Exception as e:
-                print(f"\nError: {str(e)}")
-
-    async def cleanup(self):
-        """Clean up resources"""
-        await self.exit_stack.aclose()
-
-
 async def main():
-    if len(sys.argv) < 2:
-        print("Usage: python client.py <path_to_server_script>")
-        sys.exit(1)
-
-    client = MCPClient()
-    try:
-        await client.connect_to_server(sys.argv[1])
-        await client.chat_loop()
-    finally:
-        await client.cleanup()
+    client = MCPClient(create_provider("deepseek"))
+    await run_chat(
+        client,
+        sys.argv[1:],
+        "Usage: python client_openai.py <path_to_server_script | servers.json>",
+    )
 
 
 if __name__ == "__main__":
-    import sys
-
     asyncio.run(main())
@@ -0,0 +1,30 @@
+"""Chat with any configured provider: python -m mcp_core [--provider NAME] <server...>"""
+
+import argparse
+import asyncio
+
+from dotenv import load_dotenv
+
+from mcp_core.client import MCPClient, run_chat
+from mcp_core.providers import PROFILES, create_provider
+
+
+async def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(prog="python -m mcp_core")
+    parser.add_argument(
+        "--provider",
+        choices=sorted(PROFILES),
+        help="LLM backend (default: LLM_PROVIDER or deepseek)",
+    )
+    parser.add_argument(
+        "server", nargs=argparse.REMAINDER, help="server script [args...] or config"
+    )
+    args = parser.parse_args()
+    await run_chat(
+        MCPClient(create_provider(args.provider)), args.server, parser.format_usage()
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
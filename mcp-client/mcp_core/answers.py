@@ -0,0 +1,366 @@
+"""Answers to repeated questions, kept on disk across restarts.
+
+Users ask the same questions again ("what's the weather in Tokyo", "list
+the project root"), and each one costs model calls plus tool calls. With
+``ANSWER_CACHE=1`` the final answer of a query is stored in a SQLite file
+(``ANSWER_CACHE_PATH``, default ``~/.cache/mcp-client/answers.sqlite3``)
+and a repeat is answered from it. The key covers:
+
+- the query text, lowercased with whitespace collapsed and trailing
+  punctuation dropped
+- the provider prefix and model
+- a fingerprint of the tool catalog (names, descriptions and schemas)
+- the earlier turns of the conversation, so follow-ups only match in the
+  same context
+
+Only answers built from read-only tools (``IDEMPOTENT_TOOLS`` plus
+``TOOL_IDEMPOTENT``) without tool errors are stored. Each entry remembers
+the paths those tools read, with their size and modification time, and a
+lookup whose files changed since is a miss. For tools that walk a
+directory (``directory_tree``, ``search_files``) every entry below the
+path counts. Mutating tools called through the client drop the entries
+whose paths overlap theirs.
+
+Entries expire after ``ANSWER_CACHE_TTL`` seconds (default 3600; ``0``
+means never). ``ANSWER_CACHE_TTL_<TOOL>`` shortens it for answers that used
+that tool, e.g. ``ANSWER_CACHE_TTL_GET_WEATHER=600``; ``0`` there keeps
+such answers out of the cache. Past ``ANSWER_CACHE_MAX_BYTES``
+(default 64 MiB) the least recently used entries are evicted.
+
+Lookups, stores and invalidations stat files and query SQLite, so the
+client runs them in a worker thread rather than on the event loop.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator, Optional
+
+from mcp_core.cache import MUTATING_TOOLS, argument_paths, paths_overlap, tool_name
+from mcp_core.resilience import IDEMPOTENT_TOOLS, idempotent_tools
+from mcp_core.shaping import PAGE_TOOL
+from mcp_core.toolsearch import SEARCH_TOOL
+
+DEFAULT_PATH = os.path.join("~", ".cache", "mcp-client", "answers.sqlite3")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS answers (
+    key TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    files TEXT NOT NULL,
+    created REAL NOT NULL,
+    expires REAL,
+    used REAL NOT NULL,
+    size INTEGER NOT NULL
+)
+"""
+
+# Pseudo-tools answered by the client itself
+LOCAL_TOOLS = frozenset({PAGE_TOOL, SEARCH_TOOL})
+
+# Tools whose results depend on everything below their path
+RECURSIVE_TOOLS = frozenset({"directory_tree", "search_files"})
+
+
+def normalize_query(query: str) -> str:
+    return " ".join(query.lower().split()).rstrip("?!. ")
+
+
+def _plain(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True)
+    return str(value)
+
+
+def _digest(value) -> str:
+    text = json.dumps(value, sort_keys=True, default=_plain, ensure_ascii=False)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def file_state(path: str) -> Optional[list]:
+    """Size and modification time of ``path``, or None if it is missing"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+def tree_state(path: str) -> Optional[str]:
+    """Digest of every entry's name, size and mtime under ``path``, or None"""
+    root = file_state(path)
+    if root is None:
+        return None
+    entries = [["", root]]
+    for directory, dirs, files in os.walk(path):
+        for name in dirs + files:
+            full = os.path.join(directory, name)
+            entries.append([os.path.relpath(full, path), file_state(full)])
+    return _digest(sorted(entries))
+
+
+def _current_state(path: str, state):
+    # Trees are stored as a digest string, single paths as [size, mtime]
+    return tree_state(path) if isinstance(state, str) else file_state(path)
+
+
+@dataclass
+class AnswerRecord:
+    """What the tool calls of one query depended on"""
+
+    tools: set = field(default_factory=set)
+    paths: set = field(default_factory=set)
+    trees: set = field(default_factory=set)
+    cacheable: bool = True
+
+
+_record: ContextVar[Optional[AnswerRecord]] = ContextVar("answer_record", default=None)
+
+
+class AnswerCache:
+    """SQLite store of final answers, with TTL and size-based eviction
+
+    Its methods may be called from worker threads; one lock serializes the
+    database work, while file states are taken outside it.
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_PATH,
+        ttl: float = 3600.0,
+        ttls: Optional[dict[str, float]] = None,
+        max_bytes: int = 64 << 20,
+        safe_tools: frozenset = IDEMPOTENT_TOOLS,
+        clock: Callable[[], float] = time.time,
+    ):
+        """
+        Args:
+            path: SQLite file, created on first use; ``:memory:`` for tests
+            ttl: Seconds an answer stays valid (``0`` means forever)
+            ttls: Shorter TTLs for answers that used a given tool
+            max_bytes: Total answer size kept before evicting
+            safe_tools: Read-only tools whose answers may be stored
+            clock: Wall clock, since entries outlive the process
+        """
+        self.path = os.path.expanduser(path)
+        self.ttl = ttl
+        self.ttls = dict(ttls or {})
+        self.max_bytes = max_bytes
+        self.safe_tools = frozenset(safe_tools) | LOCAL_TOOLS
+        self.clock = clock
+        self._db: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._catalogs: dict[tuple, str] = {}
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "AnswerCache":
+        ttls = {}
+        prefix = "ANSWER_CACHE_TTL_"
+        for key, value in os.environ.items():
+            if key.startswith(prefix) and value:
+                ttls[key[len(prefix) :].lower()] = float(value)
+        return cls(
+            path=os.getenv("ANSWER_CACHE_PATH") or DEFAULT_PATH,
+            ttl=float(os.getenv("ANSWER_CACHE_TTL", "3600")),
+            ttls=ttls,
+            max_bytes=int(os.getenv("ANSWER_CACHE_MAX_BYTES", str(64 << 20))),
+            safe_tools=idempotent_tools(),
+        )
+
+    @property
+    def db(self) -> sqlite3.Connection:
+        if self._db is None:
+            if self.path != ":memory:":
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            # Several processes (gateway workers) may share the file
+            self._db = sqlite3.connect(
+                self.path, timeout=5, isolation_level=None, check_same_thread=False
+            )
+            if self.path != ":memory:":
+                self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(SCHEMA)
+        return self._db
+
+    async def catalog_fingerprint(self, catalog) -> str:
+        """Digest of a ``ToolCatalog``'s tools, kept per catalog version"""
+        tools = await catalog.tools()
+        key = (id(catalog), catalog.version)
+        fingerprint = self._catalogs.get(key)
+        if fingerprint is None:
+            fingerprint = _digest(
+                sorted(
+                    [t.name, t.description or "", t.inputSchema] for t in tools
+                )
+            )
+            self._catalogs = {key: fingerprint}
+        return fingerprint
+
+    @staticmethod
+    def key(
+        query: str, provider: str, model: str, catalog: str, history: list
+    ) -> str:
+        return _digest(
+            [normalize_query(query), provider, model, catalog, _digest(history)]
+        )
+
+    def get(self, key: str) -> Optional[str]:
+        """The stored answer, or None if missing, expired or out of date"""
+        with self._lock:
+            row = self.db.execute(
+                "SELECT answer, files, expires FROM answers WHERE key = ?", (key,)
+            ).fetchone()
+        now = self.clock()
+        if row is not None:
+            answer, files, expires = row
+            stale = expires is not None and expires <= now
+            if stale or any(
+                _current_state(path, state) != state
+                for path, state in json.loads(files).items()
+            ):
+                with self._lock:
+                    self.db.execute("DELETE FROM answers WHERE key = ?", (key,))
+                row = None
+        with self._lock:
+            if row is None:
+                self.misses += 1
+                return None
+            self.db.execute("UPDATE answers SET used = ? WHERE key = ?", (now, key))
+            self.hits += 1
+        return answer
+
+    def put(self, key: str, query: str, answer: str, record: AnswerRecord):
+        """Store an answer unless its tool calls make it unsafe to reuse"""
+        if not record.cacheable or not answer:
+            return
+        ttls = [self.ttl] if self.ttl > 0 else []
+        ttls += [self.ttls[t] for t in record.tools if t in self.ttls]
+        if any(ttl <= 0 for ttl in ttls):
+            return
+        now = self.clock()
+        expires = now + min(ttls) if ttls else None
+        files = {path: file_state(path) for path in sorted(record.paths)}
+        files.update((path, tree_state(path)) for path in sorted(record.trees))
+        size = len(answer.encode()) + len(query.encode())
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO answers VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, query, answer, json.dumps(files), now, expires, now, size),
+            )
+            self.stores += 1
+            self._evict()
+
+    def _evict(self):
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM answers").fetchone()
+        excess = total[0] - self.max_bytes
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in self.db.execute("SELECT key, size FROM answers ORDER BY used"):
+            if excess <= 0:
+                break
+            victims.append((key,))
+            excess -= size
+        self.db.executemany("DELETE FROM answers WHERE key = ?", victims)
+        self.evictions += len(victims)
+
+    def invalidate_paths(self, paths: tuple[str, ...]):
+        """Drop answers that read any of ``paths`` or a path under them"""
+        if not paths:
+            return
+        with self._lock:
+            victims = []
+            for key, files in self.db.execute("SELECT key, files FROM answers"):
+                if any(paths_overlap(a, b) for a in json.loads(files) for b in paths):
+                    victims.append((key,))
+            self.db.executemany("DELETE FROM answers WHERE key = ?", victims)
+            self.invalidations += len(victims)
+
+    def clear(self):
+        with self._lock:
+            self.db.execute("DELETE FROM answers")
+
+    @contextmanager
+    def recording(self) -> Iterator[AnswerRecord]:
+        """Collect the tool calls made by the enclosed query"""
+        record = AnswerRecord()
+        token = _record.set(record)
+        try:
+            yield record
+        finally:
+            _record.reset(token)
+
+    def note(self, name: str, arguments: Optional[dict], result):
+        """Account one finished tool call to the current query, if any"""
+        tool = tool_name(name)
+        record = _record.get()
+        if record is None:
+            return
+        record.tools.add(tool)
+        record.paths.update(argument_paths(arguments))
+        if tool in RECURSIVE_TOOLS:
+            record.trees.update(argument_paths(arguments))
+        if (
+            tool not in self.safe_tools
+            or isinstance(result, BaseException)
+            or getattr(result, "isError", False)
+        ):
+            record.cacheable = False
+
+    def stats(self) -> dict:
+        with self._lock:
+            entries = self.db.execute("SELECT COUNT(*) FROM answers").fetchone()[0]
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "stores": self.stores,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": entries,
+        }
+
+    def close(self):
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+class AnswerRecordingSession:
+    """Session wrapper that tells the ``AnswerCache`` about every tool call
+
+    Everything except ``call_tool`` is passed through to the wrapped
+    session or router.
+    """
+
+    def __init__(self, session, cache: AnswerCache):
+        self.session = session
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        try:
+            result = await self.session.call_tool(name, arguments)
+        except BaseException as e:
+            self.cache.note(name, arguments, e)
+            raise
+        finally:
+            if tool_name(name) in MUTATING_TOOLS:
+                paths = argument_paths(arguments)
+                await asyncio.to_thread(self.cache.invalidate_paths, paths)
+        self.cache.note(name, arguments, result)
+        return result
@@ -0,0 +1,182 @@
+"""Headless batch runner for pushing many queries through one client.
+
+Queries are read lazily from a JSONL file (or stdin), one per line, either
+as ``{"id": "...", "query": "..."}`` objects or as bare JSON strings. A
+fixed number of workers run them concurrently through ``process_query``
+over the client's shared server sessions, and each result is appended to
+the output JSONL as soon as it finishes::
+
+    {"id": "q1", "query": "...", "response": "...", "error": null,
+     "latency_s": 3.2, "tool_calls": 2, "iterations": 2,
+     "input_tokens": 1830, "output_tokens": 214}
+
+A line that is not valid JSON, or not a query, gets an ``{"id", "error"}``
+record (its id defaults to the line number) and the batch carries on.
+
+The output file doubles as the checkpoint: on resume, queries whose id
+already has a successful result are skipped.
+"""
+
+import asyncio
+import json
+import sys
+import time
+from typing import IO, Iterator, Optional
+
+from mcp_core.budget import QueryRun
+
+
+def read_queries(stream: IO[str]) -> Iterator[dict]:
+    """Yield ``{"id", "query"}`` dicts from JSONL lines
+
+    Lines that cannot be run yield ``{"id", "error"}`` instead.
+    """
+    for number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            item = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield {"id": str(number), "error": f"invalid JSON: {e}"}
+            continue
+        if isinstance(item, str):
+            item = {"query": item}
+        if not isinstance(item, dict):
+            yield {"id": str(number), "error": "expected a string or an object"}
+            continue
+        item["id"] = str(item.get("id", number))
+        if not isinstance(item.get("query"), str):
+            yield {"id": item["id"], "error": 'missing or non-string "query"'}
+            continue
+        yield item
+
+
+def completed_ids(path: str, retry_errors: bool = True) -> set[str]:
+    """Ids that already have a result in an earlier output file"""
+    done = set()
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # a line cut short by an interrupted run
+                if not isinstance(record, dict) or record.get("id") is None:
+                    continue
+                if retry_errors and record.get("error"):
+                    continue
+                done.add(str(record["id"]))
+    except FileNotFoundError:
+        pass
+    return done
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class BatchRunner:
+    """Run queries through a connected ``MCPClient`` with bounded concurrency"""
+
+    def __init__(
+        self,
+        client,
+        output: IO[str],
+        concurrency: int = 8,
+        skip_ids: Optional[set[str]] = None,
+    ):
+        self.client = client
+        self.output = output
+        self.concurrency = concurrency
+        self.skip_ids = skip_ids or set()
+        self.latencies: list[float] = []
+        self.succeeded = 0
+        self.failed = 0
+        self.skipped = 0
+        self._next_lock = asyncio.Lock()
+
+    async def run(self, queries: Iterator[dict]) -> dict:
+        """Process every query and return a throughput summary"""
+        started = time.monotonic()
+        await asyncio.gather(
+            *(self._worker(queries) for _ in range(self.concurrency))
+        )
+        elapsed = time.monotonic() - started
+        finished = self.succeeded + self.failed
+        return {
+            "queries": finished,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "skipped": self.skipped,
+            "elapsed_s": round(elapsed, 3),
+            "queries_per_s": round(finished / elapsed, 3) if elapsed else 0.0,
+            "latency_p50_s": round(_percentile(self.latencies, 0.5), 3),
+            "latency_p95_s": round(_percentile(self.latencies, 0.95), 3),
+        }
+
+    async def _next(self, queries: Iterator[dict]) -> Optional[dict]:
+        # Reading may block on stdin, so it runs in a thread, one at a time
+        async with self._next_lock:
+            while True:
+                item = await asyncio.to_thread(next, queries, None)
+                if item is None or item["id"] not in self.skip_ids:
+                    return item
+                self.skipped += 1
+
+    async def _worker(self, queries: Iterator[dict]):
+        while (item := await self._next(queries)) is not None:
+            self._write(await self._run_one(item))
+
+    async def _run_one(self, item: dict) -> dict:
+        if "error" in item:
+            # A line read_queries could not make a query of
+            self.failed += 1
+            return {"id": item["id"], "error": item["error"]}
+        run = QueryRun()
+        record = {"id": item["id"], "query": item.get("query")}
+        try:
+            record["response"] = await self.client.process_query(
+                item["query"], run=run
+            )
+            record["error"] = None
+            self.succeeded += 1
+        except Exception as e:
+            record["response"] = None
+            record["error"] = f"{type(e).__name__}: {e}"
+            self.failed += 1
+        self.latencies.append(run.elapsed)
+        record.update(
+            latency_s=round(run.elapsed, 3),
+            tool_calls=run.tool_calls,
+            iterations=len(run.iterations),
+            input_tokens=sum(i.input_tokens for i in run.iterations),
+            output_tokens=sum(i.output_tokens for i in run.iterations),
+        )
+        return record
+
+    def _write(self, record: dict):
+        self.output.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self.output.flush()
+
+
+async def run_batch(
+    client,
+    input_path: str,
+    output_path: str,
+    concurrency: int = 8,
+    resume: bool = False,
+) -> dict:
+    """Run a JSONL file (``-`` for stdin) through a connected client"""
+    skip_ids = completed_ids(output_path) if resume else set()
+    source = sys.stdin if input_path == "-" else open(input_path, encoding="utf-8")
+    try:
+        with open(output_path, "a" if resume else "w", encoding="utf-8") as output:
+            runner = BatchRunner(client, output, concurrency, skip_ids)
+            return await runner.run(read_queries(source))
+    finally:
+        if source is not sys.stdin:
+            source.close()
@@ -0,0 +1,153 @@
+"""Limits and timing for the model/tool loop of a single query.
+
+``process_query`` keeps calling the model with the tools until it stops
+requesting them. ``LoopBudget`` bounds that loop and ``QueryRun`` records
+what each iteration cost. Defaults come from the environment:
+
+- ``MAX_TOOL_ITERATIONS``: tool rounds per query (default 10)
+- ``MAX_QUERY_SECONDS``: wall-clock budget per query (default 120)
+- ``MAX_QUERY_TOKENS``: input + output tokens per query (default 0, no limit)
+
+The budget is checked after every tool round. Once the iteration or token
+budget is spent the model gets one last call with tools disabled so it can
+answer from what it has; when time runs out the loop stops right away.
+"""
+
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+
+@dataclass
+class LoopBudget:
+    max_iterations: int = 10
+    max_seconds: float = 120.0
+    max_tokens: int = 0
+
+    @classmethod
+    def from_env(cls) -> "LoopBudget":
+        return cls(
+            max_iterations=int(os.getenv("MAX_TOOL_ITERATIONS", "10")),
+            max_seconds=float(os.getenv("MAX_QUERY_SECONDS", "120")),
+            max_tokens=int(os.getenv("MAX_QUERY_TOKENS", "0")),
+        )
+
+
+@dataclass
+class IterationStats:
+    """Timing and usage of one model call plus the tool round it triggered"""
+
+    index: int
+    started: float
+    model_seconds: float = 0.0
+    tool_seconds: float = 0.0
+    tool_calls: int = 0
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+
+
+@dataclass
+class QueryRun:
+    """Progress of one query through the tool loop"""
+
+    budget: LoopBudget = field(default_factory=LoopBudget.from_env)
+    started: float = field(default_factory=time.monotonic)
+    iterations: list[IterationStats] = field(default_factory=list)
+    stop_reason: Optional[str] = None
+
+    def begin_iteration(self) -> IterationStats:
+        iteration = IterationStats(len(self.iterations) + 1, time.monotonic())
+        self.iterations.append(iteration)
+        return iteration
+
+    def record_model(self, usage=None):
+        """Record the model call of the current iteration
+
+        Args:
+            usage: Provider usage object; both Anthropic
+                (``input_tokens``) and OpenAI (``prompt_tokens``) shapes work
+        """
+        iteration = self.iterations[-1]
+        iteration.model_seconds = time.monotonic() - iteration.started
+        if usage is not None:
+            iteration.input_tokens = (
+                getattr(usage, "input_tokens", None)
+                or getattr(usage, "prompt_tokens", None)
+                or 0
+            )
+            iteration.output_tokens = (
+                getattr(usage, "output_tokens", None)
+                or getattr(usage, "completion_tokens", None)
+                or 0
+            )
+            # Anthropic reports cache reads/writes separately; OpenAI-style
+            # providers report cached prompt tokens under prompt_tokens_details
+            details = getattr(usage, "prompt_tokens_details", None)
+            iteration.cache_read_tokens = (
+                getattr(usage, "cache_read_input_tokens", None)
+                or getattr(details, "cached_tokens", None)
+                or 0
+            )
+            iteration.cache_write_tokens = (
+                getattr(usage, "cache_creation_input_tokens", None) or 0
+            )
+
+    def record_tools(self, count: int):
+        """Record the tool round of the current iteration"""
+        iteration = self.iterations[-1]
+        iteration.tool_calls = count
+        iteration.tool_seconds = (
+            time.monotonic() - iteration.started - iteration.model_seconds
+        )
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    @property
+    def tokens(self) -> int:
+        return sum(i.input_tokens + i.output_tokens for i in self.iterations)
+
+    @property
+    def cache_read_tokens(self) -> int:
+        return sum(i.cache_read_tokens for i in self.iterations)
+
+    @property
+    def cache_write_tokens(self) -> int:
+        return sum(i.cache_write_tokens for i in self.iterations)
+
+    @property
+    def tool_calls(self) -> int:
+        return sum(i.tool_calls for i in self.iterations)
+
+    def out_of_time(self) -> bool:
+        return self.elapsed >= self.budget.max_seconds
+
+    def exhausted(self) -> Optional[str]:
+        """Return why the budget is spent, or ``None`` if the loop may go on"""
+        budget = self.budget
+        if self.out_of_time():
+            self.stop_reason = f"time limit of {budget.max_seconds:g}s reached"
+        elif len(self.iterations) >= budget.max_iterations:
+            self.stop_reason = f"{budget.max_iterations} tool rounds reached"
+        elif budget.max_tokens and self.tokens >= budget.max_tokens:
+            self.stop_reason = f"token limit of {budget.max_tokens} reached"
+        return self.stop_reason
+
+    def summary(self) -> str:
+        """One line per iteration, for printing after a query"""
+        lines = [
+            f"  #{i.index}: model {i.model_seconds:.2f}s, "
+            f"{i.tool_calls} tool calls {i.tool_seconds:.2f}s, "
+            f"tokens {i.input_tokens} in / {i.output_tokens} out, "
+            f"cache {i.cache_read_tokens} read / {i.cache_write_tokens} written"
+            for i in self.iterations
+        ]
+        lines.append(
+            f"  total {self.elapsed:.2f}s, {self.tool_calls} tool calls, "
+            f"{self.tokens} tokens, {self.cache_read_tokens} read from cache"
+        )
+        return "\n".join(lines)
@@ -0,0 +1,196 @@
+"""Cache for the results of read-only tool calls.
+
+Tools such as ``read_text_file``, ``list_directory`` or ``get_weather`` are
+often called again with the same arguments within a session, and each call
+costs a stdio round-trip plus work on the server. ``CachedSession`` sits in
+front of ``call_tool`` and serves repeats from a ``ToolResultCache``:
+
+- entries are keyed on the tool name plus its canonical JSON arguments
+- each cacheable tool has its own TTL; other tools are never cached
+- the cache is a size-bounded LRU
+- mutating tools (``write_file``, ``edit_file``, ``move_file``, ...) drop
+  every entry whose path arguments overlap the paths they touched
+
+Enable it with ``TOOL_CACHE=1``. ``TOOL_CACHE_SIZE`` bounds the number of
+entries (default 256) and ``TOOL_CACHE_TTL_<TOOL>`` overrides a tool's TTL
+in seconds (``0`` disables caching for that tool).
+"""
+
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from mcp_core.servers import NAMESPACE_SEPARATOR
+
+# Idempotent tools from the bundled servers and how long their results stay fresh
+DEFAULT_TTLS = {
+    "read_file": 30.0,
+    "read_text_file": 30.0,
+    "read_media_file": 30.0,
+    "read_multiple_files": 30.0,
+    "list_directory": 30.0,
+    "list_directory_with_sizes": 30.0,
+    "directory_tree": 30.0,
+    "search_files": 30.0,
+    "get_file_info": 30.0,
+    "list_allowed_directories": 300.0,
+    "get_weather": 300.0,
+}
+
+# Tools that change files, invalidating cached results for their paths
+MUTATING_TOOLS = {"write_file", "edit_file", "move_file", "create_directory"}
+
+# Arguments that name filesystem paths
+PATH_ARGUMENTS = ("path", "paths", "source", "destination")
+
+
+def tool_name(name: str) -> str:
+    """Strip the server prefix from a namespaced tool name"""
+    return name.rsplit(NAMESPACE_SEPARATOR, 1)[-1]
+
+
+def argument_paths(arguments: Optional[dict]) -> tuple[str, ...]:
+    """Normalized filesystem paths mentioned in a call's arguments"""
+    paths = []
+    for key in PATH_ARGUMENTS:
+        value = (arguments or {}).get(key)
+        values = value if isinstance(value, list) else [value]
+        for path in values:
+            if isinstance(path, str) and path:
+                paths.append(os.path.normpath(os.path.expanduser(path)))
+    return tuple(paths)
+
+
+def paths_overlap(a: str, b: str) -> bool:
+    """Whether one path is the other or contains it"""
+    return a == b or a.startswith(b.rstrip(os.sep) + os.sep) or b.startswith(
+        a.rstrip(os.sep) + os.sep
+    )
+
+
+class ToolResultCache:
+    """TTL + LRU cache of tool results"""
+
+    def __init__(
+        self,
+        ttls: Optional[dict[str, float]] = None,
+        max_entries: int = 256,
+        mutating_tools: Optional[set[str]] = None,
+    ):
+        self.ttls = dict(DEFAULT_TTLS if ttls is None else ttls)
+        self.max_entries = max_entries
+        self.mutating_tools = set(
+            MUTATING_TOOLS if mutating_tools is None else mutating_tools
+        )
+        # key -> (expires_at, paths, result)
+        self._entries: OrderedDict[str, tuple[float, tuple, object]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "ToolResultCache":
+        ttls = dict(DEFAULT_TTLS)
+        prefix = "TOOL_CACHE_TTL_"
+        for key, value in os.environ.items():
+            if key.startswith(prefix) and value:
+                ttls[key[len(prefix) :].lower()] = float(value)
+        return cls(ttls=ttls, max_entries=int(os.getenv("TOOL_CACHE_SIZE", "256")))
+
+    @staticmethod
+    def key(name: str, arguments: Optional[dict]) -> str:
+        canonical = json.dumps(
+            arguments or {}, sort_keys=True, separators=(",", ":"), ensure_ascii=False
+        )
+        return f"{name}:{canonical}"
+
+    def cacheable(self, name: str) -> bool:
+        return self.ttls.get(tool_name(name), 0) > 0
+
+    def mutates(self, name: str) -> bool:
+        return tool_name(name) in self.mutating_tools
+
+    def get(self, name: str, arguments: Optional[dict]):
+        """Return a fresh cached result, or ``None`` on a miss"""
+        key = self.key(name, arguments)
+        entry = self._entries.get(key)
+        if entry is None or entry[0] < time.monotonic():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, name: str, arguments: Optional[dict], result):
+        ttl = self.ttls.get(tool_name(name), 0)
+        if ttl <= 0:
+            return
+        key = self.key(name, arguments)
+        self._entries[key] = (time.monotonic() + ttl, argument_paths(arguments), result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def invalidate_paths(self, paths: tuple[str, ...]):
+        """Drop every entry whose paths overlap any of ``paths``"""
+        stale = [
+            key
+            for key, (_, entry_paths, _) in self._entries.items()
+            if any(paths_overlap(p, q) for p in paths for q in entry_paths)
+        ]
+        for key in stale:
+            del self._entries[key]
+        self.invalidations += len(stale)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+        }
+
+
+class CachedSession:
+    """Session wrapper that answers repeated read-only tool calls from cache
+
+    Everything except ``call_tool`` is passed through to the wrapped
+    session or router.
+    """
+
+    def __init__(self, session, cache: ToolResultCache):
+        self.session = session
+        self.cache = cache
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        if self.cache.mutates(name):
+            try:
+                return await self.session.call_tool(name, arguments)
+            finally:
+                # Invalidate even on failure: the call may have partly applied
+                self.cache.invalidate_paths(argument_paths(arguments))
+
+        if not self.cache.cacheable(name):
+            return await self.session.call_tool(name, arguments)
+
+        result = self.cache.get(name, arguments)
+        if result is None:
+            result = await self.session.call_tool(name, arguments)
+            if not getattr(result, "isError", False):
+                self.cache.put(name, arguments, result)
+        return result
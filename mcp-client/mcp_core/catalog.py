@@ -0,0 +1,130 @@
+"""Per-session cache of a server's tool catalog.
+
+``list_tools`` is a full stdio round-trip and the provider-specific tool
+schemas were rebuilt from it on every query. The catalog fetches the list
+once, keeps the converted Anthropic/OpenAI payloads, and only refetches
+after the server announces ``notifications/tools/list_changed``.
+"""
+
+import asyncio
+from typing import Awaitable, Callable, Optional
+
+from mcp import ClientSession, types
+
+
+def anthropic_tool(tool: types.Tool) -> dict:
+    """Convert an MCP tool to the Anthropic Messages tool format"""
+    return {
+        "name": tool.name,
+        "description": tool.description or f"Tool for {tool.name}",
+        "input_schema": tool.inputSchema,
+    }
+
+
+def openai_tool(tool: types.Tool) -> dict:
+    """Convert an MCP tool to the OpenAI Chat Completions tool format"""
+    return {
+        "type": "function",
+        "function": {
+            "name": tool.name,
+            "description": tool.description or f"Tool for {tool.name}",
+            "parameters": tool.inputSchema,
+        },
+    }
+
+
+class ToolCatalog:
+    """Lazily fetched tool list plus its converted provider payloads"""
+
+    def __init__(self, fetch: Callable[[], Awaitable[list[types.Tool]]]):
+        self._fetch = fetch
+        self._tools: Optional[list[types.Tool]] = None
+        self._payloads: dict[str, list[dict]] = {}
+        self._lock = asyncio.Lock()
+        self._listeners: list[Callable[[], None]] = []
+        # Bumped on every invalidation so an in-flight fetch can tell it is stale
+        self.version = 0
+
+    async def tools(self) -> list[types.Tool]:
+        """Return the cached tools, fetching them if the cache is empty"""
+        while self._tools is None:
+            async with self._lock:
+                if self._tools is not None:
+                    break
+                version = self.version
+                tools = list(await self._fetch())
+                if version == self.version:
+                    self._tools = tools
+                    self._payloads = {}
+        return self._tools
+
+    async def anthropic_tools(self) -> list[dict]:
+        """Tool definitions for ``messages.create(tools=...)``"""
+        return await self._payload("anthropic", anthropic_tool)
+
+    async def openai_tools(self) -> list[dict]:
+        """Tool definitions for ``chat.completions.create(tools=...)``"""
+        return await self._payload("openai", openai_tool)
+
+    async def _payload(self, key: str, convert: Callable[[types.Tool], dict]):
+        tools = await self.tools()
+        payload = self._payloads.get(key)
+        if payload is None:
+            # Sorted so the request prefix stays byte-identical between calls,
+            # which provider-side prompt caches rely on
+            ordered = sorted(tools, key=lambda tool: tool.name)
+            payload = self._payloads[key] = [convert(tool) for tool in ordered]
+        return payload
+
+    def invalidate(self):
+        """Drop the cached tools so the next lookup refetches them"""
+        self._tools = None
+        self._payloads = {}
+        self.version += 1
+        for listener in self._listeners:
+            listener()
+
+    def on_invalidate(self, listener: Callable[[], None]):
+        """Register a callback that runs whenever the catalog is invalidated"""
+        self._listeners.append(listener)
+
+
+class CatalogSession(ClientSession):
+    """``ClientSession`` that keeps a ``ToolCatalog`` in sync with the server"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.tool_catalog = ToolCatalog(self._fetch_tools)
+        # Set once the server's output ends, i.e. its subprocess exited
+        self.closed = asyncio.Event()
+
+    async def __aenter__(self):
+        await super().__aenter__()
+        # Notifications are also forwarded to ``incoming_messages``; nothing
+        # else reads that stream, so drain it to keep the receive loop moving
+        if hasattr(self, "incoming_messages"):
+            self._task_group.start_soon(self._drain_incoming_messages)
+        return self
+
+    async def _receive_loop(self) -> None:
+        try:
+            await super()._receive_loop()
+        finally:
+            self.closed.set()
+            # Nothing will answer requests still waiting for a response, so
+            # end their streams instead of leaving them to wait forever
+            for stream in list(self._response_streams.values()):
+                stream.close()
+            self._response_streams.clear()
+
+    async def _drain_incoming_messages(self):
+        async for _ in self.incoming_messages:
+            pass
+
+    async def _fetch_tools(self) -> list[types.Tool]:
+        return (await self.list_tools()).tools
+
+    async def _received_notification(self, notification) -> None:
+        if isinstance(notification.root, types.ToolListChangedNotification):
+            self.tool_catalog.invalidate()
+        await super()._received_notification(notification)
@@ -0,0 +1,499 @@
+"""The MCP client shared by every entry point.
+
+``MCPClient`` connects to the MCP servers and runs the tool loop; the
+backend-specific parts live in a ``mcp_core.providers.Provider``. The
+per-backend scripts (``client.py``, ``client_openai.py``, ...) and
+``python -m mcp_core`` only choose the provider.
+"""
+
+import asyncio
+import os
+import signal
+import sys
+from contextlib import AsyncExitStack
+from typing import Callable, Optional
+
+from mcp_core.answers import AnswerCache, AnswerRecordingSession
+from mcp_core.budget import QueryRun
+from mcp_core.cache import CachedSession, ToolResultCache
+from mcp_core.coalesce import CoalescingSession
+from mcp_core.config import env_flag
+from mcp_core.daemon import attach, default_socket
+from mcp_core.executor import ToolExecutor
+from mcp_core.history import ConversationStore
+from mcp_core.prefetch import Prefetcher, PrefetchSession
+from mcp_core.providers import Provider, ToolCall
+from mcp_core.repl import BackgroundQueries, LineReader
+from mcp_core.servers import ServerRouter, ServerSpec, load_server_specs
+from mcp_core.shaping import ResultShaper, ShapedSession
+from mcp_core.singleflight import SingleflightSession
+from mcp_core.telemetry import Telemetry, TracedSession
+from mcp_core.toolsearch import ToolIndex, ToolSearchSession
+
+
+class MCPClient:
+    def __init__(self, provider: Provider, debug: Optional[bool] = None):
+        """
+        Args:
+            provider: The LLM backend, see ``mcp_core.providers``
+            debug: Print each model call and tool call; defaults to
+                ``MCP_DEBUG``
+        """
+        self.provider = provider
+        self.session: Optional[ServerRouter] = None
+        self.exit_stack = AsyncExitStack()
+        self.exit_stack.push_async_callback(provider.close)
+        self.debug = env_flag("MCP_DEBUG") if debug is None else debug
+        self.stream = env_flag("STREAM_RESPONSES")
+        self.show_timings = env_flag("SHOW_TIMINGS")
+        self.tool_cache: Optional[ToolResultCache] = None
+        self.prefetcher: Optional[Prefetcher] = None
+        self.coalescer: Optional[CoalescingSession] = None
+        self.singleflight: Optional[SingleflightSession] = None
+        self.tool_index: Optional[ToolIndex] = None
+        self.answer_cache: Optional[AnswerCache] = None
+        self.telemetry = Telemetry.from_env()
+        self.exit_stack.push_async_callback(self.telemetry.close)
+        self._prepared: Optional[asyncio.Future] = None
+        self.history = ConversationStore.from_env(
+            summarizer=provider.summarize if env_flag("HISTORY_SUMMARIZE") else None
+        )
+
+    async def connect_to_server(
+        self, server_script_path: str, additional_args: list = None
+    ):
+        """Connect to an MCP server
+
+        Args:
+            server_script_path: Path to the server script (.py or .js)
+            additional_args: Extra command line arguments for the server
+        """
+        await self.connect_to_servers(
+            [ServerSpec.from_script(server_script_path, additional_args)]
+        )
+
+    async def connect_to_servers(self, specs: list[ServerSpec]):
+        """Connect to several MCP servers concurrently and merge their tools
+
+        With ``MCP_DAEMON_SOCKET`` set, a running ``mcp_core.daemon`` is
+        used instead and the specs are only needed when none is listening.
+
+        Args:
+            specs: One entry per server, see ``mcp_core.servers``
+        """
+        # The LLM SDK imports in a thread while the servers spawn, handshake
+        # and list tools; only the first model call waits for it
+        if self._prepared is None:
+            self._prepared = asyncio.ensure_future(
+                asyncio.to_thread(self.provider.prepare)
+            )
+        session = await self._open_servers(specs)
+        if env_flag("TOOL_SINGLEFLIGHT"):
+            self.singleflight = SingleflightSession.from_env(session, self.telemetry)
+            session = self.singleflight
+        if env_flag("TOOL_COALESCE"):
+            self.coalescer = CoalescingSession.from_env(session)
+            self.exit_stack.push_async_callback(self.coalescer.close)
+            session = self.coalescer
+        if env_flag("TOOL_PREFETCH"):
+            self.prefetcher = Prefetcher.from_env()
+            self.exit_stack.callback(self.prefetcher.close)
+            session = PrefetchSession(session, self.prefetcher)
+        shaper = ResultShaper.from_env()
+        self.exit_stack.callback(shaper.store.close)
+        self.session = ShapedSession(session, shaper)
+        if env_flag("TOOL_SUBSET"):
+            self.session = ToolSearchSession.from_env(self.session)
+            self.tool_index = self.session.index
+        if env_flag("TOOL_CACHE"):
+            self.tool_cache = ToolResultCache.from_env()
+            self.session = CachedSession(self.session, self.tool_cache)
+        if env_flag("ANSWER_CACHE"):
+            self.answer_cache = AnswerCache.from_env()
+            self.exit_stack.callback(self.answer_cache.close)
+            self.session = AnswerRecordingSession(self.session, self.answer_cache)
+        self.session = TracedSession(self.session, self.telemetry)
+        await self.telemetry.start()
+        self.executor = ToolExecutor(self.session, session.max_concurrency)
+
+        # List available tools
+        tools = await self.session.tool_catalog.tools()
+        print("\nConnected to server with tools:", [tool.name for tool in tools])
+
+    async def _open_servers(self, specs: list[ServerSpec]):
+        if os.getenv("MCP_DAEMON_SOCKET"):
+            remote = await attach()
+            if remote is not None:
+                self.exit_stack.push_async_callback(remote.close)
+                await remote.tool_catalog.tools()
+                return remote
+        if not specs:
+            raise RuntimeError(
+                f"No MCP daemon listening on {default_socket()} and no servers given"
+            )
+        router = ServerRouter(specs)
+        self.exit_stack.push_async_callback(router.close)
+        await router.start()
+        return router
+
+    def _log(self, message: str):
+        if self.debug:
+            print(f"[DEBUG] {message}")
+
+    async def process_query(
+        self,
+        query: str,
+        on_text: Optional[Callable[[str], None]] = None,
+        run: Optional[QueryRun] = None,
+        history: Optional[ConversationStore] = None,
+    ) -> str:
+        """Process a query using the provider's model and available tools
+
+        The model is called with the tools until it stops requesting them
+        or the loop budget runs out (see ``mcp_core.budget``).
+
+        Args:
+            query: The user's question
+            on_text: Receives reply text as it streams; enables streaming
+            run: Collects per-iteration timing and usage for the caller
+            history: Earlier turns to continue from; the new turn is added
+                to it once the query finishes
+        """
+        with self.telemetry.span(
+            "query", provider=self.provider.prefix.lower(), model=self.provider.model
+        ) as span:
+            run = run or QueryRun()
+            if self.answer_cache is None:
+                answer = await self._run_query(query, on_text, run, history)
+            else:
+                answer = await self._cached_query(query, on_text, run, history, span)
+            span.set(
+                iterations=len(run.iterations),
+                tool_calls=run.tool_calls,
+                input_tokens=sum(i.input_tokens for i in run.iterations),
+                output_tokens=sum(i.output_tokens for i in run.iterations),
+            )
+            return answer
+
+    async def _cached_query(self, query, on_text, run, history, span) -> str:
+        """``_run_query`` answered from, and stored in, the answer cache"""
+        cache = self.answer_cache
+        provider = self.provider
+        key = cache.key(
+            query,
+            provider.prefix,
+            provider.model,
+            await cache.catalog_fingerprint(self.session.tool_catalog),
+            history.messages() if history is not None else [],
+        )
+        answer = await asyncio.to_thread(cache.get, key)
+        if answer is not None:
+            span.set(answer_cache="hit")
+            if on_text:
+                on_text(answer)
+            if history is not None:
+                history.add_turn(
+                    [
+                        provider.user_message(query),
+                        {"role": "assistant", "content": answer},
+                    ]
+                )
+            return answer
+
+        span.set(answer_cache="miss")
+        with cache.recording() as record:
+            answer = await self._run_query(query, on_text, run, history)
+        # Answers cut short by the loop budget are not worth repeating
+        if run.stop_reason is None:
+            await asyncio.to_thread(cache.put, key, query, answer, record)
+        return answer
+
+    async def _run_query(self, query, on_text, run, history) -> str:
+        provider = self.provider
+        if self._prepared is not None:
+            await self._prepared
+        telemetry = self.telemetry
+        messages = []
+        if history is not None:
+            await history.compact()
+            messages.extend(history.messages())
+        turn_start = len(messages)
+        messages.append(provider.user_message(query))
+
+        with telemetry.span("list_tools"):
+            selection = None
+            if self.tool_index is not None:
+                selection = await self.tool_index.select(query, messages[:turn_start])
+            available_tools = await provider.tools(
+                selection or self.session.tool_catalog
+            )
+
+        # Tool calls launched while the reply is still streaming
+        started = {}
+
+        def start_tool(call: ToolCall):
+            if call.error is None:
+                started[call.id] = self.executor.start(call.name, call.arguments)
+
+        final_text = []
+        final_round = False
+
+        try:
+            while True:
+                run.begin_iteration()
+                with telemetry.span(
+                    "llm_call", provider=provider.prefix.lower(), model=provider.model
+                ) as span:
+
+                    def first_text(text: str, span=span):
+                        span.mark("time_to_first_token_s")
+                        on_text(text)
+
+                    def first_tool(call: ToolCall, span=span):
+                        span.mark("time_to_first_token_s")
+                        start_tool(call)
+
+                    if selection is not None:
+                        sent, saved = selection.record_call()
+                        span.set(
+                            tool_schema_tokens=sent, tool_schema_tokens_saved=saved
+                        )
+                    turn = await self._complete(
+                        messages,
+                        available_tools,
+                        first_text if on_text else None,
+                        first_tool,
+                        final=final_round,  # budget spent: answer from what it has
+                    )
+                    run.record_model(turn.usage)
+                    # Without streaming the whole reply arrives at once
+                    span.mark("time_to_first_token_s")
+                    span.set(
+                        input_tokens=run.iterations[-1].input_tokens,
+                        output_tokens=run.iterations[-1].output_tokens,
+                        tool_calls=len(turn.tool_calls),
+                    )
+                    if selection is not None:
+                        span.set(tool_subset_misses=selection.observe(turn.tool_calls))
+                messages.append(turn.message)
+                self._log(
+                    f"Model call {len(run.iterations)} took "
+                    f"{run.iterations[-1].model_seconds:.2f}s"
+                )
+
+                if turn.text:
+                    final_text.append(turn.text)
+                if final_round or not turn.tool_calls:
+                    break
+
+                # Execute tool calls concurrently; invalid calls and failures
+                # are reported back to the model, in the original order
+                pending = {}
+                for call in turn.tool_calls:
+                    if call.error is not None:
+                        final_text.append(call.error)
+                        self._log(f"{call.error} (raw arguments: {call.arguments})")
+                        continue
+                    final_text.append(
+                        f"[Calling tool {call.name} with args {call.arguments}]"
+                    )
+                    pending[call.id] = started.pop(
+                        call.id, None
+                    ) or self.executor.start(call.name, call.arguments)
+                outcomes = dict(
+                    zip(
+                        pending,
+                        await asyncio.gather(*pending.values(), return_exceptions=True),
+                    )
+                )
+
+                results = []
+                for call in turn.tool_calls:
+                    result = outcomes.get(call.id, call.error)
+                    if isinstance(result, BaseException):
+                        final_text.append(f"Error calling tool {call.name}: {result}")
+                    self._log(f"Tool {call.name} returned: {result}")
+                    results.append(result)
+                with telemetry.span("normalize_results", results=len(results)):
+                    messages.extend(provider.tool_results(turn.tool_calls, results))
+                run.record_tools(len(pending))
+                if selection is not None:
+                    # Searched-for and reached-for tools join the next call
+                    available_tools = await provider.tools(selection)
+
+                reason = run.exhausted()
+                if reason:
+                    final_text.append(f"[Stopping tool loop: {reason}]")
+                    if run.out_of_time():
+                        break
+                    final_round = True
+        finally:
+            # Calls started while a cancelled or failed reply streamed
+            for task in started.values():
+                task.cancel()
+
+        if history is not None:
+            history.add_turn(messages[turn_start:])
+
+        return "\n".join(final_text)
+
+    async def _complete(self, messages, tools, on_text, on_tool_call, final):
+        """``provider.complete`` bounded by the provider's deadline"""
+        provider = self.provider
+        try:
+            return await asyncio.wait_for(
+                provider.complete(messages, tools, on_text, on_tool_call, final),
+                provider.deadline,
+            )
+        except asyncio.TimeoutError:
+            raise TimeoutError(
+                f"{provider.prefix.lower()} model call did not finish within"
+                f" {provider.deadline:g}s"
+            ) from None
+
+    async def chat_loop(self):
+        """Run an interactive chat loop
+
+        Input is read without blocking the event loop. Ctrl-C cancels the
+        running query and returns to the prompt; the servers stay
+        connected and the cancelled turn is left out of the history. A
+        query ending in ``&`` runs in the background, without the
+        conversation history; ``jobs`` lists those and ``cancel [n]``
+        stops them.
+        """
+        print("\nMCP Client Started !!!")
+        print("Type your queries, 'clear' to forget the conversation or 'quit' to exit.")
+        print("End a query with '&' to run it in the background, 'jobs' lists those.")
+        print("Ctrl-C cancels the running query.")
+
+        reader = LineReader()
+        jobs = BackgroundQueries()
+        loop = asyncio.get_running_loop()
+        current: Optional[asyncio.Task] = None
+
+        def interrupt():
+            if current is not None and not current.done():
+                current.cancel()
+            else:
+                print("\n(Type 'quit' or press Ctrl-D to exit)")
+
+        try:
+            loop.add_signal_handler(signal.SIGINT, interrupt)
+        except (NotImplementedError, RuntimeError):
+            pass  # e.g. Windows: Ctrl-C keeps its default behaviour
+
+        try:
+            while True:
+                line = await reader.readline("\nQuery: ")
+                if line is None:
+                    break
+                query = line.strip()
+                command = query.lower()
+
+                if command == "quit":
+                    break
+                if not query:
+                    continue
+                if command == "clear":
+                    self.history.clear()
+                    print("Conversation history cleared.")
+                    continue
+                if command == "jobs":
+                    print("\n".join(jobs.describe()) or "No background queries.")
+                    continue
+                if command == "cancel" or command.startswith("cancel "):
+                    job = command[len("cancel") :].strip().lstrip("[").rstrip("]")
+                    count = jobs.cancel(int(job) if job.isdigit() else None)
+                    print(f"Cancelled {count} background queries.")
+                    continue
+                if query.endswith("&"):
+                    query = query[:-1].strip()
+                    job = jobs.start(query, self._background_query(query))
+                    print(f"[{job}] running in the background")
+                    continue
+
+                current = asyncio.create_task(self._foreground_query(query))
+                # wait() rather than await, so cancelling the query does not
+                # look like cancelling the chat loop itself
+                await asyncio.wait([current])
+                if current.cancelled():
+                    print("\n[Query cancelled]")
+                elif current.exception() is not None:
+                    print(f"\nError: {str(current.exception())}")
+                current = None
+        finally:
+            try:
+                loop.remove_signal_handler(signal.SIGINT)
+            except (NotImplementedError, RuntimeError):
+                pass
+            await jobs.close()
+
+    async def _foreground_query(self, query: str):
+        run = QueryRun()
+        if self.stream:
+            print()
+            await self.process_query(
+                query,
+                on_text=lambda text: print(text, end="", flush=True),
+                run=run,
+                history=self.history,
+            )
+            print()
+        else:
+            response = await self.process_query(query, run=run, history=self.history)
+            print("\n" + response)
+        self._print_timings(run)
+
+    async def _background_query(self, query: str):
+        run = QueryRun()
+        try:
+            response = await self.process_query(query, run=run)
+        except asyncio.CancelledError:
+            print(f"\n[Background query cancelled: {query}]")
+            raise
+        except Exception as e:
+            print(f"\n[Background query failed: {query}]\nError: {str(e)}")
+            return
+        print(f"\n[Background query done: {query}]\n{response}")
+        self._print_timings(run)
+
+    def _print_timings(self, run: QueryRun):
+        if self.show_timings:
+            print(run.summary())
+            if self.tool_cache is not None:
+                print(f"  tool cache: {self.tool_cache.stats()}")
+            if self.prefetcher is not None:
+                print(f"  prefetch: {self.prefetcher.stats()}")
+            if self.coalescer is not None:
+                print(f"  coalesced reads: {self.coalescer.stats()}")
+            if self.singleflight is not None:
+                print(f"  singleflight: {self.singleflight.stats()}")
+            if self.tool_index is not None:
+                print(f"  tool subset: {self.tool_index.stats()}")
+            if self.answer_cache is not None:
+                print(f"  answer cache: {self.answer_cache.stats()}")
+
+    async def cleanup(self):
+        """Clean up resources"""
+        await self.exit_stack.aclose()
+
+
+async def run_chat(client: MCPClient, argv: list[str], usage: str):
+    """Connect to the servers named on the command line and chat
+
+    Args:
+        client: A client that has not been connected yet
+        argv: A server script and its arguments, or a servers.json path;
+            may be empty when attaching to a daemon
+        usage: Printed when argv is empty and no daemon is configured
+    """
+    if not argv and not os.getenv("MCP_DAEMON_SOCKET"):
+        print(usage)
+        await client.cleanup()
+        sys.exit(1)
+
+    try:
+        await client.connect_to_servers(load_server_specs(argv) if argv else [])
+        await client.chat_loop()
+    finally:
+        await client.cleanup()
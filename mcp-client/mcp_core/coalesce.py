@@ -0,0 +1,196 @@
+"""Merge concurrent single-file reads into ``read_multiple_files`` calls.
+
+Models often ask for several files in one turn as separate
+``read_text_file`` calls, and each becomes its own JSON-RPC round-trip even
+though the filesystem server can read them all in one
+``read_multiple_files`` call. With ``TOOL_COALESCE=1``,
+``CoalescingSession`` holds plain ``read_text_file`` calls (a ``path`` and
+nothing else) for ``TOOL_COALESCE_WINDOW_MS`` milliseconds (default 2),
+sends every call collected for the same server in that window as one batch
+of at most ``TOOL_COALESCE_MAX`` paths (default 16), and splits the
+combined result back into one result per call.
+
+The calls of one model turn are dispatched together, so they share a
+window; concurrent queries on one client do too. A batch whose result
+cannot be split is retried as separate calls, so coalescing never changes
+what a call returns.
+"""
+
+import asyncio
+import os
+from typing import Optional
+
+from mcp import types
+
+from mcp_core.cache import tool_name
+
+BATCH_TOOL = "read_multiple_files"
+
+# How the filesystem server joins the files of one read_multiple_files result
+SEPARATOR = "\n---\n"
+
+
+def split_multiple_files(text: str, paths: list[str]) -> Optional[list[tuple]]:
+    """Split a ``read_multiple_files`` result into ``(ok, text)`` per path
+
+    Each file appears as ``<path>:\\n<content>\\n`` or
+    ``<path>: Error - <message>``, in the order requested, joined by
+    ``SEPARATOR``.
+
+    Returns:
+        One entry per path, or None if the text does not have that shape
+    """
+    parts = []
+    pos = 0
+    for i, path in enumerate(paths):
+        if i + 1 < len(paths):
+            end = text.find(f"{SEPARATOR}{paths[i + 1]}:", pos + len(path))
+            if end < 0:
+                return None
+        else:
+            end = len(text)
+        entry = text[pos:end]
+        error = f"{path}: Error - "
+        if entry.startswith(f"{path}:\n") and entry.endswith("\n"):
+            parts.append((True, entry[len(path) + 2 : -1]))
+        elif entry.startswith(error):
+            parts.append((False, entry[len(error) :]))
+        else:
+            return None
+        pos = end + len(SEPARATOR)
+    return parts
+
+
+def _text_result(text: str, is_error: bool = False) -> types.CallToolResult:
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=text)], isError=is_error
+    )
+
+
+class CoalescingSession:
+    """Session wrapper that batches concurrent ``read_text_file`` calls
+
+    Everything else is passed through to the wrapped session or router.
+    """
+
+    def __init__(self, session, window: float = 0.002, max_batch: int = 16):
+        self.session = session
+        self.window = window
+        self.max_batch = max_batch
+        # server prefix -> [(tool name, path, future)] waiting for the window
+        self._pending: dict[str, list[tuple[str, str, asyncio.Future]]] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+        self.calls = 0
+        self.batches = 0
+        self.fallbacks = 0
+
+    @classmethod
+    def from_env(cls, session) -> "CoalescingSession":
+        return cls(
+            session,
+            window=float(os.getenv("TOOL_COALESCE_WINDOW_MS", "2")) / 1000,
+            max_batch=int(os.getenv("TOOL_COALESCE_MAX", "16")),
+        )
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def _batchable(self, prefix: str) -> bool:
+        tools = await self.session.tool_catalog.tools()
+        return any(tool.name == prefix + BATCH_TOOL for tool in tools)
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        tool = tool_name(name)
+        path = (arguments or {}).get("path")
+        prefix = name[: len(name) - len(tool)]
+        if (
+            tool != "read_text_file"
+            or set(arguments or {}) != {"path"}
+            or not isinstance(path, str)
+            or not await self._batchable(prefix)
+        ):
+            return await self.session.call_tool(name, arguments)
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(prefix, [])
+        batch.append((name, path, future))
+        self.calls += 1
+        if len(batch) >= self.max_batch:
+            self._flush(prefix)
+        elif len(batch) == 1:
+            self._timers[prefix] = loop.call_later(self.window, self._flush, prefix)
+        return await future
+
+    def _flush(self, prefix: str):
+        timer = self._timers.pop(prefix, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(prefix, [])
+        if batch:
+            task = asyncio.ensure_future(self._run(prefix, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, prefix: str, batch: list):
+        # Callers that were cancelled while waiting are left out
+        batch = [call for call in batch if not call[2].done()]
+        paths = list(dict.fromkeys(path for _, path, _ in batch))
+        if len(paths) > 1:
+            try:
+                combined = await self.session.call_tool(
+                    prefix + BATCH_TOOL, {"paths": paths}
+                )
+                parts = None
+                if not combined.isError:
+                    text = "".join(
+                        p.text for p in combined.content if p.type == "text"
+                    )
+                    parts = split_multiple_files(text, paths)
+            except Exception:
+                parts = None
+            if parts is not None:
+                self.batches += 1
+                results = {
+                    path: _text_result(
+                        text if ok else f"Error: {text}", is_error=not ok
+                    )
+                    for path, (ok, text) in zip(paths, parts)
+                }
+                for _, path, future in batch:
+                    if not future.done():
+                        future.set_result(results[path])
+                return
+            self.fallbacks += 1
+
+        await asyncio.gather(*(self._single(*call) for call in batch))
+
+    async def _single(self, name: str, path: str, future: asyncio.Future):
+        try:
+            result = await self.session.call_tool(name, {"path": path})
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        if not future.done():
+            future.set_result(result)
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "batches": self.batches,
+            "fallbacks": self.fallbacks,
+        }
+
+    async def close(self):
+        for timer in self._timers.values():
+            timer.cancel()
+        for batch in self._pending.values():
+            for _, _, future in batch:
+                future.cancel()
+        self._timers.clear()
+        self._pending.clear()
+        for task in list(self._tasks):
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
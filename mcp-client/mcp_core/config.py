@@ -0,0 +1,11 @@
+"""Small helpers for reading client settings from the environment."""
+
+import os
+
+
+def env_flag(name: str, default: bool = False) -> bool:
+    """Read a boolean switch such as ``STREAM_RESPONSES=1``"""
+    value = os.getenv(name)
+    if value is None or value == "":
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
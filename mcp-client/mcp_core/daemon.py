@@ -0,0 +1,278 @@
+"""Keep MCP server sessions warm behind a local unix socket.
+
+Spawning ``node`` servers and running the MCP handshake dominates the
+startup of a short CLI invocation. The daemon does it once and then serves
+tool listing and tool calls to any number of clients:
+
+    python -m mcp_core.daemon servers.json          # or a script + args
+    MCP_DAEMON_SOCKET=/tmp/mcp-client-<uid>.sock python client_openai.py
+
+With ``MCP_DAEMON_SOCKET`` set, ``MCPClient`` attaches to a running daemon
+instead of spawning servers (falling back to spawning when nothing is
+listening), so startup takes milliseconds.
+
+The wire format is one JSON object per line. Requests carry an ``id``,
+``method`` (``hello``, ``list_tools``, ``call_tool`` or ``shutdown``) and
+``params``; responses echo the ``id`` with a ``result`` or an ``error``.
+Requests are answered concurrently, so responses may arrive out of order.
+The daemon also sends ``{"event": "tools_changed"}`` when a server's tool
+list changes.
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import signal
+import sys
+from typing import Optional
+
+from dotenv import load_dotenv
+from mcp import types
+
+from mcp_core.catalog import ToolCatalog
+from mcp_core.config import env_flag
+from mcp_core.servers import ServerRouter, load_server_specs
+from mcp_core.singleflight import SingleflightSession
+
+# Tool results (e.g. base64 images) can be far larger than asyncio's
+# default 64 KiB line limit
+LINE_LIMIT = 64 * 1024 * 1024
+
+
+class DaemonError(Exception):
+    """A request the daemon could not answer"""
+
+
+def default_socket() -> str:
+    return os.getenv("MCP_DAEMON_SOCKET") or f"/tmp/mcp-client-{os.getuid()}.sock"
+
+
+class Daemon:
+    """Serve a started ``ServerRouter`` on a unix socket"""
+
+    def __init__(self, router: ServerRouter, path: str):
+        self.router = router
+        self.path = path
+        self.stopped = asyncio.Event()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._writers: set[asyncio.StreamWriter] = set()
+
+    async def start(self):
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # stale socket from a previous run
+        self._server = await asyncio.start_unix_server(
+            self._handle, self.path, limit=LINE_LIMIT
+        )
+        os.chmod(self.path, 0o600)
+        self.router.tool_catalog.on_invalidate(self._tools_changed)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._writers):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+
+    def _tools_changed(self):
+        for writer in list(self._writers):
+            self._send(writer, {"event": "tools_changed"})
+
+    @staticmethod
+    def _send(writer: asyncio.StreamWriter, message: dict):
+        if not writer.is_closing():
+            writer.write(json.dumps(message).encode() + b"\n")
+
+    async def _handle(self, reader, writer):
+        self._writers.add(writer)
+        tasks = set()
+        try:
+            while line := await reader.readline():
+                task = asyncio.create_task(self._answer(writer, json.loads(line)))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            for task in tasks:
+                task.cancel()
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _answer(self, writer, request: dict):
+        response = {"id": request.get("id")}
+        try:
+            response["result"] = await self._dispatch(
+                request.get("method"), request.get("params") or {}
+            )
+        except Exception as e:
+            response["error"] = f"{type(e).__name__}: {e}"
+        self._send(writer, response)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass  # the client went away; nothing to report to
+
+    async def _dispatch(self, method: str, params: dict):
+        if method == "hello":
+            return {
+                "servers": list(self.router.pools),
+                "max_concurrency": self.router.max_concurrency,
+            }
+        if method == "list_tools":
+            tools = await self.router.tool_catalog.tools()
+            return [tool.model_dump(mode="json") for tool in tools]
+        if method == "call_tool":
+            result = await self.router.call_tool(
+                params["name"], params.get("arguments")
+            )
+            return result.model_dump(mode="json")
+        if method == "shutdown":
+            self.stopped.set()
+            return None
+        raise DaemonError(f"Unknown method: {method}")
+
+
+class RemoteSession:
+    """Session-like view of a daemon: ``tool_catalog`` and ``call_tool``"""
+
+    def __init__(self, reader, writer):
+        self._reader = reader
+        self._writer = writer
+        self._ids = itertools.count(1)
+        self._pending: dict[int, asyncio.Future] = {}
+        self._receiver = asyncio.create_task(self._receive())
+        self.tool_catalog = ToolCatalog(self._fetch_tools)
+        self.servers: list[str] = []
+        self.max_concurrency = 4
+
+    @classmethod
+    async def connect(cls, path: Optional[str] = None) -> "RemoteSession":
+        """Attach to a running daemon
+
+        Raises:
+            OSError: Nothing is listening on the socket
+        """
+        reader, writer = await asyncio.open_unix_connection(
+            path or default_socket(), limit=LINE_LIMIT
+        )
+        session = cls(reader, writer)
+        hello = await session.request("hello")
+        session.servers = hello["servers"]
+        session.max_concurrency = hello["max_concurrency"]
+        return session
+
+    async def _receive(self):
+        try:
+            while line := await self._reader.readline():
+                message = json.loads(line)
+                if message.get("event") == "tools_changed":
+                    self.tool_catalog.invalidate()
+                    continue
+                future = self._pending.pop(message.get("id"), None)
+                if future is None or future.done():
+                    continue
+                if "error" in message:
+                    future.set_exception(DaemonError(message["error"]))
+                else:
+                    future.set_result(message.get("result"))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(DaemonError("Daemon connection closed"))
+            self._pending.clear()
+
+    async def request(self, method: str, params: Optional[dict] = None):
+        if self._receiver.done():
+            raise DaemonError("Daemon connection closed")
+        id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[id] = future
+        message = {"id": id, "method": method, "params": params or {}}
+        self._writer.write(json.dumps(message).encode() + b"\n")
+        await self._writer.drain()
+        return await future
+
+    async def _fetch_tools(self) -> list[types.Tool]:
+        tools = await self.request("list_tools")
+        return [types.Tool.model_validate(tool) for tool in tools]
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        result = await self.request(
+            "call_tool", {"name": name, "arguments": arguments}
+        )
+        return types.CallToolResult.model_validate(result)
+
+    async def close(self):
+        self._writer.close()
+        self._receiver.cancel()
+        await asyncio.gather(self._receiver, return_exceptions=True)
+
+
+async def attach(path: Optional[str] = None) -> Optional[RemoteSession]:
+    """Connect to a daemon, or return None when none is running"""
+    try:
+        return await RemoteSession.connect(path)
+    except OSError:
+        return None
+
+
+async def serve(argv: list[str], path: str):
+    router = ServerRouter(load_server_specs(argv))
+    await router.start()
+    session = router
+    if env_flag("TOOL_SINGLEFLIGHT"):
+        # Clients of one daemon often send the same reads at the same moment
+        session = SingleflightSession.from_env(router)
+    daemon = Daemon(session, path)
+    await daemon.start()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, daemon.stopped.set)
+    tools = await router.tool_catalog.tools()
+    print(f"Serving {len(tools)} tools on {path}", flush=True)
+    try:
+        await daemon.stopped.wait()
+    finally:
+        await daemon.close()
+        await router.close()
+
+
+async def stop(path: str):
+    session = await attach(path)
+    if session is None:
+        print(f"No daemon listening on {path}", file=sys.stderr)
+        return
+    try:
+        await session.request("shutdown")
+    except DaemonError:
+        pass  # the daemon may close the connection before answering
+    await session.close()
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        prog="python -m mcp_core.daemon",
+        description="Keep MCP server sessions warm behind a unix socket",
+    )
+    parser.add_argument("--socket", default=default_socket())
+    parser.add_argument("--stop", action="store_true", help="stop a running daemon")
+    parser.add_argument(
+        "server", nargs=argparse.REMAINDER, help="server script [args...] or config"
+    )
+    args = parser.parse_args()
+    if args.stop:
+        asyncio.run(stop(args.socket))
+    elif not args.server:
+        parser.error("a server script or servers.json is required")
+    else:
+        asyncio.run(serve(args.server, args.socket))
+
+
+if __name__ == "__main__":
+    main()
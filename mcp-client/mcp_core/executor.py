@@ -0,0 +1,61 @@
+"""Bounded-concurrency execution of the tool calls from one model turn.
+
+Models often fan out several independent calls (e.g. a handful of
+``read_text_file`` or ``get_weather`` calls) in a single turn. Awaiting them
+one by one makes the turn as slow as the sum of all calls, so they are
+dispatched together here, with a semaphore capping how many are in flight
+against a server at once.
+
+The limit is read from ``MCP_TOOL_CONCURRENCY_<SERVER>`` (e.g.
+``MCP_TOOL_CONCURRENCY_FILESYSTEM``), falling back to
+``MCP_TOOL_CONCURRENCY`` and then to 4.
+"""
+
+import asyncio
+import os
+import re
+from typing import Any, Optional
+
+
+def tool_concurrency(server: Optional[str] = None) -> int:
+    """Look up the concurrent tool call limit for a server"""
+    value = None
+    if server:
+        key = re.sub(r"[^A-Za-z0-9]+", "_", server).upper()
+        value = os.getenv(f"MCP_TOOL_CONCURRENCY_{key}")
+    return max(1, int(value or os.getenv("MCP_TOOL_CONCURRENCY", "4")))
+
+
+class ToolExecutor:
+    """Dispatch MCP tool calls in parallel with a bounded number in flight"""
+
+    def __init__(self, session, max_concurrency: int = 4):
+        self.session = session
+        self.max_concurrency = max_concurrency
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def call(self, name: str, arguments: Optional[dict] = None):
+        """Call a single tool once a concurrency slot is free"""
+        async with self._semaphore:
+            return await self.session.call_tool(name, arguments)
+
+    def start(self, name: str, arguments: Optional[dict] = None) -> asyncio.Task:
+        """Launch a tool call in the background, e.g. while a reply streams"""
+        return asyncio.create_task(self.call(name, arguments))
+
+    async def run(self, calls: list[tuple[str, Optional[dict]]]) -> list[Any]:
+        """Execute several tool calls concurrently
+
+        Args:
+            calls: ``(tool_name, arguments)`` pairs in the order the model
+                requested them
+
+        Returns:
+            One entry per call, in the same order as ``calls``. A call that
+            raised is returned as its exception instead of a result, so one
+            failure does not discard the results of the others.
+        """
+        return await asyncio.gather(
+            *(self.start(name, arguments) for name, arguments in calls),
+            return_exceptions=True,
+        )
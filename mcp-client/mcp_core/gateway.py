@@ -0,0 +1,490 @@
+"""Serve ``MCPClient`` over HTTP so other services can send it queries.
+
+One warm process keeps the MCP server sessions and the LLM client open and
+answers any number of callers, so no request pays for spawning ``node`` or
+the MCP handshake:
+
+    python -m mcp_core.gateway --provider deepseek --port 8080 servers.json
+
+    curl -s localhost:8080/v1/query -H 'X-Tenant: search' \\
+        -d '{"query": "What is the weather in Oslo?"}'
+    curl -N localhost:8080/v1/query -d '{"query": "...", "stream": true}'
+
+Routes:
+
+- ``POST /v1/query``: body ``{"query": ..., "stream": false, "session":
+  null}``; returns
+  ``{"answer", "iterations", "tool_calls", "seconds"}``. With ``"stream":
+  true`` (or ``Accept: text/event-stream``) the reply is server-sent
+  events: ``text`` events as the answer streams, then ``done`` or ``error``
+- ``GET /healthz``: admission counters; 503 while draining
+- ``GET /metrics``: the client's Prometheus metrics
+
+Queries without a ``session`` are stateless: each runs through
+``process_query`` on its own, with no conversation history. Queries that
+name a ``session`` continue that conversation; its turns are kept in memory
+for the ``GATEWAY_MAX_SESSIONS`` (default 1000) most recently used sessions,
+and queries of one session run one at a time. The caller's tenant is the
+``X-Tenant`` header.
+
+Admission control (``AdmissionController``) bounds the work in flight:
+
+- ``GATEWAY_MAX_CONCURRENCY``: queries running at once (default 16)
+- ``GATEWAY_MAX_QUEUE``: queries waiting for a slot (default 64)
+- ``GATEWAY_TENANT_CONCURRENCY`` / ``GATEWAY_TENANT_QUEUE``: the same per
+  tenant (default 4 and 16), so one busy caller cannot starve the others
+- ``GATEWAY_QUEUE_TIMEOUT``: seconds a query may wait (default 30)
+
+Requests over a queue limit get 429 and ones that wait too long get 503.
+On SIGTERM or SIGINT the gateway drains: new queries get 503, running ones
+get up to ``GATEWAY_DRAIN_SECONDS`` (default 30) to finish, then the
+sessions are closed.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from mcp_core.budget import QueryRun
+from mcp_core.client import MCPClient
+from mcp_core.history import ConversationStore
+from mcp_core.providers import PROFILES, create_provider
+from mcp_core.servers import load_server_specs
+
+REASONS = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    429: "Too Many Requests",
+    500: "Internal Server Error",
+    503: "Service Unavailable",
+}
+
+
+class Rejected(Exception):
+    """A query that was not admitted"""
+
+    def __init__(self, status: int, reason: str):
+        super().__init__(reason)
+        self.status = status
+        self.reason = reason
+
+
+@dataclass
+class _Tenant:
+    semaphore: asyncio.Semaphore
+    running: int = 0
+    waiting: int = 0
+
+
+class AdmissionController:
+    """Global and per-tenant limits on running and queued queries"""
+
+    def __init__(
+        self,
+        max_concurrency: int = 16,
+        max_queue: int = 64,
+        tenant_concurrency: int = 4,
+        tenant_queue: int = 16,
+        queue_timeout: float = 30.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.tenant_concurrency = tenant_concurrency
+        self.tenant_queue = tenant_queue
+        self.queue_timeout = queue_timeout
+        self._slots = asyncio.Semaphore(max_concurrency)
+        self._tenants: dict[str, _Tenant] = {}
+        self.running = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+
+    @classmethod
+    def from_env(cls) -> "AdmissionController":
+        return cls(
+            max_concurrency=int(os.getenv("GATEWAY_MAX_CONCURRENCY", "16")),
+            max_queue=int(os.getenv("GATEWAY_MAX_QUEUE", "64")),
+            tenant_concurrency=int(os.getenv("GATEWAY_TENANT_CONCURRENCY", "4")),
+            tenant_queue=int(os.getenv("GATEWAY_TENANT_QUEUE", "16")),
+            queue_timeout=float(os.getenv("GATEWAY_QUEUE_TIMEOUT", "30")),
+        )
+
+    def _reject(self, status: int, reason: str):
+        self.rejected += 1
+        raise Rejected(status, reason)
+
+    @asynccontextmanager
+    async def admit(self, tenant: str):
+        """Hold a slot for one query of ``tenant``
+
+        Raises:
+            Rejected: A queue is full (429) or no slot freed up in time (503)
+        """
+        state = self._tenants.get(tenant)
+        if state is None:
+            state = self._tenants[tenant] = _Tenant(
+                asyncio.Semaphore(self.tenant_concurrency)
+            )
+        if state.semaphore.locked() and state.waiting >= self.tenant_queue:
+            self._reject(429, f"too many queries queued for tenant {tenant!r}")
+        if self._slots.locked() and self.waiting >= self.max_queue:
+            self._reject(429, "too many queries queued")
+
+        state.waiting += 1
+        self.waiting += 1
+        acquired = False
+        try:
+            await asyncio.wait_for(self._acquire(state), self.queue_timeout)
+            acquired = True
+        except asyncio.TimeoutError:
+            self._reject(503, "timed out waiting for a free slot")
+        finally:
+            state.waiting -= 1
+            self.waiting -= 1
+            if not acquired:
+                self._forget(tenant, state)
+
+        state.running += 1
+        self.running += 1
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            state.running -= 1
+            self.running -= 1
+            self._slots.release()
+            state.semaphore.release()
+            self._forget(tenant, state)
+
+    async def _acquire(self, state: _Tenant):
+        # The tenant's own limit first, so a tenant at its limit does not
+        # hold global slots while it waits
+        await state.semaphore.acquire()
+        try:
+            await self._slots.acquire()
+        except BaseException:
+            state.semaphore.release()
+            raise
+
+    def _forget(self, tenant: str, state: _Tenant):
+        if not state.running and not state.waiting:
+            self._tenants.pop(tenant, None)
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "tenants": {
+                name: {"running": t.running, "waiting": t.waiting}
+                for name, t in self._tenants.items()
+            },
+        }
+
+
+@dataclass
+class _Session:
+    history: ConversationStore
+    lock: asyncio.Lock
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    headers: dict
+    body: bytes
+
+
+async def read_request(reader, max_body: int = 1 << 20) -> Optional[Request]:
+    """Read one HTTP request, or return None if the peer closed first
+
+    Raises:
+        Rejected: Malformed request line or Content-Length (400), or body
+            over max_body (413)
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+    parts = request_line.decode("latin-1").split()
+    if len(parts) < 2:
+        raise Rejected(400, "malformed request line")
+    headers = {}
+    while True:
+        line = (await reader.readline()).decode("latin-1").strip()
+        if not line:
+            break
+        key, _, value = line.partition(":")
+        headers[key.strip().lower()] = value.strip()
+    try:
+        length = int(headers.get("content-length") or 0)
+    except ValueError:
+        raise Rejected(400, "bad Content-Length") from None
+    if length < 0:
+        raise Rejected(400, "bad Content-Length")
+    if length > max_body:
+        raise Rejected(413, f"body over {max_body} bytes")
+    body = await reader.readexactly(length) if length else b""
+    return Request(parts[0].upper(), parts[1].split("?")[0], headers, body)
+
+
+async def send_response(writer, status: int, content_type: str, data: bytes):
+    writer.write(
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+        f"Content-Type: {content_type}\r\n"
+        f"Content-Length: {len(data)}\r\n"
+        "Connection: close\r\n\r\n".encode()
+        + data
+    )
+    await writer.drain()
+
+
+async def send_json(writer, status: int, payload: dict):
+    data = json.dumps(payload).encode()
+    await send_response(writer, status, "application/json", data)
+
+
+class Gateway:
+    """HTTP front end for a connected ``MCPClient``"""
+
+    def __init__(
+        self,
+        client: MCPClient,
+        admission: Optional[AdmissionController] = None,
+        max_body: int = 1 << 20,
+        max_sessions: Optional[int] = None,
+    ):
+        self.client = client
+        self.admission = admission or AdmissionController.from_env()
+        self.max_body = max_body
+        if max_sessions is None:
+            max_sessions = int(os.getenv("GATEWAY_MAX_SESSIONS", "1000"))
+        self.max_sessions = max_sessions
+        self._sessions: OrderedDict[str, _Session] = OrderedDict()
+        self.draining = False
+        self.port: Optional[int] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._queries: set[asyncio.Task] = set()
+
+    async def start(self, port: int = 8080, host: str = "127.0.0.1"):
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def drain(self, timeout: float = 30.0):
+        """Refuse new queries and give running ones ``timeout`` seconds"""
+        self.draining = True
+        if self._queries:
+            _, late = await asyncio.wait(list(self._queries), timeout=timeout)
+            for task in late:
+                task.cancel()
+            await asyncio.gather(*late, return_exceptions=True)
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        try:
+            try:
+                request = await read_request(reader, self.max_body)
+                if request is not None:
+                    await self._route(request, reader, writer)
+            except Rejected as e:
+                await send_json(writer, e.status, {"error": e.reason})
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    async def _route(self, request: Request, reader, writer):
+        if request.path == "/healthz":
+            status = 503 if self.draining else 200
+            body = {
+                "status": "draining" if self.draining else "ok",
+                "sessions": len(self._sessions),
+            }
+            await send_json(writer, status, {**body, **self.admission.stats()})
+        elif request.path == "/metrics":
+            data = self.client.telemetry.metrics_text().encode()
+            await send_response(writer, 200, "text/plain; version=0.0.4", data)
+        elif request.path == "/v1/query":
+            if request.method != "POST":
+                raise Rejected(405, "use POST")
+            await self._query(request, reader, writer)
+        else:
+            raise Rejected(404, f"no route {request.path}")
+
+    async def _query(self, request: Request, reader, writer):
+        if self.draining:
+            raise Rejected(503, "draining")
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            raise Rejected(400, "body must be JSON") from None
+        query = payload.get("query") if isinstance(payload, dict) else None
+        if not isinstance(query, str) or not query.strip():
+            raise Rejected(400, "'query' must be a non-empty string")
+        accept = request.headers.get("accept", "")
+        stream = bool(payload.get("stream")) or "text/event-stream" in accept
+        tenant = request.headers.get("x-tenant") or "default"
+        session_id = payload.get("session")
+        if session_id is not None and not isinstance(session_id, str):
+            raise Rejected(400, "'session' must be a string")
+
+        # Tracked while queued too, so a drain waits for every accepted query
+        task = asyncio.current_task()
+        self._queries.add(task)
+
+        # A caller that hangs up cancels its query
+        def hung_up(watcher: asyncio.Future):
+            if watcher.cancelled():
+                return
+            if watcher.exception() is not None or watcher.result() == b"":
+                task.cancel()
+
+        watcher = asyncio.ensure_future(reader.read(1))
+        watcher.add_done_callback(hung_up)
+        try:
+            if session_id is None:
+                async with self.admission.admit(tenant):
+                    await self._run(query, stream, writer, None)
+                return
+            # Queries queued behind their session's lock hold no slot
+            session = self._session(session_id)
+            async with session.lock, self.admission.admit(tenant):
+                await self._run(query, stream, writer, session.history)
+        finally:
+            watcher.remove_done_callback(hung_up)
+            watcher.cancel()
+            self._queries.discard(task)
+
+    def _session(self, session_id: str) -> _Session:
+        """The session's state, evicting the least recently used if full"""
+        session = self._sessions.get(session_id)
+        if session is None:
+            # Sessions compact like the client's own history does
+            summarizer = self.client.history.summarizer
+            session = _Session(
+                ConversationStore.from_env(summarizer=summarizer), asyncio.Lock()
+            )
+            self._sessions[session_id] = session
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        self._sessions.move_to_end(session_id)
+        return session
+
+    async def _run(self, query: str, stream: bool, writer, history):
+        if stream:
+            await self._stream_query(query, writer, history)
+        else:
+            await self._answer_query(query, writer, history)
+
+    async def _answer_query(self, query: str, writer, history=None):
+        run = QueryRun()
+        started = time.monotonic()
+        try:
+            answer = await self.client.process_query(
+                query, run=run, history=history
+            )
+        except Exception as e:
+            await send_json(writer, 500, {"error": str(e)})
+            return
+        await send_json(writer, 200, self._summary(answer, run, started))
+
+    async def _stream_query(self, query: str, writer, history=None):
+        writer.write(
+            b"HTTP/1.1 200 OK\r\n"
+            b"Content-Type: text/event-stream\r\n"
+            b"Cache-Control: no-cache\r\n"
+            b"Connection: close\r\n\r\n"
+        )
+
+        def event(name: str, data: dict):
+            writer.write(f"event: {name}\ndata: {json.dumps(data)}\n\n".encode())
+
+        run = QueryRun()
+        started = time.monotonic()
+        try:
+            answer = await self.client.process_query(
+                query,
+                on_text=lambda text: event("text", {"text": text}),
+                run=run,
+                history=history,
+            )
+        except Exception as e:
+            event("error", {"error": str(e)})
+        else:
+            event("done", self._summary(answer, run, started))
+        await writer.drain()
+
+    @staticmethod
+    def _summary(answer: str, run: QueryRun, started: float) -> dict:
+        return {
+            "answer": answer,
+            "iterations": len(run.iterations),
+            "tool_calls": run.tool_calls,
+            "seconds": round(time.monotonic() - started, 3),
+        }
+
+
+async def serve(args):
+    client = MCPClient(create_provider(args.provider), debug=False)
+    try:
+        specs = load_server_specs(args.server) if args.server else []
+        await client.connect_to_servers(specs)
+        gateway = Gateway(client, AdmissionController.from_env())
+        await gateway.start(args.port, args.host)
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        print(f"Serving on http://{args.host}:{gateway.port}", flush=True)
+        await stop.wait()
+        print("Draining ...", flush=True)
+        await gateway.drain(float(os.getenv("GATEWAY_DRAIN_SECONDS", "30")))
+        await gateway.close()
+    finally:
+        await client.cleanup()
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        prog="python -m mcp_core.gateway",
+        description="Serve MCPClient queries over HTTP",
+    )
+    parser.add_argument(
+        "--provider",
+        choices=sorted(PROFILES),
+        help="LLM backend (default: LLM_PROVIDER or deepseek)",
+    )
+    parser.add_argument("--host", default=os.getenv("GATEWAY_HOST", "127.0.0.1"))
+    parser.add_argument(
+        "--port", type=int, default=int(os.getenv("GATEWAY_PORT", "8080"))
+    )
+    parser.add_argument(
+        "server", nargs=argparse.REMAINDER, help="server script [args...] or config"
+    )
+    args = parser.parse_args()
+    if not args.server and not os.getenv("MCP_DAEMON_SOCKET"):
+        parser.error("a server script or servers.json is required")
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
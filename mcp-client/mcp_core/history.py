@@ -0,0 +1,170 @@
+"""Conversation history that stays within a token budget.
+
+``chat_loop`` keeps one ``ConversationStore`` so follow-up questions see
+earlier turns. Every message is stored with an estimate of its token
+count, and before each query the store is compacted back under budget:
+
+1. Tool results in older turns (usually large ``read_text_file`` payloads)
+   are replaced by a summary, or by a short placeholder when no summarizer
+   is configured. The most recent turns are left intact.
+2. If that is not enough, the oldest turns are dropped whole, so tool
+   calls and their results never get separated.
+3. If the recent turns alone are still over budget, their tool results
+   are compacted as well.
+
+Settings come from ``HISTORY_MAX_TOKENS`` (default 8000) and
+``HISTORY_KEEP_TURNS`` (default 2).
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+# Rough characters-per-token ratio used for estimates
+CHARS_PER_TOKEN = 4
+
+# Tool results shorter than this are not worth summarizing
+MIN_COMPACT_TOKENS = 200
+
+# Longest tool result text handed to the summarizer
+MAX_SUMMARY_INPUT_CHARS = 24000
+
+# System prompt for clients that summarize with their own model
+SUMMARY_PROMPT = (
+    "Summarize this tool output in a few sentences. Keep file names, paths, "
+    "numbers and anything a follow-up question is likely to need."
+)
+
+
+def _plain(value):
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True)
+    return str(value)
+
+
+def estimate_tokens(message: dict) -> int:
+    """Estimate the prompt tokens a message will cost"""
+    text = json.dumps(message, default=_plain, ensure_ascii=False)
+    return len(text) // CHARS_PER_TOKEN + 4
+
+
+def _tool_result_text(block) -> str:
+    content = block.get("content")
+    if isinstance(content, str):
+        return content
+    return "\n".join(
+        part.get("text", "") if isinstance(part, dict) else str(part)
+        for part in content or []
+    )
+
+
+@dataclass
+class Turn:
+    """One user query and every message the tool loop added for it"""
+
+    messages: list[dict]
+    tokens: list[int] = field(default_factory=list)
+    compacted: bool = False
+
+    def __post_init__(self):
+        if not self.tokens:
+            self.tokens = [estimate_tokens(m) for m in self.messages]
+
+    @property
+    def total(self) -> int:
+        return sum(self.tokens)
+
+
+class ConversationStore:
+    """Messages from earlier turns of a conversation"""
+
+    def __init__(
+        self,
+        max_tokens: int = 8000,
+        keep_turns: int = 2,
+        summarizer: Optional[Callable[[str], Awaitable[str]]] = None,
+    ):
+        """
+        Args:
+            max_tokens: Budget for the history sent with each query
+            keep_turns: Recent turns whose tool results are never compacted
+            summarizer: Optional async function that condenses a tool result;
+                without it, compacted results are replaced by a placeholder
+        """
+        self.max_tokens = max_tokens
+        self.keep_turns = keep_turns
+        self.summarizer = summarizer
+        self.turns: list[Turn] = []
+
+    @classmethod
+    def from_env(cls, summarizer=None) -> "ConversationStore":
+        return cls(
+            max_tokens=int(os.getenv("HISTORY_MAX_TOKENS", "8000")),
+            keep_turns=int(os.getenv("HISTORY_KEEP_TURNS", "2")),
+            summarizer=summarizer,
+        )
+
+    @property
+    def total_tokens(self) -> int:
+        return sum(turn.total for turn in self.turns)
+
+    def messages(self) -> list[dict]:
+        """All stored messages, oldest first"""
+        return [m for turn in self.turns for m in turn.messages]
+
+    def add_turn(self, messages: list[dict]):
+        """Store the messages of a finished query"""
+        if messages:
+            self.turns.append(Turn(list(messages)))
+
+    def clear(self):
+        self.turns = []
+
+    async def compact(self):
+        """Bring the history back under ``max_tokens``"""
+        older = self.turns[: max(0, len(self.turns) - self.keep_turns)]
+        for turn in older:
+            if self.total_tokens <= self.max_tokens:
+                return
+            if not turn.compacted:
+                await self._compact_turn(turn)
+
+        while len(self.turns) > self.keep_turns and self.total_tokens > self.max_tokens:
+            self.turns.pop(0)
+
+        # Last resort: the recent turns alone are over budget
+        for turn in self.turns:
+            if self.total_tokens <= self.max_tokens:
+                return
+            if not turn.compacted:
+                await self._compact_turn(turn)
+
+    async def _compact_turn(self, turn: Turn):
+        for i, message in enumerate(turn.messages):
+            if turn.tokens[i] < MIN_COMPACT_TOKENS:
+                continue
+            if message.get("role") == "tool":
+                text = await self._condense(message["content"], turn.tokens[i])
+                turn.messages[i] = {**message, "content": text}
+            elif message.get("role") == "user" and isinstance(
+                message.get("content"), list
+            ):
+                blocks = []
+                for block in message["content"]:
+                    if isinstance(block, dict) and block.get("type") == "tool_result":
+                        text = _tool_result_text(block)
+                        tokens = len(text) // CHARS_PER_TOKEN
+                        block = {**block, "content": await self._condense(text, tokens)}
+                    blocks.append(block)
+                turn.messages[i] = {**message, "content": blocks}
+            else:
+                continue
+            turn.tokens[i] = estimate_tokens(turn.messages[i])
+        turn.compacted = True
+
+    async def _condense(self, text: str, tokens: int) -> str:
+        if self.summarizer is not None and text:
+            summary = await self.summarizer(text[:MAX_SUMMARY_INPUT_CHARS])
+            return f"[Summary of an earlier tool result] {summary}"
+        return f"[Earlier tool result of ~{tokens} tokens removed to save space]"
@@ -0,0 +1,87 @@
+"""Async LLM clients shared by the MCP client scripts.
+
+Every client is built around one pooled ``httpx.AsyncClient`` so repeated
+model calls reuse keep-alive connections instead of reconnecting, and so
+``process_query`` never blocks the event loop while waiting on the model.
+
+Timeouts and pool sizes are read from the environment:
+
+- ``LLM_TIMEOUT``: overall request timeout in seconds (default 120)
+- ``LLM_CONNECT_TIMEOUT``: connect timeout in seconds (default 10)
+- ``LLM_MAX_CONNECTIONS``: connection pool size (default 20)
+- ``LLM_MAX_RETRIES``: SDK-level retries on transient errors (default 2)
+
+Each of them can be overridden per provider with the env prefix, e.g.
+``DEEPSEEK_TIMEOUT``.
+
+The SDKs are imported when a client is first created, since importing
+``anthropic`` or ``openai`` takes a large share of the client's startup.
+"""
+
+import os
+from typing import TYPE_CHECKING, Optional
+
+import httpx
+
+if TYPE_CHECKING:
+    from anthropic import AsyncAnthropic
+    from openai import AsyncOpenAI
+
+
+def _env(prefix: str, name: str, default: str) -> str:
+    return os.getenv(f"{prefix}_{name}") or os.getenv(f"LLM_{name}", default)
+
+
+def http_timeout(prefix: str = "LLM") -> httpx.Timeout:
+    """Build the request timeout for a provider from the environment"""
+    return httpx.Timeout(
+        float(_env(prefix, "TIMEOUT", "120")),
+        connect=float(_env(prefix, "CONNECT_TIMEOUT", "10")),
+    )
+
+
+def http_client(prefix: str = "LLM") -> httpx.AsyncClient:
+    """Create a pooled async HTTP client for a provider
+
+    Args:
+        prefix: Env var prefix used to look up overrides (e.g. ``CLAUDE``)
+    """
+    max_connections = int(_env(prefix, "MAX_CONNECTIONS", "20"))
+    return httpx.AsyncClient(
+        timeout=http_timeout(prefix),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+        follow_redirects=True,
+    )
+
+
+def create_anthropic(
+    prefix: str = "CLAUDE", client: Optional[httpx.AsyncClient] = None
+) -> "AsyncAnthropic":
+    """Create an ``AsyncAnthropic`` client configured from ``<prefix>_*`` vars"""
+    from anthropic import AsyncAnthropic
+
+    return AsyncAnthropic(
+        base_url=os.getenv(f"{prefix}_BASE_URL"),
+        api_key=os.getenv(f"{prefix}_API_KEY"),
+        timeout=http_timeout(prefix),
+        max_retries=int(_env(prefix, "MAX_RETRIES", "2")),
+        http_client=client or http_client(prefix),
+    )
+
+
+def create_openai(
+    prefix: str, client: Optional[httpx.AsyncClient] = None
+) -> "AsyncOpenAI":
+    """Create an ``AsyncOpenAI`` client configured from ``<prefix>_*`` vars"""
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(
+        base_url=os.getenv(f"{prefix}_BASE_URL"),
+        api_key=os.getenv(f"{prefix}_API_KEY"),
+        timeout=http_timeout(prefix),
+        max_retries=int(_env(prefix, "MAX_RETRIES", "2")),
+        http_client=client or http_client(prefix),
+    )
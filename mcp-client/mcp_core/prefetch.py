@@ -0,0 +1,272 @@
+"""Speculative reads of the files a listing is likely to be followed by.
+
+A ``list_directory`` or ``search_files`` result is usually followed by a
+``read_text_file`` or ``read_multiple_files`` on some of the paths it
+returned, one model round-trip later. With ``TOOL_PREFETCH=1``,
+``PrefetchSession`` starts those reads in the background as soon as the
+listing comes back, so the follow-up call is answered without waiting on
+the server.
+
+Each listing tool has a rule that picks the candidate paths from its
+result:
+
+- ``list_directory``: ``[FILE]`` entries, joined to the listed directory
+- ``list_directory_with_sizes``: the same, skipping files larger than
+  ``TOOL_PREFETCH_MAX_FILE_BYTES`` (default 256 KiB)
+- ``search_files``: the matched paths
+
+Only files with a text-like extension are read, at most
+``TOOL_PREFETCH_MAX_FILES`` (default 4) per listing. Prefetched results are
+kept for ``TOOL_PREFETCH_TTL`` seconds (default 30) and their total size
+stays under ``TOOL_PREFETCH_MAX_BYTES`` (default 1 MiB), oldest first out.
+Mutating tools drop the prefetched files under the paths they touch.
+"""
+
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+from mcp import types
+
+from mcp_core.cache import MUTATING_TOOLS, argument_paths, paths_overlap, tool_name
+
+READ_TOOL = "read_text_file"
+
+TEXT_EXTENSIONS = frozenset(
+    ".c .cfg .conf .cpp .css .csv .go .h .html .ini .java .js .json .jsx .log"
+    " .md .py .rs .rst .sh .sql .toml .ts .tsx .txt .xml .yaml .yml".split()
+)
+
+_FILE_ENTRY = re.compile(r"^\[FILE\] (.+)$")
+_SIZED_ENTRY = re.compile(r"^\[FILE\] (.+?)\s+([\d.]+) (Bytes|KB|MB|GB|TB)\s*$")
+_SIZE_UNITS = {"Bytes": 1, "KB": 1 << 10, "MB": 1 << 20, "GB": 1 << 30, "TB": 1 << 40}
+
+
+def _result_text(result) -> str:
+    parts = getattr(result, "content", None) or []
+    return "\n".join(part.text for part in parts if part.type == "text")
+
+
+def _text_file(path: str) -> bool:
+    return os.path.splitext(path)[1].lower() in TEXT_EXTENSIONS
+
+
+def _normalize(path: str) -> str:
+    return os.path.normpath(os.path.expanduser(path))
+
+
+@dataclass
+class _Prefetch:
+    task: asyncio.Task
+    expires_at: float
+    size: int = 0
+
+
+class Prefetcher:
+    """Background reads keyed by normalized path, with a TTL and byte budget"""
+
+    def __init__(
+        self,
+        max_files: int = 4,
+        max_bytes: int = 1 << 20,
+        max_file_bytes: int = 256 << 10,
+        ttl: float = 30.0,
+    ):
+        self.max_files = max_files
+        self.max_bytes = max_bytes
+        self.max_file_bytes = max_file_bytes
+        self.ttl = ttl
+        self._entries: OrderedDict[str, _Prefetch] = OrderedDict()
+        self.issued = 0
+        self.hits = 0
+        self.misses = 0
+        self.wasted = 0
+
+    @classmethod
+    def from_env(cls) -> "Prefetcher":
+        return cls(
+            max_files=int(os.getenv("TOOL_PREFETCH_MAX_FILES", "4")),
+            max_bytes=int(os.getenv("TOOL_PREFETCH_MAX_BYTES", str(1 << 20))),
+            max_file_bytes=int(
+                os.getenv("TOOL_PREFETCH_MAX_FILE_BYTES", str(256 << 10))
+            ),
+            ttl=float(os.getenv("TOOL_PREFETCH_TTL", "30")),
+        )
+
+    def __contains__(self, path: str) -> bool:
+        return _normalize(path) in self._entries
+
+    @property
+    def size(self) -> int:
+        return sum(entry.size for entry in self._entries.values())
+
+    def candidates(self, tool: str, arguments: Optional[dict], result) -> list[str]:
+        """Paths a listing result is likely to be followed by reads of"""
+        text = _result_text(result)
+        arguments = arguments or {}
+        paths = []
+        if tool == "search_files":
+            paths = [line.strip() for line in text.splitlines()]
+            paths = [p for p in paths if p and p != "No matches found"]
+        elif tool in ("list_directory", "list_directory_with_sizes"):
+            directory = arguments.get("path")
+            if not isinstance(directory, str):
+                return []
+            for line in text.splitlines():
+                sized = _SIZED_ENTRY.match(line)
+                if sized:
+                    name, amount, unit = sized.groups()
+                    if float(amount) * _SIZE_UNITS[unit] > self.max_file_bytes:
+                        continue
+                else:
+                    entry = _FILE_ENTRY.match(line)
+                    if not entry or tool == "list_directory_with_sizes":
+                        continue
+                    name = entry.group(1)
+                paths.append(os.path.join(directory, name.strip()))
+        fresh = [p for p in paths if _text_file(p) and p not in self]
+        return fresh[: self.max_files]
+
+    def start(self, path: str, read) -> bool:
+        """Run the ``read`` coroutine for ``path`` in the background"""
+        self._expire()
+        key = _normalize(path)
+        in_flight = sum(not e.task.done() for e in self._entries.values())
+        if key in self._entries or in_flight >= self.max_files:
+            read.close()
+            return False
+        task = asyncio.ensure_future(read)
+        entry = self._entries[key] = _Prefetch(task, time.monotonic() + self.ttl)
+        task.add_done_callback(lambda t: self._finished(key, entry))
+        self.issued += 1
+        return True
+
+    def _finished(self, key: str, entry: _Prefetch):
+        if self._entries.get(key) is not entry:
+            return
+        task = entry.task
+        if task.cancelled() or task.exception() is not None:
+            del self._entries[key]
+            return
+        result = task.result()
+        entry.size = len(_result_text(result))
+        if getattr(result, "isError", False) or entry.size > self.max_bytes:
+            del self._entries[key]
+            self.wasted += 1
+            return
+        for other in list(self._entries):
+            if self.size <= self.max_bytes:
+                break
+            if other != key and self._entries[other].task.done():
+                del self._entries[other]
+                self.wasted += 1
+
+    def _expire(self):
+        now = time.monotonic()
+        for key, entry in list(self._entries.items()):
+            if entry.expires_at < now and entry.task.done():
+                del self._entries[key]
+                self.wasted += 1
+
+    async def take(self, path: str):
+        """The prefetched result for ``path``, or None
+
+        Waits for a read that is still in flight; a failed read counts as
+        a miss so the caller can make the call itself.
+        """
+        self._expire()
+        entry = self._entries.pop(_normalize(path), None)
+        if entry is None:
+            self.misses += 1
+            return None
+        try:
+            result = await asyncio.shield(entry.task)
+        except Exception:
+            result = None
+        if result is None or getattr(result, "isError", False):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return result
+
+    def invalidate_paths(self, paths: tuple[str, ...]):
+        for key in list(self._entries):
+            if any(paths_overlap(key, p) for p in paths):
+                self._entries.pop(key).task.cancel()
+
+    def close(self):
+        for entry in self._entries.values():
+            entry.task.cancel()
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {
+            "issued": self.issued,
+            "hits": self.hits,
+            "misses": self.misses,
+            "wasted": self.wasted,
+            "entries": len(self._entries),
+            "bytes": self.size,
+        }
+
+
+class PrefetchSession:
+    """Session wrapper that prefetches likely reads after listings
+
+    Everything except ``call_tool`` is passed through to the wrapped
+    session or router.
+    """
+
+    def __init__(self, session, prefetcher: Prefetcher):
+        self.session = session
+        self.prefetcher = prefetcher
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        tool = tool_name(name)
+        if tool in MUTATING_TOOLS:
+            self.prefetcher.invalidate_paths(argument_paths(arguments))
+            return await self.session.call_tool(name, arguments)
+
+        served = await self._serve(tool, arguments)
+        if served is not None:
+            return served
+
+        result = await self.session.call_tool(name, arguments)
+        if not getattr(result, "isError", False):
+            # Same server prefix as the listing, e.g. filesystem__read_text_file
+            read_tool = name[: len(name) - len(tool)] + READ_TOOL
+            for path in self.prefetcher.candidates(tool, arguments, result):
+                self.prefetcher.start(
+                    path, self.session.call_tool(read_tool, {"path": path})
+                )
+        return result
+
+    async def _serve(self, tool: str, arguments: Optional[dict]):
+        arguments = arguments or {}
+        if tool in ("read_text_file", "read_file") and set(arguments) == {"path"}:
+            return await self.prefetcher.take(arguments["path"])
+        if tool == "read_multiple_files":
+            paths = arguments.get("paths")
+            if not isinstance(paths, list) or not paths:
+                return None
+            if not all(isinstance(p, str) and p in self.prefetcher for p in paths):
+                return None
+            results = await asyncio.gather(*(self.prefetcher.take(p) for p in paths))
+            if any(r is None for r in results):
+                return None
+            # The server's own format: "<path>:\n<content>\n" per file
+            text = "\n---\n".join(
+                f"{path}:\n{_result_text(result)}\n"
+                for path, result in zip(paths, results)
+            )
+            return types.CallToolResult(
+                content=[types.TextContent(type="text", text=text)]
+            )
+        return None
@@ -0,0 +1,56 @@
+"""Anthropic prompt caching for the tool definitions and system prompt.
+
+With the filesystem server loaded, the tool schemas alone are thousands of
+tokens and are resent on every ``messages.create`` call. Marking cache
+breakpoints lets Anthropic reuse that prefix across calls:
+
+- after the last tool definition (the tool list is sorted by the catalog,
+  so its bytes do not change between calls)
+- after the system prompt, when there is one
+- after the newest message, so each round of the tool loop reuses the
+  transcript cached by the previous round
+
+Breakpoints are added to copies of the request data; the stored
+conversation is never modified, which keeps the request within
+Anthropic's limit of four breakpoints.
+"""
+
+from typing import Optional
+
+EPHEMERAL = {"type": "ephemeral"}
+
+
+def _block(block) -> dict:
+    if hasattr(block, "model_dump"):
+        return block.model_dump(exclude_none=True)
+    return dict(block)
+
+
+def cached_tools(tools: list[dict]) -> list[dict]:
+    """Copy of ``tools`` with a breakpoint after the last definition"""
+    if not tools:
+        return tools
+    return [*tools[:-1], {**tools[-1], "cache_control": EPHEMERAL}]
+
+
+def cached_system(system: Optional[str]) -> Optional[list[dict]]:
+    """System prompt as a text block carrying a breakpoint"""
+    if not system:
+        return None
+    return [{"type": "text", "text": system, "cache_control": EPHEMERAL}]
+
+
+def cached_messages(messages: list[dict]) -> list[dict]:
+    """Copy of ``messages`` with a breakpoint on the newest content block"""
+    if not messages:
+        return messages
+    last = messages[-1]
+    content = last["content"]
+    if isinstance(content, str):
+        blocks = [{"type": "text", "text": content}]
+    else:
+        blocks = [_block(block) for block in content]
+    if not blocks:
+        return messages
+    blocks[-1] = {**blocks[-1], "cache_control": EPHEMERAL}
+    return [*messages[:-1], {**last, "content": blocks}]
@@ -0,0 +1,347 @@
+"""LLM providers behind one interface for the shared tool loop.
+
+A provider owns everything that depends on the backend's wire format:
+the tool schema, how a reply is requested and streamed, and how the
+assistant turn and tool results are written back into the conversation.
+``mcp_core.client.MCPClient`` only sees ``ModelTurn`` and ``ToolCall``.
+
+Backends are picked by name from ``PROFILES`` (``LLM_PROVIDER`` in the
+environment); each profile names an adapter and the env var prefix that
+holds its key, base URL, model and system prompt.
+"""
+
+import json
+import os
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from mcp_core.config import env_flag
+from mcp_core.history import SUMMARY_PROMPT
+from mcp_core.llm import create_anthropic, create_openai
+from mcp_core.prompt_cache import cached_messages, cached_system, cached_tools
+from mcp_core.resilience import model_deadline
+from mcp_core.results import anthropic_content, result_text
+from mcp_core.streaming import stream_anthropic, stream_openai
+
+
+@dataclass
+class ToolCall:
+    """One tool call requested by the model"""
+
+    id: str
+    name: str
+    arguments: Any
+    error: Optional[str] = None  # why the arguments could not be used
+
+
+@dataclass
+class ModelTurn:
+    """One model reply, with the message to append to the conversation"""
+
+    text: str
+    tool_calls: list[ToolCall]
+    usage: Any
+    message: dict = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class Profile:
+    adapter: str  # "anthropic" or "openai"
+    prefix: str
+    default_model: str
+
+
+PROFILES = {
+    "claude": Profile("anthropic", "CLAUDE", "claude-sonnet-4-20250514"),
+    "deepseek": Profile("openai", "DEEPSEEK", "deepseek-chat"),
+    "intern": Profile("openai", "INTERN", "intern-s1"),
+}
+
+DEFAULT_PROVIDER = "deepseek"
+
+
+class Provider:
+    """Base class for LLM backends used by ``MCPClient``"""
+
+    def __init__(self, prefix: str, default_model: str, client=None):
+        self.prefix = prefix
+        self.model = os.getenv(f"{prefix}_MODEL", default_model)
+        self.max_tokens = int(os.getenv("MAX_TOKENS", "1000"))
+        self.system_prompt = os.getenv(f"{prefix}_SYSTEM_PROMPT")
+        self.deadline = model_deadline(prefix)
+        self._client = client
+
+    def _create_client(self):
+        raise NotImplementedError
+
+    @property
+    def client(self):
+        """The SDK client, created (and its SDK imported) on first use"""
+        if self._client is None:
+            self._client = self._create_client()
+        return self._client
+
+    def prepare(self):
+        """Import the SDK and build the client ahead of the first request
+
+        Blocking; ``MCPClient`` runs it in a thread while the MCP servers
+        start.
+        """
+        self.client
+
+    async def tools(self, catalog) -> list[dict]:
+        """Tool definitions in this provider's schema"""
+        raise NotImplementedError
+
+    def user_message(self, text: str) -> dict:
+        return {"role": "user", "content": text}
+
+    async def complete(
+        self,
+        messages: list[dict],
+        tools: list[dict],
+        on_text: Optional[Callable[[str], None]] = None,
+        on_tool_call: Optional[Callable[[ToolCall], None]] = None,
+        final: bool = False,
+    ) -> ModelTurn:
+        """Request the next reply, streaming it when on_text is set
+
+        Args:
+            messages: The conversation so far, in this provider's format
+            tools: Result of ``tools()``
+            on_text: Receives reply text as it streams; enables streaming
+            on_tool_call: Receives each tool call once its arguments have
+                streamed, so it can be started early
+            final: Forbid tool calls, forcing a plain answer
+        """
+        raise NotImplementedError
+
+    def tool_results(self, calls: list[ToolCall], results: list) -> list[dict]:
+        """Messages reporting tool results (or errors) back to the model"""
+        raise NotImplementedError
+
+    async def summarize(self, text: str) -> str:
+        """Condense an old tool result for the conversation history"""
+        raise NotImplementedError
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+
+
+def _error_text(result) -> str:
+    if isinstance(result, str):
+        return result
+    return f"Error: {result}"
+
+
+class OpenAIProvider(Provider):
+    """Any backend speaking the OpenAI chat completions API"""
+
+    def _create_client(self):
+        return create_openai(self.prefix)
+
+    async def tools(self, catalog) -> list[dict]:
+        return await catalog.openai_tools()
+
+    @staticmethod
+    def _tool_call(tc) -> ToolCall:
+        try:
+            arguments = json.loads(tc.function.arguments)
+        except json.JSONDecodeError as e:
+            return ToolCall(
+                tc.id,
+                tc.function.name,
+                tc.function.arguments,
+                f"Error parsing tool arguments: {e}",
+            )
+        if not isinstance(arguments, dict):
+            return ToolCall(
+                tc.id,
+                tc.function.name,
+                arguments,
+                f"Error: Tool arguments must be a dictionary, got {type(arguments)}",
+            )
+        return ToolCall(tc.id, tc.function.name, arguments)
+
+    async def complete(
+        self, messages, tools, on_text=None, on_tool_call=None, final=False
+    ) -> ModelTurn:
+        request = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": messages,
+            "tools": tools,
+        }
+        if self.system_prompt:
+            request["messages"] = [
+                {"role": "system", "content": self.system_prompt}
+            ] + messages
+        if final:
+            request["tool_choice"] = "none"
+
+        if on_text is None:
+            response = await self.client.chat.completions.create(**request)
+        else:
+
+            def announce(tc):
+                if on_tool_call is not None:
+                    on_tool_call(self._tool_call(tc))
+
+            response = await stream_openai(self.client, on_text, announce, **request)
+
+        message = response.choices[0].message
+        calls = [] if final else list(message.tool_calls or [])
+        assistant = {"role": "assistant", "content": message.content or ""}
+        if calls:
+            assistant["tool_calls"] = [
+                {
+                    "id": tc.id,
+                    "type": "function",
+                    "function": {
+                        "name": tc.function.name,
+                        "arguments": tc.function.arguments,
+                    },
+                }
+                for tc in calls
+            ]
+        return ModelTurn(
+            text=message.content or "",
+            tool_calls=[self._tool_call(tc) for tc in calls],
+            usage=response.usage,
+            message=assistant,
+        )
+
+    def tool_results(self, calls, results) -> list[dict]:
+        messages = []
+        for call, result in zip(calls, results):
+            if isinstance(result, (str, BaseException)):
+                content = _error_text(result)
+            else:
+                content = result_text(result)
+            messages.append(
+                {"role": "tool", "tool_call_id": call.id, "content": content}
+            )
+        return messages
+
+    async def summarize(self, text: str) -> str:
+        response = await self.client.chat.completions.create(
+            model=self.model,
+            max_tokens=300,
+            messages=[
+                {"role": "system", "content": SUMMARY_PROMPT},
+                {"role": "user", "content": text},
+            ],
+        )
+        return response.choices[0].message.content or ""
+
+
+class AnthropicProvider(Provider):
+    """Claude through the Anthropic messages API
+
+    ``<PREFIX>_PROMPT_CACHE`` marks the tools, system prompt and latest
+    message as cache breakpoints (see ``mcp_core.prompt_cache``).
+    """
+
+    def __init__(self, prefix: str, default_model: str, client=None):
+        super().__init__(prefix, default_model, client)
+        self.prompt_cache = env_flag(f"{prefix}_PROMPT_CACHE")
+
+    def _create_client(self):
+        return create_anthropic(self.prefix)
+
+    async def tools(self, catalog) -> list[dict]:
+        tools = await catalog.anthropic_tools()
+        return cached_tools(tools) if self.prompt_cache else tools
+
+    async def complete(
+        self, messages, tools, on_text=None, on_tool_call=None, final=False
+    ) -> ModelTurn:
+        request = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "messages": cached_messages(messages) if self.prompt_cache else messages,
+            "tools": tools,
+        }
+        if self.system_prompt:
+            request["system"] = (
+                cached_system(self.system_prompt)
+                if self.prompt_cache
+                else self.system_prompt
+            )
+        if final:
+            request["tool_choice"] = {"type": "none"}
+
+        if on_text is None:
+            response = await self.client.messages.create(**request)
+        else:
+
+            def announce(block):
+                if on_tool_call is not None:
+                    on_tool_call(ToolCall(block.id, block.name, block.input))
+
+            response = await stream_anthropic(
+                self.client, on_text, announce, **request
+            )
+
+        return ModelTurn(
+            text="".join(c.text for c in response.content if c.type == "text"),
+            tool_calls=[
+                ToolCall(c.id, c.name, c.input)
+                for c in response.content
+                if c.type == "tool_use"
+            ],
+            usage=response.usage,
+            message={"role": "assistant", "content": response.content},
+        )
+
+    def tool_results(self, calls, results) -> list[dict]:
+        blocks = []
+        for call, result in zip(calls, results):
+            if isinstance(result, (str, BaseException)):
+                blocks.append(
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": call.id,
+                        "content": _error_text(result),
+                        "is_error": True,
+                    }
+                )
+                continue
+            blocks.append(
+                {
+                    "type": "tool_result",
+                    "tool_use_id": call.id,
+                    "content": anthropic_content(result),
+                    "is_error": bool(getattr(result, "isError", False)),
+                }
+            )
+        return [{"role": "user", "content": blocks}]
+
+    async def summarize(self, text: str) -> str:
+        response = await self.client.messages.create(
+            model=self.model,
+            max_tokens=300,
+            system=SUMMARY_PROMPT,
+            messages=[{"role": "user", "content": text}],
+        )
+        return "".join(c.text for c in response.content if c.type == "text")
+
+
+ADAPTERS = {"anthropic": AnthropicProvider, "openai": OpenAIProvider}
+
+
+def create_provider(name: Optional[str] = None, client=None) -> Provider:
+    """Build the provider for a profile name
+
+    Args:
+        name: A key of ``PROFILES``; defaults to ``LLM_PROVIDER``
+        client: An SDK client to use instead of building one from the env
+    """
+    name = (name or os.getenv("LLM_PROVIDER", DEFAULT_PROVIDER)).lower()
+    if name not in PROFILES:
+        raise ValueError(
+            f"Unknown LLM provider {name!r}, expected one of {sorted(PROFILES)}"
+        )
+    profile = PROFILES[name]
+    return ADAPTERS[profile.adapter](profile.prefix, profile.default_model, client)
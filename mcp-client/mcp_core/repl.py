@@ -0,0 +1,100 @@
+"""Non-blocking pieces of the interactive chat loop.
+
+The builtin ``input()`` blocks the whole event loop while the user types,
+so server notifications and background work stall until Enter is pressed.
+``LineReader`` reads stdin on a daemon thread instead, and
+``BackgroundQueries`` tracks queries the user sent to the background with
+a trailing ``&``.
+"""
+
+import asyncio
+import itertools
+import threading
+from typing import Awaitable, Optional
+
+
+class LineReader:
+    """Read lines from stdin without blocking the event loop
+
+    Only one read is ever outstanding: if the caller stops waiting (e.g. it
+    was cancelled), the next ``readline`` picks up the same pending line
+    rather than starting a second reader on stdin.
+    """
+
+    def __init__(self):
+        self._pending: Optional[asyncio.Future] = None
+
+    async def readline(self, prompt: str = "") -> Optional[str]:
+        """Return the next line without its newline, or None at EOF"""
+        if self._pending is None:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+
+            def read():
+                try:
+                    line = input(prompt)
+                except EOFError:
+                    line = None
+                except Exception as e:
+                    loop.call_soon_threadsafe(_set_exception, future, e)
+                    return
+                loop.call_soon_threadsafe(_set_result, future, line)
+
+            # A daemon thread, so a read still waiting at exit does not keep
+            # the interpreter alive
+            threading.Thread(target=read, name="stdin-reader", daemon=True).start()
+            self._pending = future
+        line = await asyncio.shield(self._pending)
+        self._pending = None
+        return line
+
+
+def _set_result(future: asyncio.Future, value):
+    if not future.done():
+        future.set_result(value)
+
+
+def _set_exception(future: asyncio.Future, error: BaseException):
+    if not future.done():
+        future.set_exception(error)
+
+
+class BackgroundQueries:
+    """Queries running in the background, numbered like shell jobs"""
+
+    def __init__(self):
+        self._jobs: dict[int, tuple[str, asyncio.Task]] = {}
+        self._ids = itertools.count(1)
+
+    def start(self, query: str, work: Awaitable) -> int:
+        """Run ``work`` in the background; returns its job number"""
+        job = next(self._ids)
+        task = asyncio.ensure_future(work)
+        self._jobs[job] = (query, task)
+        task.add_done_callback(lambda _: self._jobs.pop(job, None))
+        return job
+
+    def __len__(self) -> int:
+        return len(self._jobs)
+
+    def describe(self) -> list[str]:
+        return [f"[{job}] running: {query}" for job, (query, _) in self._jobs.items()]
+
+    def cancel(self, job: Optional[int] = None) -> int:
+        """Cancel one job, or every job when ``job`` is None
+
+        Returns:
+            How many jobs were cancelled
+        """
+        jobs = list(self._jobs) if job is None else [job]
+        cancelled = 0
+        for number in jobs:
+            entry = self._jobs.get(number)
+            if entry is not None and entry[1].cancel():
+                cancelled += 1
+        return cancelled
+
+    async def close(self):
+        tasks = [task for _, task in self._jobs.values()]
+        self.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
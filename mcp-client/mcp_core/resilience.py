@@ -0,0 +1,217 @@
+"""Deadlines, retries and circuit breaking for MCP servers and the model.
+
+A hung server, a crashed subprocess or a stalled upstream should fail one
+call, not stall ``process_query`` forever. ``ServerPool`` applies a
+``ResiliencePolicy`` to every tool call:
+
+- each call has a deadline; a call that misses it fails with ``ToolTimeout``
+- idempotent (read-only) tools are retried after a timeout or a lost
+  connection, with full-jitter exponential backoff; other tools are never
+  retried, since the first attempt may already have taken effect
+- a ``CircuitBreaker`` per server opens after repeated failures and fails
+  calls fast with ``CircuitOpenError`` until a trial call is let through
+
+Settings come from the environment:
+
+- ``TOOL_TIMEOUT``: deadline per tool call in seconds (default 60, ``0``
+  for none); ``TOOL_TIMEOUT_<TOOL>`` overrides it for a single tool
+- ``TOOL_RETRIES``: extra attempts for idempotent tools (default 2)
+- ``TOOL_RETRY_DELAY`` / ``TOOL_RETRY_MAX_DELAY``: backoff base and cap in
+  seconds (default 0.2 and 5)
+- ``TOOL_IDEMPOTENT``: comma-separated tools to treat as idempotent on top
+  of the read-only tools of the bundled servers
+- ``MCP_BREAKER_THRESHOLD``: consecutive failures that open a server's
+  breaker (default 5, ``0`` disables it)
+- ``MCP_BREAKER_RESET``: seconds before an open breaker lets a trial call
+  through (default 30)
+
+Model calls get an overall deadline from ``<PREFIX>_DEADLINE`` /
+``LLM_DEADLINE`` (see ``model_deadline``); retrying them is left to the
+SDK, which already backs off on connection errors, 429s and 5xx responses.
+"""
+
+import asyncio
+import os
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Optional
+
+# Read-only tools of the bundled servers, safe to send more than once
+IDEMPOTENT_TOOLS = frozenset(
+    {
+        "read_file",
+        "read_text_file",
+        "read_media_file",
+        "read_multiple_files",
+        "list_directory",
+        "list_directory_with_sizes",
+        "directory_tree",
+        "search_files",
+        "get_file_info",
+        "list_allowed_directories",
+        "get_weather",
+    }
+)
+
+
+def idempotent_tools() -> frozenset:
+    """``IDEMPOTENT_TOOLS`` plus the tools named in ``TOOL_IDEMPOTENT``"""
+    extra = {
+        name.strip()
+        for name in os.getenv("TOOL_IDEMPOTENT", "").split(",")
+        if name.strip()
+    }
+    return IDEMPOTENT_TOOLS | extra
+
+
+class ServerUnavailable(Exception):
+    """A tool call failed because its server did not answer"""
+
+
+class ToolTimeout(ServerUnavailable):
+    """The server did not answer a tool call before its deadline"""
+
+
+class ConnectionLost(ServerUnavailable):
+    """The server's subprocess exited while a call was in flight"""
+
+
+class CircuitOpenError(ServerUnavailable):
+    """The server's breaker is open, so the call was not attempted"""
+
+
+def model_deadline(prefix: str) -> Optional[float]:
+    """Overall deadline for one model call, streaming included
+
+    Read from ``<prefix>_DEADLINE``, then ``LLM_DEADLINE`` (default 300);
+    ``0`` means no deadline.
+    """
+    value = float(
+        os.getenv(f"{prefix}_DEADLINE") or os.getenv("LLM_DEADLINE", "300")
+    )
+    return value or None
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker for one server
+
+    Closed, it lets every call through. ``threshold`` failures in a row
+    open it; after ``reset_after`` seconds it is half-open and lets a
+    single trial call through, which either closes it again or reopens it.
+    """
+
+    def __init__(
+        self,
+        threshold: int = 5,
+        reset_after: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self._clock = clock
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trips = 0
+        self._trial = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if self._clock() - self.opened_at >= self.reset_after:
+            return "half_open"
+        return "open"
+
+    def check(self):
+        """Raise ``CircuitOpenError`` unless a call may go through now"""
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial:
+            self._trial = True
+            return
+        retry_in = max(0.0, self.opened_at + self.reset_after - self._clock())
+        raise CircuitOpenError(
+            f"circuit open after {self.failures} failures, retry in {retry_in:.0f}s"
+        )
+
+    def success(self):
+        self.failures = 0
+        self.opened_at = None
+        self._trial = False
+
+    def release(self):
+        """Forget a call that ended without a verdict, e.g. was cancelled
+
+        A cancelled half-open trial must free the slot, or the breaker would
+        never let another call through.
+        """
+        self._trial = False
+
+    def failure(self) -> bool:
+        """Record a failed call; returns True when this opened the breaker"""
+        self.failures += 1
+        was_open = self.opened_at is not None
+        self._trial = False
+        if self.threshold and (was_open or self.failures >= self.threshold):
+            self.opened_at = self._clock()
+            if not was_open:
+                self.trips += 1
+                return True
+        return False
+
+
+@dataclass
+class ResiliencePolicy:
+    """Deadlines, retry backoff and breaker settings for tool calls"""
+
+    timeout: float = 60.0
+    timeouts: dict[str, float] = field(default_factory=dict)
+    retries: int = 2
+    retry_delay: float = 0.2
+    retry_max_delay: float = 5.0
+    idempotent: frozenset = IDEMPOTENT_TOOLS
+    breaker_threshold: int = 5
+    breaker_reset: float = 30.0
+
+    @classmethod
+    def from_env(cls) -> "ResiliencePolicy":
+        timeouts = {}
+        prefix = "TOOL_TIMEOUT_"
+        for key, value in os.environ.items():
+            if key.startswith(prefix) and value:
+                timeouts[key[len(prefix) :].lower()] = float(value)
+        return cls(
+            timeout=float(os.getenv("TOOL_TIMEOUT", "60")),
+            timeouts=timeouts,
+            retries=int(os.getenv("TOOL_RETRIES", "2")),
+            retry_delay=float(os.getenv("TOOL_RETRY_DELAY", "0.2")),
+            retry_max_delay=float(os.getenv("TOOL_RETRY_MAX_DELAY", "5")),
+            idempotent=idempotent_tools(),
+            breaker_threshold=int(os.getenv("MCP_BREAKER_THRESHOLD", "5")),
+            breaker_reset=float(os.getenv("MCP_BREAKER_RESET", "30")),
+        )
+
+    def deadline(self, tool: str) -> Optional[float]:
+        """Seconds a call to ``tool`` may take, or None for no limit"""
+        return self.timeouts.get(tool.lower(), self.timeout) or None
+
+    def attempts(self, tool: str) -> int:
+        return 1 + self.retries if tool in self.idempotent else 1
+
+    def backoff(self, attempt: int) -> float:
+        """Full-jitter delay before retry number ``attempt`` (from 1)"""
+        cap = min(self.retry_max_delay, self.retry_delay * 2 ** (attempt - 1))
+        return random.uniform(0, cap)
+
+    def breaker(self) -> CircuitBreaker:
+        return CircuitBreaker(self.breaker_threshold, self.breaker_reset)
+
+
+async def with_deadline(call: Awaitable, seconds: Optional[float], what: str):
+    """Await ``call``, raising ``ToolTimeout`` once ``seconds`` have passed"""
+    try:
+        return await asyncio.wait_for(call, seconds)
+    except asyncio.TimeoutError:
+        raise ToolTimeout(f"{what} timed out after {seconds:g}s") from None
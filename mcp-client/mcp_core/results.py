@@ -0,0 +1,42 @@
+"""Normalization of MCP tool results for the model."""
+
+
+def result_text(result) -> str:
+    """Join the content parts of an MCP tool result into plain text"""
+    if not getattr(result, "content", None):
+        return str(result)
+    parts = []
+    for p in result.content:
+        kind = getattr(p, "type", None)
+        if kind == "text":
+            parts.append(p.text)
+        elif kind == "image":
+            # Text-only providers cannot use the pixels; never inline base64
+            parts.append(f"[{p.mimeType} image, {len(p.data)} bytes base64]")
+        elif kind == "resource" and hasattr(p.resource, "text"):
+            parts.append(p.resource.text)
+        else:
+            parts.append(str(p))
+    return "\n".join(parts)
+
+
+def anthropic_content(result) -> list[dict]:
+    """Convert MCP result content to Anthropic content blocks"""
+    content = []
+    for p in getattr(result, "content", None) or []:
+        if p.type == "text":
+            content.append({"type": "text", "text": p.text})
+        elif p.type == "image":
+            content.append(
+                {
+                    "type": "image",
+                    "source": {
+                        "type": "base64",
+                        "media_type": p.mimeType,
+                        "data": p.data,
+                    },
+                }
+            )
+        else:
+            content.append({"type": "text", "text": str(p)})
+    return content
@@ -0,0 +1,410 @@
+"""Connections to one or more MCP servers behind a single tool router.
+
+A client can talk to several servers at once (e.g. the filesystem, weather
+and gmail servers from ``mcp-server/``). Each server gets a ``ServerPool``
+of one or more warm stdio subprocesses, and ``ServerRouter`` merges their
+tool catalogs into one namespaced registry and forwards each ``call_tool``
+to the pool that owns the tool.
+
+Servers are given either as a single script path plus extra arguments, or
+as a JSON config file in the usual ``mcpServers`` layout::
+
+    {
+      "mcpServers": {
+        "filesystem": {
+          "command": "node",
+          "args": ["../mcp-server/filesystem/dist/index.js", "/tmp"],
+          "poolSize": 2,
+          "concurrency": 8
+        },
+        "weather": {"command": "node", "args": ["../mcp-server/weather/build/index.js"]}
+      }
+    }
+
+``poolSize`` defaults to ``MCP_POOL_SIZE_<SERVER>`` / ``MCP_POOL_SIZE`` (1)
+and ``concurrency`` to the ``MCP_TOOL_CONCURRENCY`` settings.
+
+Tool calls run under the deadlines, retries and circuit breaker of
+``mcp_core.resilience``. A subprocess that exits is respawned on the next
+call to its pool, and the pool's tool catalog is invalidated so the new
+process's tools are registered again.
+"""
+
+import asyncio
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Optional
+
+import anyio
+from mcp import StdioServerParameters, types
+from mcp.client.stdio import get_default_environment, stdio_client
+
+from mcp_core.catalog import CatalogSession, ToolCatalog
+from mcp_core.executor import tool_concurrency
+from mcp_core.resilience import (
+    CircuitOpenError,
+    ConnectionLost,
+    ResiliencePolicy,
+    ServerUnavailable,
+    with_deadline,
+)
+
+# Joins server and tool names in the merged registry, e.g. weather__get_weather
+NAMESPACE_SEPARATOR = "__"
+
+# Directories that hold build output rather than naming the server itself
+_BUILD_DIRS = {"build", "dist", "src", "lib"}
+
+
+def server_alias(server_script_path: str) -> str:
+    """Derive a short server name from its script path
+
+    ``../mcp-server/weather/build/index.js`` becomes ``weather`` and
+    ``../mcp-server/filesystem/dist/index.js`` becomes ``filesystem``.
+    """
+    parts = os.path.normpath(os.path.abspath(server_script_path)).split(os.sep)
+    stem = os.path.splitext(parts[-1])[0]
+    for part in reversed(parts[:-1]):
+        if part and part not in _BUILD_DIRS:
+            name = part if stem == "index" else stem
+            break
+    else:
+        name = stem
+    return re.sub(r"[^A-Za-z0-9_-]+", "_", name).strip("_") or "server"
+
+
+def pool_size(server: str) -> int:
+    """Look up how many subprocesses to keep for a server"""
+    key = re.sub(r"[^A-Za-z0-9]+", "_", server).upper()
+    value = os.getenv(f"MCP_POOL_SIZE_{key}") or os.getenv("MCP_POOL_SIZE", "1")
+    return max(1, int(value))
+
+
+@dataclass
+class ServerSpec:
+    """How to launch one MCP server"""
+
+    name: str
+    command: str
+    args: list[str] = field(default_factory=list)
+    env: Optional[dict[str, str]] = None
+    pool_size: int = 1
+    concurrency: int = 4
+
+    @classmethod
+    def from_script(
+        cls, server_script_path: str, additional_args: Optional[list] = None
+    ) -> "ServerSpec":
+        """Build a spec for a ``.py`` or ``.js`` server script"""
+        is_python = server_script_path.endswith(".py")
+        is_js = server_script_path.endswith(".js")
+        if not (is_python or is_js):
+            raise ValueError("Server script must be a .py or .js file")
+
+        name = server_alias(server_script_path)
+        return cls(
+            name=name,
+            command="python" if is_python else "node",
+            args=[server_script_path, *(additional_args or [])],
+            pool_size=pool_size(name),
+            concurrency=tool_concurrency(name),
+        )
+
+    def parameters(self) -> StdioServerParameters:
+        env = None
+        if self.env:
+            env = {**get_default_environment(), **self.env}
+        return StdioServerParameters(command=self.command, args=self.args, env=env)
+
+
+def load_server_config(path: str) -> list[ServerSpec]:
+    """Read server specs from an ``mcpServers`` JSON config file"""
+    with open(path, encoding="utf-8") as f:
+        config = json.load(f)
+
+    specs = []
+    for name, entry in config.get("mcpServers", {}).items():
+        if NAMESPACE_SEPARATOR in name:
+            raise ValueError(
+                f"Server name {name!r} must not contain {NAMESPACE_SEPARATOR!r}"
+            )
+        specs.append(
+            ServerSpec(
+                name=name,
+                command=entry["command"],
+                args=list(entry.get("args", [])),
+                env=entry.get("env"),
+                pool_size=int(entry.get("poolSize") or pool_size(name)),
+                concurrency=int(entry.get("concurrency") or tool_concurrency(name)),
+            )
+        )
+    if not specs:
+        raise ValueError(f"No mcpServers configured in {path}")
+    return specs
+
+
+def load_server_specs(argv: list[str]) -> list[ServerSpec]:
+    """Parse ``<config.json>`` or ``<server_script> [args...]`` from the CLI"""
+    if argv[0].endswith(".json"):
+        return load_server_config(argv[0])
+    return [ServerSpec.from_script(argv[0], argv[1:])]
+
+
+class ServerConnection:
+    """One stdio subprocess and its initialized session
+
+    The subprocess and session contexts are entered and exited inside a
+    dedicated task, so several connections can be opened concurrently and
+    closed later from any task.
+    """
+
+    def __init__(self, spec: ServerSpec):
+        self.spec = spec
+        self.session: Optional[CatalogSession] = None
+        self.in_flight = 0
+        # Set to have the next call replace the subprocess, e.g. when it hangs
+        self.stale = False
+        self.restart_lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._closing = asyncio.Event()
+
+    @property
+    def alive(self) -> bool:
+        return (
+            self.session is not None
+            and not self.stale
+            and not self.session.closed.is_set()
+            and self._task is not None
+            and not self._task.done()
+        )
+
+    async def start(self) -> CatalogSession:
+        self._closing = asyncio.Event()
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready))
+        self.session = await ready
+        self.stale = False
+        return self.session
+
+    async def _run(self, ready: asyncio.Future):
+        try:
+            async with stdio_client(self.spec.parameters()) as (read, write):
+                async with CatalogSession(read, write) as session:
+                    await session.initialize()
+                    ready.set_result(session)
+                    # Run until closed, or until the subprocess exits by itself
+                    waiters = [
+                        asyncio.ensure_future(self._closing.wait()),
+                        asyncio.ensure_future(session.closed.wait()),
+                    ]
+                    try:
+                        await asyncio.wait(
+                            waiters, return_when=asyncio.FIRST_COMPLETED
+                        )
+                    finally:
+                        for waiter in waiters:
+                            waiter.cancel()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+
+    async def call_tool(
+        self, name: str, arguments: Optional[dict], timeout: Optional[float]
+    ):
+        """Call a tool, failing with ``ServerUnavailable`` when the server
+        misses the deadline or exits"""
+        try:
+            return await with_deadline(
+                self.session.call_tool(name, arguments),
+                timeout,
+                f"{self.spec.name} tool {name}",
+            )
+        except (
+            anyio.EndOfStream,
+            anyio.ClosedResourceError,
+            anyio.BrokenResourceError,
+        ) as e:
+            raise ConnectionLost(
+                f"{self.spec.name} server exited during {name}"
+            ) from e
+
+    async def restart(self):
+        # Only dead or suspect processes are restarted: don't wait long
+        await self.close(grace=1.0)
+        await self.start()
+
+    async def close(self, grace: float = 5.0):
+        self._closing.set()
+        if self._task is not None:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(self._task, return_exceptions=True), grace
+                )
+            except asyncio.TimeoutError:
+                pass  # a hung server ignored its stdin closing; it was killed
+
+
+class ServerPool:
+    """Warm connections to one server, sharing one tool catalog"""
+
+    def __init__(self, spec: ServerSpec, policy: Optional[ResiliencePolicy] = None):
+        self.spec = spec
+        self.name = spec.name
+        self.policy = policy or ResiliencePolicy.from_env()
+        self.breaker = self.policy.breaker()
+        self.connections = [ServerConnection(spec) for _ in range(spec.pool_size)]
+        self.tool_catalog = ToolCatalog(self._fetch_tools)
+        self.respawns = 0
+        self._semaphore = asyncio.Semaphore(spec.concurrency)
+
+    async def start(self):
+        await asyncio.gather(*(conn.start() for conn in self.connections))
+        for conn in self.connections:
+            conn.session.tool_catalog.on_invalidate(self.tool_catalog.invalidate)
+        # List the tools right after the handshake, so a slow server's
+        # startup overlaps with the others' listing
+        await self.tool_catalog.tools()
+
+    async def _fetch_tools(self) -> list[types.Tool]:
+        # Every subprocess runs the same server, so any live one's catalog
+        # stands for the pool
+        conn = next((c for c in self.connections if c.alive), self.connections[0])
+        await self._revive(conn)
+        return await conn.session.tool_catalog.tools()
+
+    async def _revive(self, conn: ServerConnection) -> bool:
+        """Respawn a connection whose subprocess exited or was marked stale
+
+        Returns:
+            Whether the connection was respawned
+        """
+        if conn.alive:
+            return False
+        async with conn.restart_lock:
+            if conn.alive:
+                return False
+            try:
+                await conn.restart()
+            except Exception as e:
+                raise ConnectionLost(f"could not restart {self.name}: {e}") from e
+            conn.session.tool_catalog.on_invalidate(self.tool_catalog.invalidate)
+            self.respawns += 1
+            return True
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        """Call a tool on the least busy connection
+
+        Idempotent tools are retried with backoff when the server times out
+        or exits; see ``mcp_core.resilience``.
+        """
+        attempts = self.policy.attempts(name)
+        for attempt in range(1, attempts + 1):
+            try:
+                return await self._attempt(name, arguments)
+            except CircuitOpenError:
+                raise
+            except ServerUnavailable:
+                if attempt == attempts:
+                    raise
+                await asyncio.sleep(self.policy.backoff(attempt))
+
+    async def _attempt(self, name: str, arguments: Optional[dict]):
+        async with self._semaphore:
+            self.breaker.check()
+            conn = min(self.connections, key=lambda c: c.in_flight)
+            conn.in_flight += 1
+            try:
+                if await self._revive(conn):
+                    # The new process may serve different tools
+                    self.tool_catalog.invalidate()
+                result = await conn.call_tool(
+                    name, arguments, self.policy.deadline(name)
+                )
+            except ServerUnavailable:
+                if self.breaker.failure():
+                    # Replace processes that may be hung before the trial call
+                    for c in self.connections:
+                        c.stale = True
+                raise
+            except Exception:
+                self.breaker.success()  # the server answered, if with an error
+                raise
+            except BaseException:
+                self.breaker.release()  # cancelled: no verdict on the server
+                raise
+            finally:
+                conn.in_flight -= 1
+            self.breaker.success()
+            return result
+
+    async def close(self):
+        await asyncio.gather(*(conn.close() for conn in self.connections))
+
+
+class ServerRouter:
+    """Route tool calls across several server pools
+
+    Exposes the same ``tool_catalog`` / ``call_tool`` surface as a single
+    ``CatalogSession``, so the clients can use either interchangeably. With
+    more than one server, tool names are prefixed with the server name
+    (``filesystem__read_text_file``) so they cannot collide.
+    """
+
+    def __init__(
+        self, specs: list[ServerSpec], policy: Optional[ResiliencePolicy] = None
+    ):
+        policy = policy or ResiliencePolicy.from_env()
+        self.pools = {spec.name: ServerPool(spec, policy) for spec in specs}
+        self.tool_catalog = ToolCatalog(self._fetch_tools)
+        self._routes: dict[str, tuple[ServerPool, str]] = {}
+
+    @property
+    def namespaced(self) -> bool:
+        return len(self.pools) > 1
+
+    @property
+    def max_concurrency(self) -> int:
+        return sum(pool.spec.concurrency for pool in self.pools.values())
+
+    async def start(self):
+        """Connect to every server concurrently"""
+        await asyncio.gather(*(pool.start() for pool in self.pools.values()))
+        for pool in self.pools.values():
+            pool.tool_catalog.on_invalidate(self.tool_catalog.invalidate)
+
+    async def _fetch_tools(self) -> list[types.Tool]:
+        pools = list(self.pools.values())
+        catalogs = await asyncio.gather(*(pool.tool_catalog.tools() for pool in pools))
+
+        routes = {}
+        tools = []
+        for pool, pool_tools in zip(pools, catalogs):
+            for tool in pool_tools:
+                name = tool.name
+                if self.namespaced:
+                    name = f"{pool.name}{NAMESPACE_SEPARATOR}{tool.name}"
+                routes[name] = (pool, tool.name)
+                tools.append(tool.model_copy(update={"name": name}))
+        self._routes = routes
+        return tools
+
+    async def resolve(self, name: str) -> tuple[ServerPool, str]:
+        """Find the pool and server-side tool name for a registry name"""
+        await self.tool_catalog.tools()
+        route = self._routes.get(name)
+        if route is None:
+            # Accept a bare tool name as long as only one server has it
+            matches = [r for r in self._routes.values() if r[1] == name]
+            if len(matches) != 1:
+                raise ValueError(f"Unknown tool: {name}")
+            route = matches[0]
+        return route
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        pool, tool_name = await self.resolve(name)
+        return await pool.call_tool(tool_name, arguments)
+
+    async def close(self):
+        await asyncio.gather(*(pool.close() for pool in self.pools.values()))
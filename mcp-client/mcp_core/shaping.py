@@ -0,0 +1,308 @@
+"""Bound the size of tool results before they reach the model.
+
+A single ``read_text_file`` on a log or a ``read_media_file`` on a photo
+can return megabytes, which would otherwise be copied into ``messages`` and
+resent on every later model call. ``ShapedSession`` sits in front of
+``call_tool`` and keeps each result under a per-tool character limit:
+
+- results under the limit pass through untouched
+- larger text is cut to a preview; the full text is spilled to a file in a
+  ``SpillStore`` and the preview ends with a reference the model can page
+  through with the ``read_tool_result`` pseudo-tool
+- images over ``TOOL_RESULT_MAX_IMAGE_BYTES`` are replaced by a short note
+
+Oversized results are written part by part, so no joined copy of the whole
+result is ever built. Spill files are written and read in a worker thread,
+so other queries keep running meanwhile, and the spill store evicts its
+oldest files past ``TOOL_SPILL_MAX_BYTES``. Memory use and prompt size stay
+bounded however large the underlying file is.
+
+Limits come from ``TOOL_RESULT_MAX_CHARS`` (default 16000) and
+``TOOL_RESULT_MAX_CHARS_<TOOL>`` for a single tool (``0`` means no limit).
+"""
+
+import asyncio
+import itertools
+import os
+import shutil
+import tempfile
+from collections import OrderedDict
+from typing import Iterator, Optional
+
+from mcp import types
+
+from mcp_core.cache import tool_name
+from mcp_core.catalog import ToolCatalog
+
+PAGE_TOOL = "read_tool_result"
+
+PAGE_TOOL_DEFINITION = types.Tool(
+    name=PAGE_TOOL,
+    description=(
+        "Read more of a tool result that was too large to return at once. "
+        "Use the ref and offset given in the truncated result."
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "ref": {"type": "string", "description": "Reference of the stored result"},
+            "offset": {
+                "type": "integer",
+                "description": "Character offset to start reading from",
+            },
+            "length": {
+                "type": "integer",
+                "description": "Number of characters to read",
+            },
+        },
+        "required": ["ref"],
+    },
+)
+
+READ_CHUNK = 1 << 20
+
+
+def _part_texts(result) -> Iterator[str]:
+    """The text of every content part, without copying large strings"""
+    for part in getattr(result, "content", None) or []:
+        if part.type == "text":
+            yield part.text
+        elif part.type == "resource" and hasattr(part.resource, "text"):
+            yield part.resource.text
+        elif part.type == "image":
+            yield f"[{part.mimeType} image, {len(part.data)} bytes base64]"
+        else:
+            yield f"[{part.type} content]"
+
+
+class SpillStore:
+    """Full text of oversized results, kept in files and read back in pages"""
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: int = 256 << 20):
+        self.directory = directory or tempfile.mkdtemp(prefix="mcp-results-")
+        self._owned = directory is None
+        self.max_bytes = max_bytes
+        self._files: OrderedDict[str, tuple[str, int, int]] = OrderedDict()
+        self._ids = itertools.count(1)
+
+    @property
+    def size(self) -> int:
+        return sum(size for _, size, _ in self._files.values())
+
+    async def spill(
+        self, parts: Iterator[str], separator: str = "\n"
+    ) -> tuple[str, int]:
+        """Write parts to a new file; returns its ref and length in characters"""
+        ref = f"result-{next(self._ids)}"
+        path = os.path.join(self.directory, f"{ref}.txt")
+        chars = await asyncio.to_thread(self._write, path, parts, separator)
+        self._files[ref] = (path, os.path.getsize(path), chars)
+        self._evict()
+        return ref, chars
+
+    @staticmethod
+    def _write(path: str, parts: Iterator[str], separator: str) -> int:
+        chars = 0
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            for i, text in enumerate(parts):
+                if i:
+                    f.write(separator)
+                    chars += len(separator)
+                f.write(text)
+                chars += len(text)
+        return chars
+
+    def _evict(self):
+        while len(self._files) > 1 and self.size > self.max_bytes:
+            _, (path, _, _) = self._files.popitem(last=False)
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    async def read(self, ref: str, offset: int, length: int) -> tuple[str, int]:
+        """Read ``length`` characters from ``offset``; returns the text and
+        the total length
+
+        Raises:
+            KeyError: Unknown or evicted ref
+        """
+        path, _, chars = self._files[ref]
+        self._files.move_to_end(ref)
+        try:
+            text = await asyncio.to_thread(self._read, path, offset, length)
+        except FileNotFoundError:
+            raise KeyError(ref) from None  # evicted while we waited
+        return text, chars
+
+    @staticmethod
+    def _read(path: str, offset: int, length: int) -> str:
+        with open(path, encoding="utf-8", newline="") as f:
+            remaining = max(0, offset)
+            while remaining:
+                skipped = len(f.read(min(remaining, READ_CHUNK)))
+                if not skipped:
+                    break
+                remaining -= skipped
+            return f.read(max(0, length))
+
+    def close(self):
+        self._files.clear()
+        if self._owned:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+class ResultShaper:
+    """Per-tool size limits applied to ``CallToolResult`` objects"""
+
+    def __init__(
+        self,
+        max_chars: int = 16000,
+        limits: Optional[dict[str, int]] = None,
+        max_image_bytes: int = 1_500_000,
+        store: Optional[SpillStore] = None,
+    ):
+        self.max_chars = max_chars
+        self.limits = limits or {}
+        self.max_image_bytes = max_image_bytes
+        self.store = store or SpillStore()
+        self.spilled = 0
+
+    @classmethod
+    def from_env(cls) -> "ResultShaper":
+        limits = {}
+        prefix = "TOOL_RESULT_MAX_CHARS_"
+        for key, value in os.environ.items():
+            if key.startswith(prefix) and value:
+                limits[key[len(prefix) :].lower()] = int(value)
+        return cls(
+            max_chars=int(os.getenv("TOOL_RESULT_MAX_CHARS", "16000")),
+            limits=limits,
+            max_image_bytes=int(os.getenv("TOOL_RESULT_MAX_IMAGE_BYTES", "1500000")),
+            store=SpillStore(
+                os.getenv("TOOL_SPILL_DIR") or None,
+                int(os.getenv("TOOL_SPILL_MAX_BYTES", str(256 << 20))),
+            ),
+        )
+
+    def limit(self, name: str) -> int:
+        return self.limits.get(tool_name(name), self.max_chars)
+
+    async def shape(self, name: str, result):
+        """Return the result itself when it fits, else a bounded copy"""
+        content = getattr(result, "content", None)
+        if not content:
+            return result
+        limit = self.limit(name)
+        images = {
+            id(p)
+            for p in content
+            if p.type == "image" and len(p.data) > self.max_image_bytes
+        }
+        text_size = sum(
+            len(part.text) for part in content if part.type == "text"
+        ) + sum(
+            len(part.resource.text)
+            for part in content
+            if part.type == "resource" and hasattr(part.resource, "text")
+        )
+        if not images and (not limit or text_size <= limit):
+            return result
+
+        if not limit or text_size <= limit:
+            shaped = [
+                types.TextContent(
+                    type="text",
+                    text=f"[{p.mimeType} image of {len(p.data)} bytes base64 omitted:"
+                    f" over the {self.max_image_bytes} byte limit]",
+                )
+                if id(p) in images
+                else p
+                for p in content
+            ]
+            return types.CallToolResult(content=shaped, isError=result.isError)
+
+        ref, total = await self.store.spill(_part_texts(result))
+        self.spilled += 1
+        preview = self._preview(result, limit)
+        note = (
+            f"\n\n[Result truncated: showing {len(preview)} of {total} characters."
+            f' Call {PAGE_TOOL} with ref="{ref}" and offset={len(preview)}'
+            " to read more.]"
+        )
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=preview + note)],
+            isError=result.isError,
+        )
+
+    @staticmethod
+    def _preview(result, limit: int) -> str:
+        """The first ``limit`` characters, copying only what is kept"""
+        pieces = []
+        budget = limit
+        for i, text in enumerate(_part_texts(result)):
+            if i:
+                pieces.append("\n")
+                budget -= 1
+            piece = text[: max(0, budget)]
+            pieces.append(piece)
+            budget -= len(piece)
+            if budget <= 0:
+                break
+        return "".join(pieces)
+
+    async def page(self, arguments: Optional[dict]) -> types.CallToolResult:
+        """Answer a ``read_tool_result`` call"""
+        arguments = arguments or {}
+        ref = arguments.get("ref", "")
+        offset = int(arguments.get("offset", 0))
+        length = int(arguments.get("length") or self.max_chars or READ_CHUNK)
+        if self.max_chars:
+            length = min(length, self.max_chars)
+        try:
+            text, total = await self.store.read(ref, offset, length)
+        except KeyError:
+            return types.CallToolResult(
+                content=[
+                    types.TextContent(
+                        type="text", text=f"Error: no stored result {ref!r}"
+                    )
+                ],
+                isError=True,
+            )
+        end = offset + len(text)
+        if end < total:
+            text += (
+                f"\n\n[Characters {offset}-{end} of {total}. Call {PAGE_TOOL} with"
+                f' ref="{ref}" and offset={end} to read more.]'
+            )
+        else:
+            text += f"\n\n[End of result {ref}: {total} characters.]"
+        return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+
+class ShapedSession:
+    """Session wrapper that bounds tool results and serves result pages
+
+    Its ``tool_catalog`` is the wrapped one plus the ``read_tool_result``
+    pseudo-tool. Everything else is passed through to the wrapped session
+    or router.
+    """
+
+    def __init__(self, session, shaper: ResultShaper):
+        self.session = session
+        self.shaper = shaper
+        self.tool_catalog = ToolCatalog(self._fetch_tools)
+        session.tool_catalog.on_invalidate(self.tool_catalog.invalidate)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def _fetch_tools(self) -> list[types.Tool]:
+        return list(await self.session.tool_catalog.tools()) + [PAGE_TOOL_DEFINITION]
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        if tool_name(name) == PAGE_TOOL:
+            return await self.shaper.page(arguments)
+        result = await self.session.call_tool(name, arguments)
+        return await self.shaper.shape(name, result)
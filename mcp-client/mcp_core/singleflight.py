@@ -0,0 +1,120 @@
+"""Share one tool call between concurrent identical requests.
+
+Concurrent queries on one client (the gateway, background chat queries,
+``batch.py``) often ask the same server the same thing at the same moment:
+``list_allowed_directories``, ``directory_tree`` on the project root. With
+``TOOL_SINGLEFLIGHT=1``, ``SingleflightSession`` sends only the first of
+several identical read-only calls (same tool, same arguments) and hands its
+result, or its error, to every caller that arrived while it was in flight.
+
+Nothing is kept once the call completes, so a call that starts afterwards
+always goes to the server. A mutating call (``write_file``, ...) also
+detaches in-flight reads of overlapping paths, so reads issued after the
+write never join a read that started before it. Only read-only tools are
+shared (``IDEMPOTENT_TOOLS`` plus ``TOOL_IDEMPOTENT``).
+"""
+
+import asyncio
+from typing import Optional
+
+from mcp_core.cache import (
+    MUTATING_TOOLS,
+    ToolResultCache,
+    argument_paths,
+    paths_overlap,
+    tool_name,
+)
+from mcp_core.resilience import IDEMPOTENT_TOOLS, idempotent_tools
+from mcp_core.telemetry import Telemetry
+
+
+class _Flight:
+    def __init__(self, task: asyncio.Task, paths: tuple[str, ...]):
+        self.task = task
+        self.paths = paths
+        self.waiters = 0
+
+
+class SingleflightSession:
+    """Session wrapper that collapses identical in-flight tool calls
+
+    Everything except ``call_tool`` is passed through to the wrapped
+    session or router.
+    """
+
+    def __init__(
+        self,
+        session,
+        shareable: frozenset = IDEMPOTENT_TOOLS,
+        telemetry: Optional[Telemetry] = None,
+    ):
+        """
+        Args:
+            session: The session or router to send calls to
+            shareable: Read-only tools whose calls may be shared
+            telemetry: Counts collapsed calls in ``mcp_tool_calls_collapsed_total``
+        """
+        self.session = session
+        self.shareable = frozenset(shareable)
+        self.telemetry = telemetry
+        self._flights: dict[str, _Flight] = {}
+        self.calls = 0
+        self.collapsed = 0
+
+    @classmethod
+    def from_env(
+        cls, session, telemetry: Optional[Telemetry] = None
+    ) -> "SingleflightSession":
+        return cls(session, idempotent_tools(), telemetry)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        tool = tool_name(name)
+        if tool in MUTATING_TOOLS:
+            self._detach(argument_paths(arguments))
+        if tool not in self.shareable:
+            return await self.session.call_tool(name, arguments)
+
+        key = ToolResultCache.key(name, arguments)
+        flight = self._flights.get(key)
+        if flight is None:
+            self.calls += 1
+            task = asyncio.ensure_future(self.session.call_tool(name, arguments))
+            flight = self._flights[key] = _Flight(task, argument_paths(arguments))
+            task.add_done_callback(lambda _: self._land(key, flight))
+        else:
+            self.collapsed += 1
+            if self.telemetry is not None:
+                self.telemetry.tool_calls_collapsed.inc(tool=tool)
+
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        except asyncio.CancelledError:
+            # The last caller to give up cancels the shared call, which no
+            # new caller may join while it winds down
+            if flight.waiters == 1 and not flight.task.done():
+                flight.task.cancel()
+                self._land(key, flight)
+            raise
+        finally:
+            flight.waiters -= 1
+
+    def _land(self, key: str, flight: _Flight):
+        # A newer flight may hold the key if this one was detached
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _detach(self, paths: tuple[str, ...]):
+        for key, flight in list(self._flights.items()):
+            if any(paths_overlap(a, b) for a in flight.paths for b in paths):
+                del self._flights[key]
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "collapsed": self.collapsed,
+            "in_flight": len(self._flights),
+        }
@@ -0,0 +1,147 @@
+"""Streaming model turns that surface text and tool calls as they arrive.
+
+Text deltas are handed to ``on_text`` immediately, and each tool call is
+handed to ``on_tool_call`` as soon as its own arguments are complete, so
+the client can start that call while the model is still generating the
+rest of the turn.
+"""
+
+import json
+from typing import TYPE_CHECKING, Callable, Optional
+
+if TYPE_CHECKING:
+    from openai.types.chat import ChatCompletion, ChatCompletionMessageToolCall
+
+
+def _complete_arguments(arguments: str) -> bool:
+    """Whether accumulated argument fragments form a full JSON object"""
+    if not arguments.rstrip().endswith("}"):
+        return False
+    try:
+        return isinstance(json.loads(arguments), dict)
+    except json.JSONDecodeError:
+        return False
+
+
+async def stream_openai(
+    client,
+    on_text: Optional[Callable[[str], None]] = None,
+    on_tool_call: Optional[Callable[["ChatCompletionMessageToolCall"], None]] = None,
+    **request,
+) -> "ChatCompletion":
+    """Run ``chat.completions.create(stream=True)`` and assemble the reply
+
+    Args:
+        client: An ``AsyncOpenAI`` client
+        on_text: Called with every content delta
+        on_tool_call: Called once per tool call, as soon as its arguments
+            are a complete JSON object (or when the stream ends)
+        **request: Arguments for ``chat.completions.create``
+
+    Returns:
+        The assembled reply, shaped like a non-streaming ``ChatCompletion``.
+        Usage is filled in when the server reports it for the stream.
+    """
+    from openai.types.chat import ChatCompletion, ChatCompletionMessage
+
+    content = []
+    last = None
+    finish_reason = None
+    calls: dict[int, dict] = {}
+    announced: set[int] = set()
+
+    def announce(index: int):
+        if index in announced:
+            return
+        announced.add(index)
+        if on_tool_call:
+            on_tool_call(_tool_call(calls[index]))
+
+    stream = await client.chat.completions.create(
+        stream=True, stream_options={"include_usage": True}, **request
+    )
+    async for chunk in stream:
+        last = chunk
+        if not chunk.choices:
+            continue
+        finish_reason = chunk.choices[0].finish_reason or finish_reason
+        delta = chunk.choices[0].delta
+        if delta.content:
+            content.append(delta.content)
+            if on_text:
+                on_text(delta.content)
+        for fragment in delta.tool_calls or []:
+            # A new index means every earlier call has been fully streamed
+            for index in calls:
+                if index < fragment.index:
+                    announce(index)
+            call = calls.setdefault(
+                fragment.index, {"id": "", "name": "", "arguments": ""}
+            )
+            if fragment.id:
+                call["id"] = fragment.id
+            if fragment.function:
+                call["name"] += fragment.function.name or ""
+                call["arguments"] += fragment.function.arguments or ""
+            if call["id"] and call["name"] and _complete_arguments(call["arguments"]):
+                announce(fragment.index)
+
+    for index in sorted(calls):
+        announce(index)
+
+    message = ChatCompletionMessage(
+        role="assistant",
+        content="".join(content) or None,
+        tool_calls=[_tool_call(calls[index]) for index in sorted(calls)] or None,
+    )
+    return ChatCompletion(
+        id=getattr(last, "id", ""),
+        object="chat.completion",
+        created=getattr(last, "created", 0),
+        model=getattr(last, "model", request.get("model", "")),
+        choices=[
+            {
+                "index": 0,
+                "message": message,
+                "finish_reason": finish_reason
+                or ("tool_calls" if calls else "stop"),
+            }
+        ],
+        usage=getattr(last, "usage", None),
+    )
+
+
+def _tool_call(call: dict) -> "ChatCompletionMessageToolCall":
+    from openai.types.chat import ChatCompletionMessageToolCall
+
+    return ChatCompletionMessageToolCall(
+        id=call["id"],
+        type="function",
+        function={"name": call["name"], "arguments": call["arguments"] or "{}"},
+    )
+
+
+async def stream_anthropic(
+    client,
+    on_text: Optional[Callable[[str], None]] = None,
+    on_tool_use: Optional[Callable] = None,
+    **request,
+):
+    """Run ``messages.stream`` and return the final ``Message``
+
+    Args:
+        client: An ``AsyncAnthropic`` client
+        on_text: Called with every text delta
+        on_tool_use: Called with each ``tool_use`` block once its input has
+            been fully streamed
+        **request: Arguments for ``messages.create``
+    """
+    async with client.messages.stream(**request) as stream:
+        async for event in stream:
+            if event.type == "text":
+                if on_text:
+                    on_text(event.text)
+            elif event.type == "content_block_stop":
+                if event.content_block.type == "tool_use" and on_tool_use:
+                    on_tool_use(event.content_block)
+        return await stream.get_final_message()
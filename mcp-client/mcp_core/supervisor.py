@@ -0,0 +1,488 @@
+"""Run several gateway worker processes behind one port.
+
+A gateway process runs its event loop on one core, and under load the JSON
+encoding and decoding of large tool payloads and the result shaping keep
+that core busy. The supervisor starts ``SUPERVISOR_WORKERS`` gateways
+(default: the number of CPUs), each with its own ``MCPClient`` and its own
+MCP server sessions, and forwards requests to them from one port:
+
+    python -m mcp_core.supervisor --workers 4 --port 8080 servers.json
+
+Routing:
+
+- Queries that name a ``session`` go to the worker picked by rendezvous
+  hashing of the session id over the healthy workers, so a conversation's
+  history stays on one worker. Only the sessions of a worker that goes
+  away move, and they start over with an empty history.
+- Other requests go to the worker with the fewest requests in flight.
+- ``/workers/<n>/<path>`` goes to worker ``n``, e.g. for its ``/metrics``.
+- ``GET /healthz`` answers from the supervisor with the state of every
+  worker; 503 when none is ready.
+
+Every ``SUPERVISOR_HEALTH_INTERVAL`` seconds (default 5) each worker's
+``/healthz`` is probed; a worker that exited, or that failed
+``SUPERVISOR_HEALTH_FAILURES`` probes in a row (default 3), is restarted.
+SIGHUP restarts the workers one at a time: a worker stops getting
+requests, drains (``GATEWAY_DRAIN_SECONDS``) and is replaced, and the next
+one follows once the new process is healthy. SIGTERM or SIGINT drains all
+workers and exits.
+
+Admission limits (``GATEWAY_MAX_CONCURRENCY`` and the rest) apply per
+worker.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import re
+import signal
+import sys
+from pathlib import Path
+from typing import Optional
+
+from dotenv import load_dotenv
+
+from mcp_core.gateway import Rejected, Request, read_request, send_json
+from mcp_core.providers import PROFILES
+
+SERVING = re.compile(r"Serving on http://(\S+):(\d+)")
+
+# Lets ``python -m mcp_core.gateway`` resolve from any working directory
+PROJECT_ROOT = str(Path(__file__).resolve().parent.parent)
+
+
+class WorkerFailed(Exception):
+    """A worker process that did not come up"""
+
+
+class Worker:
+    """One gateway process and the supervisor's view of it"""
+
+    def __init__(self, slot: int, command: list[str]):
+        self.slot = slot
+        self.command = command
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.port: Optional[int] = None
+        # starting, ready, draining, stopped or failed
+        self.state = "stopped"
+        self.in_flight = 0
+        self.failures = 0
+        self.restarts = 0
+        self.lock = asyncio.Lock()
+        self._output: Optional[asyncio.Task] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    @property
+    def exited(self) -> bool:
+        return self.process is not None and self.process.returncode is not None
+
+    async def start(self, timeout: float = 60.0):
+        """Spawn the process and wait for it to report its port
+
+        Raises:
+            WorkerFailed: The process exited or stayed silent for ``timeout``
+        """
+        self.state = "starting"
+        self.failures = 0
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(
+            p for p in (PROJECT_ROOT, env.get("PYTHONPATH")) if p
+        )
+        self.process = await asyncio.create_subprocess_exec(
+            *self.command, stdout=asyncio.subprocess.PIPE, env=env
+        )
+        try:
+            self.port = await asyncio.wait_for(self._serving_port(), timeout)
+        except asyncio.TimeoutError:
+            await self.stop(grace=0)
+            self.state = "failed"
+            raise WorkerFailed(
+                f"worker {self.slot} did not start in {timeout:g}s"
+            ) from None
+        if self.port is None:
+            await self.process.wait()
+            self.state = "failed"
+            raise WorkerFailed(
+                f"worker {self.slot} exited with {self.process.returncode}"
+            )
+        # Keep reading so a chatty worker never blocks on a full pipe
+        self._output = asyncio.ensure_future(self._forward_output())
+        self.state = "ready"
+
+    async def _serving_port(self) -> Optional[int]:
+        async for line in self.process.stdout:
+            text = line.decode(errors="replace").rstrip()
+            match = SERVING.search(text)
+            if match:
+                return int(match.group(2))
+            print(f"[worker {self.slot}] {text}", flush=True)
+        return None
+
+    async def _forward_output(self):
+        async for line in self.process.stdout:
+            text = line.decode(errors="replace").rstrip()
+            print(f"[worker {self.slot}] {text}", flush=True)
+
+    async def stop(self, grace: float = 30.0):
+        """SIGTERM the process so it drains, and kill it after ``grace``"""
+        self.state = "draining"
+        process = self.process
+        if process is not None and process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), grace + 5)
+            except asyncio.TimeoutError:
+                process.kill()
+                await process.wait()
+        if self._output is not None:
+            self._output.cancel()
+            await asyncio.gather(self._output, return_exceptions=True)
+            self._output = None
+        self.state = "stopped"
+
+    async def probe(self, timeout: float = 2.0) -> bool:
+        """Whether the worker answers ``GET /healthz`` with 200"""
+        try:
+            reader, writer = await asyncio.wait_for(
+                asyncio.open_connection("127.0.0.1", self.port), timeout
+            )
+        except (OSError, asyncio.TimeoutError):
+            return False
+        try:
+            writer.write(b"GET /healthz HTTP/1.1\r\nHost: worker\r\n\r\n")
+            status_line = await asyncio.wait_for(reader.readline(), timeout)
+            return status_line.split()[1:2] == [b"200"]
+        except (OSError, asyncio.TimeoutError):
+            return False
+        finally:
+            writer.close()
+
+    def describe(self) -> dict:
+        return {
+            "slot": self.slot,
+            "state": self.state,
+            "pid": self.process.pid if self.process else None,
+            "port": self.port,
+            "in_flight": self.in_flight,
+            "restarts": self.restarts,
+        }
+
+
+def encode_request(request: Request, path: Optional[str] = None) -> bytes:
+    headers = {
+        k: v
+        for k, v in request.headers.items()
+        if k not in ("content-length", "connection")
+    }
+    head = f"{request.method} {path or request.path} HTTP/1.1\r\n"
+    for key, value in headers.items():
+        head += f"{key}: {value}\r\n"
+    head += f"Content-Length: {len(request.body)}\r\nConnection: close\r\n\r\n"
+    return head.encode("latin-1") + request.body
+
+
+def session_of(request: Request) -> Optional[str]:
+    """The ``session`` field of a query body, if there is one"""
+    if request.path != "/v1/query":
+        return None
+    try:
+        payload = json.loads(request.body or b"{}")
+    except ValueError:
+        return None
+    session = payload.get("session") if isinstance(payload, dict) else None
+    return session if isinstance(session, str) else None
+
+
+class Supervisor:
+    """Keeps N gateway workers running and forwards requests to them"""
+
+    def __init__(
+        self,
+        command: list[str],
+        workers: int = 1,
+        health_interval: float = 5.0,
+        health_failures: int = 3,
+        start_timeout: float = 60.0,
+        drain_timeout: float = 30.0,
+        max_body: int = 1 << 20,
+    ):
+        """
+        Args:
+            command: argv of one worker; it must print ``Serving on
+                http://host:port`` once it listens
+            workers: Number of worker processes
+            health_interval: Seconds between health probes
+            health_failures: Failed probes in a row before a restart
+            start_timeout: Seconds a new worker has to start serving
+            drain_timeout: Seconds a stopping worker has to finish queries
+            max_body: Largest request body forwarded, in bytes
+        """
+        self.workers = [Worker(slot, command) for slot in range(workers)]
+        self.health_interval = health_interval
+        self.health_failures = health_failures
+        self.start_timeout = start_timeout
+        self.drain_timeout = drain_timeout
+        self.max_body = max_body
+        self.port: Optional[int] = None
+        self.draining = False
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._monitor: Optional[asyncio.Task] = None
+        self._rolling: Optional[asyncio.Task] = None
+        self._requests: set[asyncio.Task] = set()
+
+    @classmethod
+    def from_env(cls, command: list[str], workers: Optional[int] = None):
+        if workers is None:
+            workers = int(os.getenv("SUPERVISOR_WORKERS") or os.cpu_count() or 1)
+        return cls(
+            command,
+            workers=workers,
+            health_interval=float(os.getenv("SUPERVISOR_HEALTH_INTERVAL", "5")),
+            health_failures=int(os.getenv("SUPERVISOR_HEALTH_FAILURES", "3")),
+            start_timeout=float(os.getenv("SUPERVISOR_START_TIMEOUT", "60")),
+            drain_timeout=float(os.getenv("GATEWAY_DRAIN_SECONDS", "30")),
+        )
+
+    async def start(self, port: int = 8080, host: str = "127.0.0.1"):
+        """Start every worker, then listen on ``host:port``
+
+        Raises:
+            WorkerFailed: A worker did not come up; the others are stopped
+        """
+        results = await asyncio.gather(
+            *(w.start(self.start_timeout) for w in self.workers),
+            return_exceptions=True,
+        )
+        failed = [r for r in results if isinstance(r, BaseException)]
+        if failed:
+            await asyncio.gather(*(w.stop(grace=0) for w in self.workers))
+            raise failed[0]
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._monitor = asyncio.ensure_future(self._watch())
+
+    async def restart(self, worker: Worker):
+        """Replace one worker, draining the old process first"""
+        async with worker.lock:
+            await worker.stop(self.drain_timeout)
+            if self.draining:
+                return
+            worker.restarts += 1
+            try:
+                await worker.start(self.start_timeout)
+            except WorkerFailed as e:
+                # The monitor tries again on its next round
+                print(f"Supervisor: {e}", file=sys.stderr, flush=True)
+
+    async def rolling_restart(self):
+        """Restart the workers one at a time"""
+        for worker in self.workers:
+            if self.draining:
+                return
+            await self.restart(worker)
+            while not self.draining and not await worker.probe():
+                await asyncio.sleep(0.1)
+
+    def start_rolling_restart(self):
+        """Start a rolling restart unless one is already running"""
+        if self._rolling is None or self._rolling.done():
+            self._rolling = asyncio.ensure_future(self.rolling_restart())
+
+    async def _watch(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for worker in self.workers:
+                if worker.lock.locked():
+                    continue
+                if worker.state == "failed" or worker.exited:
+                    await self.restart(worker)
+                elif worker.ready:
+                    if await worker.probe():
+                        worker.failures = 0
+                        continue
+                    worker.failures += 1
+                    if worker.failures >= self.health_failures:
+                        await self.restart(worker)
+
+    def pick(self, session: Optional[str] = None) -> Worker:
+        """The worker for a request, by session affinity or by load
+
+        Raises:
+            Rejected: No worker is ready (503)
+        """
+        ready = [w for w in self.workers if w.ready and not w.exited]
+        if not ready:
+            raise Rejected(503, "no worker available")
+        if session is None:
+            return min(ready, key=lambda w: w.in_flight)
+        # Rendezvous hashing: each session ranks the workers by its own hash,
+        # so removing a worker only moves the sessions that were on it
+        return max(
+            ready,
+            key=lambda w: hashlib.sha1(f"{w.slot}:{session}".encode()).digest(),
+        )
+
+    async def drain(self):
+        """Stop listening, finish forwarded requests and stop the workers"""
+        self.draining = True
+        if self._server is not None:
+            self._server.close()
+        for task in (self._monitor, self._rolling):
+            if task is not None:
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+        await asyncio.gather(*(w.stop(self.drain_timeout) for w in self.workers))
+        if self._requests:
+            await asyncio.wait(list(self._requests), timeout=1.0)
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    async def _handle(self, reader, writer):
+        task = asyncio.current_task()
+        self._requests.add(task)
+        try:
+            try:
+                request = await read_request(reader, self.max_body)
+                if request is not None:
+                    await self._route(request, reader, writer)
+            except Rejected as e:
+                await send_json(writer, e.status, {"error": e.reason})
+        except (asyncio.IncompleteReadError, ConnectionError, ValueError):
+            pass
+        finally:
+            self._requests.discard(task)
+            writer.close()
+
+    async def _route(self, request: Request, reader, writer):
+        if request.path == "/healthz":
+            workers = [w.describe() for w in self.workers]
+            ready = sum(w.ready for w in self.workers)
+            if self.draining:
+                status = "draining"
+            else:
+                status = "ok" if ready == len(self.workers) else "degraded"
+            code = 200 if ready and not self.draining else 503
+            await send_json(writer, code, {"status": status, "workers": workers})
+            return
+        match = re.fullmatch(r"/workers/(\d+)(/.*)", request.path)
+        if match:
+            slot = int(match.group(1))
+            if slot >= len(self.workers) or not self.workers[slot].ready:
+                raise Rejected(503, f"worker {slot} is not ready")
+            worker = self.workers[slot]
+            await self._forward(worker, request, match.group(2), reader, writer)
+            return
+
+        session = session_of(request)
+        tried = set()
+        while True:
+            worker = self.pick(session)
+            try:
+                await self._forward(worker, request, None, reader, writer)
+                return
+            except ConnectionRefusedError:
+                # Died since the last probe; let the monitor replace it
+                worker.state = "failed"
+                tried.add(worker.slot)
+                if len(tried) >= len(self.workers):
+                    raise Rejected(503, "no worker available") from None
+
+    async def _forward(self, worker, request, path, reader, writer):
+        """Send the request to ``worker`` and copy its reply back as it comes
+
+        Raises:
+            ConnectionRefusedError: The worker was not listening
+        """
+        up_reader, up_writer = await asyncio.open_connection(
+            "127.0.0.1", worker.port
+        )
+        worker.in_flight += 1
+        try:
+            up_writer.write(encode_request(request, path))
+            await up_writer.drain()
+            # A caller that hangs up closes the upstream connection too, which
+            # cancels its query on the worker
+            hangup = asyncio.ensure_future(reader.read(1))
+            copy = asyncio.ensure_future(self._copy(up_reader, writer))
+            await asyncio.wait(
+                {hangup, copy}, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in (hangup, copy):
+                task.cancel()
+            await asyncio.gather(hangup, copy, return_exceptions=True)
+        finally:
+            worker.in_flight -= 1
+            up_writer.close()
+
+    @staticmethod
+    async def _copy(source, writer):
+        while True:
+            chunk = await source.read(65536)
+            if not chunk:
+                return
+            writer.write(chunk)
+            await writer.drain()
+
+
+def worker_command(args) -> list[str]:
+    command = [sys.executable, "-m", "mcp_core.gateway"]
+    if args.provider:
+        command += ["--provider", args.provider]
+    return command + ["--host", "127.0.0.1", "--port", "0", *args.server]
+
+
+async def serve(args):
+    supervisor = Supervisor.from_env(worker_command(args), args.workers)
+    await supervisor.start(args.port, args.host)
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+    loop.add_signal_handler(signal.SIGHUP, supervisor.start_rolling_restart)
+    print(
+        f"Serving on http://{args.host}:{supervisor.port} "
+        f"with {len(supervisor.workers)} workers",
+        flush=True,
+    )
+    await stop.wait()
+    print("Draining ...", flush=True)
+    await supervisor.drain()
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(
+        prog="python -m mcp_core.supervisor",
+        description="Serve MCPClient queries from several worker processes",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="worker processes (default: SUPERVISOR_WORKERS or the CPU count)",
+    )
+    parser.add_argument(
+        "--provider",
+        choices=sorted(PROFILES),
+        help="LLM backend (default: LLM_PROVIDER or deepseek)",
+    )
+    parser.add_argument("--host", default=os.getenv("GATEWAY_HOST", "127.0.0.1"))
+    parser.add_argument(
+        "--port", type=int, default=int(os.getenv("GATEWAY_PORT", "8080"))
+    )
+    parser.add_argument(
+        "server", nargs=argparse.REMAINDER, help="server script [args...] or config"
+    )
+    args = parser.parse_args()
+    if not args.server and not os.getenv("MCP_DAEMON_SOCKET"):
+        parser.error("a server script or servers.json is required")
+    asyncio.run(serve(args))
+
+
+if __name__ == "__main__":
+    main()
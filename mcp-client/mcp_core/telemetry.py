@@ -0,0 +1,388 @@
+"""Spans and metrics showing where each query's latency goes.
+
+``MCPClient`` records a span per stage: the whole ``query``, ``list_tools``,
+each ``llm_call`` (time to first token, total time, token usage), each
+``tool_call`` (server, tool, payload bytes) and ``normalize_results``.
+Spans nest through a context variable, so tool calls started inside a query
+are children of it.
+
+Finished spans feed in-memory Prometheus metrics and, optionally, exporters:
+
+- ``TELEMETRY_FILE``: append every span as one OpenTelemetry-style JSON
+  object per line (OTLP/JSON field names)
+- ``TELEMETRY_PORT``: serve the metrics in Prometheus text format on
+  ``http://127.0.0.1:<port>/metrics``
+"""
+
+import asyncio
+import json
+import os
+import secrets
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+SERVICE_NAME = "mcp-client"
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+_current_span: ContextVar[Optional["Span"]] = ContextVar("current_span", default=None)
+
+
+@dataclass
+class Span:
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_ns: int = field(default_factory=time.time_ns)
+    started: float = field(default_factory=time.perf_counter)
+    duration: Optional[float] = None
+    attributes: dict = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def mark(self, key: str):
+        """Record the seconds since the span started under key, once"""
+        if key not in self.attributes:
+            self.attributes[key] = time.perf_counter() - self.started
+
+    def to_otel(self) -> dict:
+        """The span in OTLP/JSON field names"""
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.start_ns + int((self.duration or 0) * 1e9)),
+            "attributes": [_otel_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": 2, "message": self.error} if self.error else {"code": 1},
+        }
+        if self.parent_id:
+            span["parentSpanId"] = self.parent_id
+        return span
+
+
+def _otel_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        self.values[key] = self.values.get(key, 0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for key, value in sorted(self.values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, key)} {value:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self, name: str, help: str, labels: tuple = (), buckets=DURATION_BUCKETS
+    ):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # label values -> [per-bucket counts..., +Inf count, sum]
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels):
+        key = tuple(labels.get(n, "") for n in self.labels)
+        counts = self.values.setdefault(key, [0] * (len(self.buckets) + 1) + [0.0])
+        counts[bisect_left(self.buckets, value)] += 1
+        counts[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, counts in sorted(self.values.items()):
+            total = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                total += count
+                le = f'le="{bound:g}"' if bound != "+Inf" else 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, key, le)} {total}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, key)} {counts[-1]:g}")
+            lines.append(f"{self.name}_count{_labels(self.labels, key)} {total}")
+        return lines
+
+
+class JsonlSpanExporter:
+    """Append finished spans to a file, one OTLP-style JSON object per line"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._resource = {
+            "attributes": [_otel_attribute("service.name", SERVICE_NAME)]
+        }
+
+    def export(self, span: Span):
+        record = {"resource": self._resource, **span.to_otel()}
+        self._file.write(json.dumps(record) + "\n")
+
+    def close(self):
+        self._file.close()
+
+
+class Telemetry:
+    """Records spans and turns them into metrics and exported traces"""
+
+    def __init__(self, exporters: Optional[list] = None, port: Optional[int] = None):
+        self.exporters = exporters or []
+        self.port = port
+        self._server: Optional[asyncio.AbstractServer] = None
+
+        self.stage_seconds = Histogram(
+            "mcp_stage_duration_seconds", "Duration of each query stage", ("stage",)
+        )
+        self.stage_errors = Counter(
+            "mcp_stage_errors_total", "Stages that raised", ("stage",)
+        )
+        self.first_token_seconds = Histogram(
+            "mcp_llm_time_to_first_token_seconds",
+            "Time until the model's first text or tool call",
+            ("provider", "model"),
+        )
+        self.llm_tokens = Counter(
+            "mcp_llm_tokens_total",
+            "Tokens used by model calls",
+            ("provider", "model", "type"),
+        )
+        self.tool_seconds = Histogram(
+            "mcp_tool_call_duration_seconds",
+            "Duration of MCP tool calls",
+            ("server", "tool"),
+        )
+        self.tool_bytes = Counter(
+            "mcp_tool_payload_bytes_total",
+            "Bytes of tool arguments (request) and results (response)",
+            ("server", "tool", "direction"),
+        )
+        self.tool_calls_collapsed = Counter(
+            "mcp_tool_calls_collapsed_total",
+            "Tool calls answered by an identical call already in flight",
+            ("tool",),
+        )
+        self.tool_schema_tokens = Counter(
+            "mcp_tool_schema_tokens_total",
+            "Estimated tokens of tool definitions sent and saved by tool subsetting",
+            ("provider", "model", "type"),
+        )
+        self.tool_subset_misses = Counter(
+            "mcp_tool_subset_misses_total",
+            "Tool searches and calls to tools left out of the query's subset",
+            ("provider", "model"),
+        )
+        self.metrics = [
+            self.stage_seconds,
+            self.stage_errors,
+            self.first_token_seconds,
+            self.llm_tokens,
+            self.tool_seconds,
+            self.tool_bytes,
+            self.tool_calls_collapsed,
+            self.tool_schema_tokens,
+            self.tool_subset_misses,
+        ]
+
+    @classmethod
+    def from_env(cls) -> "Telemetry":
+        """Build from ``TELEMETRY_FILE`` and ``TELEMETRY_PORT``"""
+        exporters = []
+        if os.getenv("TELEMETRY_FILE"):
+            exporters.append(JsonlSpanExporter(os.environ["TELEMETRY_FILE"]))
+        port = os.getenv("TELEMETRY_PORT")
+        return cls(exporters, int(port) if port else None)
+
+    @contextmanager
+    def span(self, name: str, **attributes):
+        """Time the enclosed block as a child of the current span"""
+        parent = _current_span.get()
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_id=parent.span_id if parent else None,
+            attributes=attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            _current_span.reset(token)
+            span.duration = time.perf_counter() - span.started
+            self.record(span)
+
+    def record(self, span: Span):
+        attrs = span.attributes
+        self.stage_seconds.observe(span.duration, stage=span.name)
+        if span.error:
+            self.stage_errors.inc(stage=span.name)
+        if span.name == "llm_call":
+            labels = {"provider": attrs.get("provider"), "model": attrs.get("model")}
+            if "time_to_first_token_s" in attrs:
+                self.first_token_seconds.observe(
+                    attrs["time_to_first_token_s"], **labels
+                )
+            self.llm_tokens.inc(attrs.get("input_tokens", 0), type="input", **labels)
+            self.llm_tokens.inc(attrs.get("output_tokens", 0), type="output", **labels)
+            if "tool_schema_tokens" in attrs:
+                self.tool_schema_tokens.inc(
+                    attrs["tool_schema_tokens"], type="sent", **labels
+                )
+                self.tool_schema_tokens.inc(
+                    attrs.get("tool_schema_tokens_saved", 0), type="saved", **labels
+                )
+                self.tool_subset_misses.inc(
+                    attrs.get("tool_subset_misses", 0), **labels
+                )
+        elif span.name == "tool_call":
+            labels = {"server": attrs.get("server"), "tool": attrs.get("tool")}
+            self.tool_seconds.observe(span.duration, **labels)
+            for direction in ("request", "response"):
+                self.tool_bytes.inc(
+                    attrs.get(f"{direction}_bytes", 0), direction=direction, **labels
+                )
+        for exporter in self.exporters:
+            exporter.export(span)
+
+    def metrics_text(self) -> str:
+        """All metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self.metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    async def start(self):
+        """Serve ``/metrics`` when a port is configured"""
+        if self.port is not None and self._server is None:
+            self._server = await serve_text(
+                self.port, {"/metrics": self.metrics_text}
+            )
+
+    async def close(self):
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        for exporter in self.exporters:
+            exporter.close()
+
+
+async def serve_text(port: int, routes: dict, host: str = "127.0.0.1"):
+    """Minimal HTTP/1.0 server answering GET requests with plain text
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        routes: Path to a callable returning the response body
+        host: Interface to bind; local only by default
+    """
+
+    async def handle(reader, writer):
+        try:
+            request = await reader.readline()
+            while (await reader.readline()).strip():
+                pass  # headers are not needed
+            parts = request.decode("latin-1").split()
+            route = routes.get(parts[1].split("?")[0]) if len(parts) > 1 else None
+            if parts[:1] == ["GET"] and route is not None:
+                status = "200 OK"
+                body = route().encode()
+            else:
+                status = "404 Not Found"
+                body = b"not found\n"
+            writer.write(
+                f"HTTP/1.0 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode()
+                + body
+            )
+            await writer.drain()
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle, host, port)
+
+
+def _result_bytes(result) -> int:
+    size = 0
+    for part in getattr(result, "content", None) or []:
+        value = getattr(part, "text", None) or getattr(part, "data", None) or ""
+        size += len(value.encode()) if isinstance(value, str) else len(value)
+    return size
+
+
+class TracedSession:
+    """Session wrapper recording a ``tool_call`` span per call
+
+    Everything except ``call_tool`` is passed through to the wrapped
+    session or router.
+    """
+
+    def __init__(self, session, telemetry: Telemetry):
+        self.session = session
+        self.telemetry = telemetry
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def _server_name(self, name: str) -> str:
+        resolve = getattr(self.session, "resolve", None)
+        if resolve is None:
+            return ""
+        try:
+            pool, _ = await resolve(name)
+        except ValueError:
+            return ""
+        return pool.name
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        with self.telemetry.span(
+            "tool_call",
+            tool=name,
+            server=await self._server_name(name),
+            request_bytes=len(json.dumps(arguments or {}).encode()),
+        ) as span:
+            result = await self.session.call_tool(name, arguments)
+            span.set(
+                response_bytes=_result_bytes(result),
+                is_error=bool(getattr(result, "isError", False)),
+            )
+            return result
@@ -0,0 +1,345 @@
+"""Send the model only the tools relevant to the query.
+
+Every model call carries the full tool list, and with several servers that
+list can cost more prompt tokens than the question itself. With
+``TOOL_SUBSET=1``, ``ToolIndex`` ranks the tools against each query with
+BM25 over their names, descriptions and argument names, and the query
+offers only:
+
+- the ``TOOL_SUBSET_TOP_K`` best matches (default 8)
+- tools already called earlier in the conversation
+- the tools in ``TOOL_SUBSET_ALWAYS`` (comma-separated; ``read_tool_result``
+  is always included)
+- the ``search_tools`` pseudo-tool, which searches the whole index
+
+Tools found by ``search_tools`` are offered from the next model call of the
+query on. A ``search_tools`` call, or a call to a tool that was not
+offered, counts as a miss: the subset left out a tool the model needed.
+Misses and the estimated tool-definition tokens sent and saved are
+exported as ``mcp_tool_subset_misses_total`` and
+``mcp_tool_schema_tokens_total``.
+
+Catalogs no larger than the subset are sent whole. A different subset per
+query changes the request prefix, so provider-side prompt caching of the
+tool block only helps queries that pick the same tools.
+"""
+
+import json
+import math
+import os
+import re
+from collections import Counter
+from typing import Any, Optional
+
+from mcp import types
+
+from mcp_core.cache import tool_name
+from mcp_core.catalog import ToolCatalog, anthropic_tool, openai_tool
+from mcp_core.history import CHARS_PER_TOKEN
+from mcp_core.shaping import PAGE_TOOL
+
+SEARCH_TOOL = "search_tools"
+
+SEARCH_TOOL_DEFINITION = types.Tool(
+    name=SEARCH_TOOL,
+    description=(
+        "Find tools that are not in your tool list yet. Describe what you "
+        "want to do; the best matching tools become available to call."
+    ),
+    inputSchema={
+        "type": "object",
+        "properties": {
+            "query": {"type": "string", "description": "What the tool should do"},
+        },
+        "required": ["query"],
+    },
+)
+
+# Tools returned by one search_tools call
+SEARCH_LIMIT = 5
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Name words count more than description words
+NAME_WEIGHT = 3
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from how i in is it me my of on or "
+    "please the this to use what with you".split()
+)
+
+
+def terms(text: str) -> list[str]:
+    """Lowercase word stems of ``text``, splitting snake and camel case"""
+    text = re.sub(r"([a-z0-9])([A-Z])", r"\1 \2", text)
+    words = []
+    for word in re.findall(r"[a-z0-9]+", text.lower()):
+        if word in STOPWORDS:
+            continue
+        if len(word) > 4 and word.endswith("ies"):
+            word = word[:-3] + "y"
+        elif len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+            word = word[:-1]
+        words.append(word)
+    return words
+
+
+def _schema_text(schema: Any) -> str:
+    """Argument names and descriptions of an input schema"""
+    properties = (schema or {}).get("properties") or {}
+    parts = []
+    for name, spec in properties.items():
+        parts.append(name)
+        if isinstance(spec, dict) and spec.get("description"):
+            parts.append(str(spec["description"]))
+    return " ".join(parts)
+
+
+def _field(item, key: str):
+    if isinstance(item, dict):
+        return item.get(key)
+    return getattr(item, key, None)
+
+
+def called_tools(messages: list) -> set[str]:
+    """Names of the tools called in ``messages``, in either provider format"""
+    names = set()
+    for message in messages:
+        for call in _field(message, "tool_calls") or []:
+            names.add(_field(_field(call, "function"), "name"))
+        content = _field(message, "content")
+        if isinstance(content, list):
+            for block in content:
+                if _field(block, "type") == "tool_use":
+                    names.add(_field(block, "name"))
+    names.discard(None)
+    return names
+
+
+def _tool_tokens(tool: types.Tool) -> int:
+    return len(json.dumps(openai_tool(tool))) // CHARS_PER_TOKEN
+
+
+def _text_result(text: str) -> types.CallToolResult:
+    return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+
+class ToolIndex:
+    """BM25 index over a tool catalog, rebuilt when the catalog changes"""
+
+    def __init__(
+        self,
+        catalog: ToolCatalog,
+        top_k: int = 8,
+        always: tuple[str, ...] = (),
+    ):
+        """
+        Args:
+            catalog: All tools, including ``search_tools``
+            top_k: Best-matching tools offered per query
+            always: Tool names (with or without server prefix) always offered
+        """
+        self.catalog = catalog
+        self.top_k = top_k
+        self.always = frozenset(always) | {PAGE_TOOL}
+        self._version: Optional[int] = None
+        self._tools: dict[str, types.Tool] = {}
+        self._docs: dict[str, Counter] = {}
+        self._lengths: dict[str, int] = {}
+        self._df: Counter = Counter()
+        self._tokens: dict[str, int] = {}
+        self.queries = 0
+        self.searches = 0
+        self.misses = 0
+        self.tokens_sent = 0
+        self.tokens_saved = 0
+
+    @classmethod
+    def from_env(cls, catalog: ToolCatalog) -> "ToolIndex":
+        always = os.getenv("TOOL_SUBSET_ALWAYS", "")
+        return cls(
+            catalog,
+            top_k=int(os.getenv("TOOL_SUBSET_TOP_K", "8")),
+            always=tuple(name.strip() for name in always.split(",") if name.strip()),
+        )
+
+    async def _refresh(self):
+        tools = await self.catalog.tools()
+        if self._version == self.catalog.version:
+            return
+        self._tools = {tool.name: tool for tool in tools}
+        self._docs = {}
+        for tool in tools:
+            words = terms(tool.name) * NAME_WEIGHT
+            words += terms(tool.description or "")
+            words += terms(_schema_text(tool.inputSchema))
+            self._docs[tool.name] = Counter(words)
+        self._lengths = {name: sum(doc.values()) for name, doc in self._docs.items()}
+        self._df = Counter(word for doc in self._docs.values() for word in doc)
+        self._tokens = {name: _tool_tokens(tool) for name, tool in self._tools.items()}
+        self._version = self.catalog.version
+
+    def rank(self, query: str, limit: int) -> list[str]:
+        """Up to ``limit`` tool names matching ``query``, best first"""
+        words = terms(query)
+        if not words or not self._docs:
+            return []
+        count = len(self._docs)
+        average = sum(self._lengths.values()) / count or 1
+        scores = {}
+        for name, doc in self._docs.items():
+            if name == SEARCH_TOOL:
+                continue
+            score = 0.0
+            for word in words:
+                tf = doc.get(word)
+                if not tf:
+                    continue
+                df = self._df[word]
+                idf = math.log(1 + (count - df + 0.5) / (df + 0.5))
+                norm = K1 * (1 - B + B * self._lengths[name] / average)
+                score += idf * tf * (K1 + 1) / (tf + norm)
+            if score > 0:
+                scores[name] = score
+        return sorted(scores, key=lambda name: (-scores[name], name))[:limit]
+
+    async def select(self, query: str, history: Optional[list] = None):
+        """The tools to offer for one query
+
+        Args:
+            query: The user's question
+            history: Earlier messages; tools called there stay offered
+        """
+        await self._refresh()
+        self.queries += 1
+        everything = set(self._tools) - {SEARCH_TOOL}
+        if len(everything) <= self.top_k:
+            return ToolSelection(self, everything)
+        names = set(self.rank(query, self.top_k))
+        names |= called_tools(history or [])
+        names |= {
+            name
+            for name in everything
+            if name in self.always or tool_name(name) in self.always
+        }
+        names &= everything
+        if names == everything:
+            # Nothing left out, so nothing to search for
+            return ToolSelection(self, names)
+        return ToolSelection(self, names | {SEARCH_TOOL})
+
+    async def search(self, arguments: Optional[dict]) -> types.CallToolResult:
+        """Answer a ``search_tools`` call"""
+        await self._refresh()
+        query = str((arguments or {}).get("query", ""))
+        found = self.rank(query, SEARCH_LIMIT)
+        if not found:
+            return _text_result(f"No tools match {query!r}.")
+        lines = [
+            f"- {name}: {self._tools[name].description or ''}".rstrip()
+            for name in found
+        ]
+        return _text_result("These tools are now available:\n" + "\n".join(lines))
+
+    def stats(self) -> dict:
+        return {
+            "queries": self.queries,
+            "searches": self.searches,
+            "misses": self.misses,
+            "tokens_sent": self.tokens_sent,
+            "tokens_saved": self.tokens_saved,
+        }
+
+
+class ToolSelection:
+    """The tools offered during one query
+
+    It stands in for a ``ToolCatalog`` in ``Provider.tools()`` and grows as
+    the model searches for or calls tools that were left out.
+    """
+
+    def __init__(self, index: ToolIndex, names: set[str]):
+        self.index = index
+        self.names = names
+
+    def _tools(self) -> list[types.Tool]:
+        tools = self.index._tools
+        # Sorted like ToolCatalog payloads, for the same prompt-cache reasons
+        return [tools[name] for name in sorted(self.names) if name in tools]
+
+    async def anthropic_tools(self) -> list[dict]:
+        return [anthropic_tool(tool) for tool in self._tools()]
+
+    async def openai_tools(self) -> list[dict]:
+        return [openai_tool(tool) for tool in self._tools()]
+
+    def tokens(self) -> tuple[int, int]:
+        """Estimated tool-definition tokens sent and saved per model call"""
+        costs = self.index._tokens
+        sent = sum(costs.get(name, 0) for name in self.names)
+        return sent, sum(costs.values()) - sent
+
+    def record_call(self) -> tuple[int, int]:
+        """Count one model call's tokens in the index stats"""
+        sent, saved = self.tokens()
+        self.index.tokens_sent += sent
+        self.index.tokens_saved += saved
+        return sent, saved
+
+    def observe(self, calls: list) -> int:
+        """Offer the tools the model searched for or reached for
+
+        Args:
+            calls: The ``ToolCall``s of one model reply
+
+        Returns:
+            How many of them were misses
+        """
+        misses = 0
+        for call in calls:
+            if tool_name(call.name) == SEARCH_TOOL:
+                self.index.searches += 1
+                misses += 1
+                query = (
+                    call.arguments.get("query", "")
+                    if isinstance(call.arguments, dict)
+                    else ""
+                )
+                self.names.update(self.index.rank(str(query), SEARCH_LIMIT))
+            elif call.name not in self.names and call.name in self.index._tools:
+                misses += 1
+                self.names.add(call.name)
+        self.index.misses += misses
+        return misses
+
+
+class ToolSearchSession:
+    """Session wrapper that adds the ``search_tools`` pseudo-tool
+
+    ``index`` ranks its catalog; ``MCPClient`` uses it to pick each query's
+    tools. Everything else is passed through to the wrapped session.
+    """
+
+    def __init__(self, session, index_factory=ToolIndex):
+        self.session = session
+        self.tool_catalog = ToolCatalog(self._fetch_tools)
+        session.tool_catalog.on_invalidate(self.tool_catalog.invalidate)
+        self.index = index_factory(self.tool_catalog)
+
+    @classmethod
+    def from_env(cls, session) -> "ToolSearchSession":
+        return cls(session, ToolIndex.from_env)
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    async def _fetch_tools(self) -> list[types.Tool]:
+        tools = list(await self.session.tool_catalog.tools())
+        return tools + [SEARCH_TOOL_DEFINITION]
+
+    async def call_tool(self, name: str, arguments: Optional[dict] = None):
+        if tool_name(name) == SEARCH_TOOL:
+            return await self.index.search(arguments)
+        return await self.session.call_tool(name, arguments)
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+import asyncio
+import threading
+from types import SimpleNamespace
+
+from mcp import types
+from openai.types.chat import ChatCompletion
+
+from mcp_core.answers import AnswerCache, AnswerRecord, AnswerRecordingSession
+from mcp_core.catalog import ToolCatalog
+from mcp_core.client import MCPClient
+from mcp_core.executor import ToolExecutor
+from mcp_core.providers import OpenAIProvider
+
+
+def completion(content=None, tool_calls=None):
+    return ChatCompletion(
+        id="c",
+        object="chat.completion",
+        created=0,
+        model="fake",
+        choices=[
+            {
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": content,
+                    "tool_calls": tool_calls,
+                },
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }
+        ],
+    )
+
+
+def read_call(path):
+    arguments = '{"path": "%s"}' % path
+    return [
+        {
+            "id": "1",
+            "type": "function",
+            "function": {"name": "read_text_file", "arguments": arguments},
+        }
+    ]
+
+
+class ScriptedLLM:
+    """Fake AsyncOpenAI client replaying a fixed list of replies"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **request):
+        self.requests.append(request)
+        return self.replies.pop(0)
+
+    async def close(self):
+        pass
+
+
+class FakeFilesystem:
+    def __init__(self):
+        self.tool_catalog = ToolCatalog(self.fetch)
+
+    async def fetch(self):
+        return [
+            types.Tool(name=name, inputSchema={"type": "object"})
+            for name in ("read_text_file", "write_file")
+        ]
+
+    async def call_tool(self, name, arguments=None):
+        if name == "write_file":
+            with open(arguments["path"], "w") as f:
+                f.write(arguments["content"])
+            text = "ok"
+        else:
+            with open(arguments["path"]) as f:
+                text = f.read()
+        return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_ttl_eviction_and_persistence(tmp_path):
+    clock = FakeClock()
+    path = str(tmp_path / "answers.sqlite3")
+    cache = AnswerCache(path, ttl=60, ttls={"get_weather": 10}, clock=clock)
+    weather = AnswerRecord(tools={"get_weather"})
+    cache.put("tokyo", "weather in tokyo", "Sunny", weather)
+    cache.put("root", "list the root", "a b c", AnswerRecord())
+    cache.put("write", "write x", "done", AnswerRecord(cacheable=False))
+    cache.close()
+
+    # A new process sees the same answers
+    cache = AnswerCache(path, ttl=60, ttls={"get_weather": 10}, clock=clock)
+    assert cache.get("tokyo") == "Sunny" and cache.get("write") is None
+    clock.now += 30
+    assert cache.get("tokyo") is None and cache.get("root") == "a b c"
+
+    # The least recently used answers go first once over max_bytes
+    cache.max_bytes = 40
+    clock.now += 1
+    cache.put("one", "q" * 10, "a" * 10, AnswerRecord())
+    clock.now += 1
+    cache.put("two", "q" * 10, "a" * 10, AnswerRecord())
+    assert cache.get("root") is None and cache.get("one") == "a" * 10
+    assert cache.stats()["evictions"] == 1
+    cache.close()
+
+
+def test_keys_normalize_the_query():
+    key = AnswerCache.key
+    assert key("What's the weather in Tokyo?", "P", "m", "c", []) == key(
+        "  what's the WEATHER in tokyo ", "P", "m", "c", []
+    )
+    assert key("weather", "P", "m", "c", []) != key("weather", "P", "m", "c2", [])
+    assert key("weather", "P", "m", "c", []) != key(
+        "weather", "P", "m", "c", [{"role": "user", "content": "hi"}]
+    )
+
+
+def test_directory_answers_notice_nested_changes(tmp_path):
+    nested = tmp_path / "src" / "pkg"
+    nested.mkdir(parents=True)
+    (nested / "mod.py").write_text("x = 1")
+    cache = AnswerCache(":memory:")
+    with cache.recording() as record:
+        cache.note("directory_tree", {"path": str(tmp_path)}, "tree")
+    cache.put("tree", "show the tree", "src/pkg/mod.py", record)
+    assert cache.get("tree") == "src/pkg/mod.py"
+
+    # Neither the root's size nor its mtime changes
+    (nested / "other.py").write_text("y = 2")
+    assert cache.get("tree") is None
+    cache.close()
+
+
+async def run_repeated_questions(tmp_path):
+    notes = tmp_path / "notes.txt"
+    notes.write_text("buy milk")
+    llm = ScriptedLLM(
+        [
+            completion(tool_calls=read_call(notes)),
+            completion(content="Buy milk."),
+            completion(tool_calls=read_call(notes)),
+            completion(content="Buy bread."),
+        ]
+    )
+    client = MCPClient(OpenAIProvider("TEST", "fake", client=llm), debug=False)
+    client.answer_cache = AnswerCache(str(tmp_path / "answers.sqlite3"))
+    lookup_threads = []
+    get = client.answer_cache.get
+
+    def tracked_get(key):
+        lookup_threads.append(threading.get_ident())
+        return get(key)
+
+    client.answer_cache.get = tracked_get
+    client.session = AnswerRecordingSession(FakeFilesystem(), client.answer_cache)
+    client.executor = ToolExecutor(client.session)
+
+    first = await client.process_query("What is in my notes?")
+    again = await client.process_query("what is in my notes")
+    assert again == first and len(llm.requests) == 2
+    # File checks and SQLite stay off the event loop
+    assert threading.get_ident() not in lookup_threads
+
+    # A file the answer read changed, so the question is asked again
+    notes.write_text("buy bread")
+    third = await client.process_query("What is in my notes?")
+    assert third.endswith("Buy bread.") and len(llm.requests) == 4
+
+    # Writes through the client drop the answers that read the path
+    await client.session.call_tool(
+        "write_file", {"path": str(notes), "content": "buy eggs"}
+    )
+    stats = client.answer_cache.stats()
+    assert stats["invalidations"] == 1 and stats["entries"] == 0
+    await client.cleanup()
+
+
+def test_repeats_are_answered_until_files_change(tmp_path):
+    asyncio.run(run_repeated_questions(tmp_path))
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+
+from mcp_core.batch import completed_ids, run_batch
+
+
+class FakeClient:
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.seen = []
+
+    async def process_query(self, query, run=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        self.seen.append(query)
+        run.begin_iteration()
+        run.record_tools(1)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if query == "fail":
+            raise RuntimeError("upstream error")
+        return query.upper()
+
+
+def write_lines(path, items):
+    path.write_text("".join(json.dumps(item) + "\n" for item in items))
+
+
+def test_batch_runs_concurrently_and_records_errors(tmp_path):
+    queries = tmp_path / "queries.jsonl"
+    output = tmp_path / "results.jsonl"
+    items = [{"id": f"q{i}", "query": f"query {i}"} for i in range(6)]
+    write_lines(queries, items + ["fail"])
+    client = FakeClient()
+
+    summary = asyncio.run(run_batch(client, str(queries), str(output), concurrency=3))
+
+    records = {r["id"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert summary["succeeded"] == 6 and summary["failed"] == 1
+    assert client.peak == 3
+    assert records["q2"]["response"] == "QUERY 2"
+    assert records["q2"]["tool_calls"] == 1
+    assert records["7"]["error"] == "RuntimeError: upstream error"
+
+
+def test_resume_skips_completed_queries(tmp_path):
+    queries = tmp_path / "queries.jsonl"
+    output = tmp_path / "results.jsonl"
+    write_lines(queries, [{"id": "a", "query": "a"}, {"id": "b", "query": "b"}, "c"])
+    write_lines(
+        output,
+        [{"id": "a", "response": "A", "error": None}, {"id": "3", "error": "boom"}],
+    )
+    client = FakeClient()
+
+    summary = asyncio.run(
+        run_batch(client, str(queries), str(output), concurrency=2, resume=True)
+    )
+
+    assert sorted(client.seen) == ["b", "c"]
+    assert summary["skipped"] == 1
+    assert completed_ids(str(output)) == {"a", "b", "3"}
+
+
+def test_completed_ids_skips_stray_lines(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text('{"id": "a", "error": null}\n12\n{"response": "x"}\n{"id": "b\n')
+    assert completed_ids(str(output)) == {"a"}
+
+
+def test_bad_lines_become_error_records(tmp_path):
+    queries = tmp_path / "queries.jsonl"
+    output = tmp_path / "results.jsonl"
+    queries.write_text('{"id": "ok", "query": "fine"}\n{not json\n{"id": "x"}\n[1]\n')
+    client = FakeClient()
+
+    summary = asyncio.run(run_batch(client, str(queries), str(output)))
+
+    records = {r["id"]: r for r in map(json.loads, output.read_text().splitlines())}
+    assert summary["succeeded"] == 1 and summary["failed"] == 3
+    assert records["ok"]["response"] == "FINE"
+    assert records["2"]["error"].startswith("invalid JSON")
+    assert records["x"]["error"] == 'missing or non-string "query"'
+    assert records["4"]["error"] == "expected a string or an object"
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+from bench.harness import compare, summarize
+from bench.mock_llm import script_step
+
+SCRIPT = [{"tool_calls": [{"name": "get_weather"}]}, {"content": "done"}]
+
+
+def test_script_step_follows_each_conversation():
+    first = [{"role": "user", "content": "hi"}]
+    after_tool = first + [
+        {"role": "assistant", "content": "", "tool_calls": []},
+        {"role": "tool", "tool_call_id": "1", "content": "cloudy"},
+    ]
+    next_query = after_tool + [
+        {"role": "assistant", "content": "done"},
+        {"role": "user", "content": "again"},
+    ]
+
+    assert script_step(SCRIPT, first) is SCRIPT[0]
+    assert script_step(SCRIPT, after_tool) is SCRIPT[1]
+    assert script_step(SCRIPT, next_query) is SCRIPT[0]
+
+
+def test_compare_reports_numeric_changes():
+    old = {"config": {"queries": 10}, "servers": {"w": {"p50_ms": 2.0, "tool": "x"}}}
+    new = {"config": {"queries": 20}, "servers": {"w": {"p50_ms": 3.0, "tool": "x"}}}
+
+    assert compare(old, new) == ["servers.w.p50_ms: 2.0 -> 3.0 (+50.0%)"]
+    assert summarize([0.002, 0.001, 0.003])["p50_ms"] == 2.0
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+import asyncio
+from types import SimpleNamespace
+
+from mcp.types import CallToolResult, TextContent
+from openai.types.chat import ChatCompletion
+
+from mcp_core.budget import LoopBudget, QueryRun
+from mcp_core.client import MCPClient
+from mcp_core.executor import ToolExecutor
+from mcp_core.providers import OpenAIProvider
+
+
+def completion(content=None, tool_calls=None):
+    return ChatCompletion(
+        id="c",
+        object="chat.completion",
+        created=0,
+        model="fake",
+        choices=[
+            {
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": content,
+                    "tool_calls": tool_calls,
+                },
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }
+        ],
+    )
+
+
+def tool_call(id, name, arguments):
+    return {
+        "id": id,
+        "type": "function",
+        "function": {"name": name, "arguments": arguments},
+    }
+
+
+class ScriptedLLM:
+    """Fake AsyncOpenAI client replaying a fixed list of replies"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **request):
+        self.requests.append(request)
+        return self.replies.pop(0)
+
+    async def close(self):
+        pass
+
+
+class FakeSession:
+    def __init__(self):
+        self.tool_catalog = SimpleNamespace(openai_tools=self.openai_tools)
+        self.calls = []
+
+    async def openai_tools(self):
+        return []
+
+    async def call_tool(self, name, arguments=None):
+        self.calls.append((name, arguments))
+        if name == "boom":
+            raise RuntimeError("server went away")
+        return CallToolResult(content=[TextContent(type="text", text=f"{name} ok")])
+
+
+def make_client(replies):
+    llm = ScriptedLLM(replies)
+    client = MCPClient(OpenAIProvider("TEST", "fake", client=llm), debug=False)
+    client.session = FakeSession()
+    client.executor = ToolExecutor(client.session)
+    return client, llm
+
+
+def test_tool_errors_are_reported_to_the_model():
+    client, llm = make_client(
+        [
+            completion(
+                tool_calls=[
+                    tool_call("1", "read", '{"path": "a"}'),
+                    tool_call("2", "read", "not json"),
+                    tool_call("3", "boom", "{}"),
+                ]
+            ),
+            completion("done"),
+        ]
+    )
+
+    answer = asyncio.run(client.process_query("go"))
+
+    assert answer.endswith("done")
+    assert client.session.calls == [("read", {"path": "a"}), ("boom", {})]
+    tool_messages = [m for m in llm.requests[1]["messages"] if m["role"] == "tool"]
+    assert [m["tool_call_id"] for m in tool_messages] == ["1", "2", "3"]
+    assert tool_messages[0]["content"] == "read ok"
+    assert tool_messages[1]["content"].startswith("Error parsing tool arguments")
+    assert tool_messages[2]["content"] == "Error: server went away"
+
+
+def test_final_round_disables_tools():
+    client, llm = make_client(
+        [
+            completion(tool_calls=[tool_call("1", "read", "{}")]),
+            completion("answer"),
+        ]
+    )
+    run = QueryRun(LoopBudget(max_iterations=1))
+
+    answer = asyncio.run(client.process_query("go", run=run))
+
+    assert "answer" in answer
+    assert "tool_choice" not in llm.requests[0]
+    assert llm.requests[1]["tool_choice"] == "none"
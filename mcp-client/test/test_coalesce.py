@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+import asyncio
+
+from mcp import types
+
+from mcp_core.catalog import ToolCatalog
+from mcp_core.coalesce import CoalescingSession, split_multiple_files
+
+
+def text_result(text, is_error=False):
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=text)], isError=is_error
+    )
+
+
+class FakeFilesystem:
+    """Formats read_multiple_files results like the filesystem server"""
+
+    def __init__(self, files):
+        self.files = files
+        self.calls = []
+        self.tool_catalog = ToolCatalog(self.fetch)
+
+    async def fetch(self):
+        names = ["read_text_file", "read_multiple_files", "write_file"]
+        return [
+            types.Tool(name=f"filesystem__{n}", inputSchema={"type": "object"})
+            for n in names
+        ]
+
+    def entry(self, path):
+        if path in self.files:
+            return f"{path}:\n{self.files[path]}\n"
+        return f"{path}: Error - ENOENT: no such file"
+
+    async def call_tool(self, name, arguments=None):
+        self.calls.append((name, arguments))
+        await asyncio.sleep(0.01)
+        if name.endswith("read_multiple_files"):
+            entries = [self.entry(path) for path in arguments["paths"]]
+            return text_result("\n---\n".join(entries))
+        if name.endswith("read_text_file"):
+            path = arguments["path"]
+            if path not in self.files:
+                return text_result("Error: ENOENT: no such file", is_error=True)
+            return text_result(self.files[path])
+        return text_result("ok")
+
+
+def test_split_keeps_separators_inside_files():
+    text = "/a:\none\n---\ntwo\n\n---\n/b: Error - denied\n---\n/c:\n\n"
+    assert split_multiple_files(text, ["/a", "/b", "/c"]) == [
+        (True, "one\n---\ntwo"),
+        (False, "denied"),
+        (True, ""),
+    ]
+    assert split_multiple_files("unexpected", ["/a", "/b"]) is None
+
+
+async def run_turn():
+    server = FakeFilesystem({"/a.txt": "alpha", "/b.txt": "bravo"})
+    session = CoalescingSession(server, window=0.005)
+    calls = [
+        session.call_tool("filesystem__read_text_file", {"path": "/a.txt"}),
+        session.call_tool("filesystem__read_text_file", {"path": "/b.txt"}),
+        session.call_tool("filesystem__read_text_file", {"path": "/a.txt"}),
+        session.call_tool("filesystem__read_text_file", {"path": "/missing"}),
+        session.call_tool("filesystem__read_text_file", {"path": "/a.txt", "head": 9}),
+    ]
+    a, b, again, missing, head = await asyncio.gather(*calls)
+
+    assert [r.content[0].text for r in (a, b, again)] == ["alpha", "bravo", "alpha"]
+    assert missing.isError
+    assert missing.content[0].text == "Error: ENOENT: no such file"
+    assert head.content[0].text == "alpha"
+    # One batch for the plain reads; the head= read is passed through
+    assert server.calls[1] == (
+        "filesystem__read_multiple_files",
+        {"paths": ["/a.txt", "/b.txt", "/missing"]},
+    )
+    assert len(server.calls) == 2
+    assert session.stats() == {"calls": 4, "batches": 1, "fallbacks": 0}
+    await session.close()
+
+
+async def run_fallback():
+    server = FakeFilesystem({"/a.txt": "alpha", "/b.txt": "bravo"})
+    server.entry = lambda path: "garbled"
+    session = CoalescingSession(server, window=0.005)
+    a, b = await asyncio.gather(
+        session.call_tool("filesystem__read_text_file", {"path": "/a.txt"}),
+        session.call_tool("filesystem__read_text_file", {"path": "/b.txt"}),
+    )
+    assert (a.content[0].text, b.content[0].text) == ("alpha", "bravo")
+    assert session.fallbacks == 1 and len(server.calls) == 3
+    await session.close()
+
+
+def test_reads_in_one_window_share_a_batch():
+    asyncio.run(run_turn())
+
+
+def test_unsplittable_batches_fall_back_to_single_reads():
+    asyncio.run(run_fallback())
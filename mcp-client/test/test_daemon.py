@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import tempfile
+
+import pytest
+from mcp import types
+
+from mcp_core.catalog import ToolCatalog
+from mcp_core.daemon import Daemon, DaemonError, RemoteSession
+
+
+class FakeRouter:
+    """Stands in for a started ServerRouter"""
+
+    def __init__(self):
+        self.pools = {"weather": None}
+        self.max_concurrency = 3
+        self.names = ["get_weather"]
+        self.tool_catalog = ToolCatalog(self.fetch)
+
+    async def fetch(self):
+        return [
+            types.Tool(name=name, inputSchema={"type": "object"}) for name in self.names
+        ]
+
+    async def call_tool(self, name, arguments=None):
+        if name == "boom":
+            raise RuntimeError("server crashed")
+        await asyncio.sleep(0.05 if arguments["city"] == "slow" else 0)
+        text = f"{arguments['city']}: cloudy"
+        return types.CallToolResult(content=[types.TextContent(type="text", text=text)])
+
+
+async def scenario(path):
+    router = FakeRouter()
+    daemon = Daemon(router, path)
+    await daemon.start()
+    remote = await RemoteSession.connect(path)
+    try:
+        assert remote.servers == ["weather"] and remote.max_concurrency == 3
+        assert [t.name for t in await remote.tool_catalog.tools()] == ["get_weather"]
+
+        slow, fast = await asyncio.gather(
+            remote.call_tool("get_weather", {"city": "slow"}),
+            remote.call_tool("get_weather", {"city": "Oslo"}),
+        )
+        assert slow.content[0].text == "slow: cloudy"
+        assert fast.content[0].text == "Oslo: cloudy"
+
+        with pytest.raises(DaemonError, match="server crashed"):
+            await remote.call_tool("boom", {})
+
+        router.names.append("read_text_file")
+        router.tool_catalog.invalidate()
+        await asyncio.sleep(0.05)
+        assert len(await remote.tool_catalog.tools()) == 2
+    finally:
+        await remote.close()
+        await daemon.close()
+    assert not os.path.exists(path)
+
+
+def test_remote_session_round_trip():
+    # Unix socket paths are limited to ~100 bytes, so avoid pytest's tmp_path
+    with tempfile.TemporaryDirectory(dir="/tmp") as directory:
+        asyncio.run(scenario(os.path.join(directory, "d.sock")))
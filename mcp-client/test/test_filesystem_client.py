@@ -4,14 +4,21 @@ import json
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 from contextlib import AsyncExitStack
+from pathlib import Path
 
-async def test_filesystem_server():
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+SERVER_DIR = REPO_ROOT / "mcp-server" / "filesystem"
+
+
+async def exercise_filesystem_server():
     """Test the filesystem server with direct tool calls"""
     
     # Server parameters
     server_params = StdioServerParameters(
         command="node",
-        args=["../mcp-server/filesystem/dist/index.js", "/Users/zhangbeibei/code/github/mcp_tutorial"],
+        args=[str(SERVER_DIR / "dist" / "index.js"), str(REPO_ROOT)],
         env=None
     )
     
@@ -34,7 +41,7 @@ async def test_filesystem_server():
         # Test list_directory tool
         try:
             print("\n=== Testing list_directory ===")
-            result = await session.call_tool("list_directory", {"path": "/Users/zhangbeibei/code/github/mcp_tutorial"})
+            result = await session.call_tool("list_directory", {"path": str(REPO_ROOT)})
             print("Result:", result)
         except Exception as e:
             print(f"Error calling list_directory: {e}")
@@ -42,10 +49,20 @@ async def test_filesystem_server():
         # Test read_text_file tool
         try:
             print("\n=== Testing read_text_file ===")
-            result = await session.call_tool("read_text_file", {"path": "/Users/zhangbeibei/code/github/mcp_tutorial/README.md"})
+            result = await session.call_tool("read_text_file", {"path": str(REPO_ROOT / "README.md")})
             print("Result:", result)
         except Exception as e:
             print(f"Error calling read_text_file: {e}")
 
+
+@pytest.mark.skipif(
+    not (SERVER_DIR / "dist" / "index.js").exists()
+    or not (SERVER_DIR / "node_modules").is_dir(),
+    reason="mcp-server/filesystem is not built",
+)
+def test_filesystem_server():
+    asyncio.run(exercise_filesystem_server())
+
+
 if __name__ == "__main__":
-    asyncio.run(test_filesystem_server())
+    asyncio.run(exercise_filesystem_server())
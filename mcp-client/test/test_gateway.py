@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+
+import httpx
+
+from mcp_core.gateway import AdmissionController, Gateway
+from mcp_core.history import ConversationStore
+from mcp_core.telemetry import Telemetry
+
+
+class StubClient:
+    """Stands in for a connected MCPClient"""
+
+    def __init__(self):
+        self.telemetry = Telemetry()
+        self.history = ConversationStore()
+        self.queries = []
+
+    async def process_query(self, query, on_text=None, run=None, history=None):
+        self.queries.append(query)
+        if query.startswith("slow"):
+            await asyncio.sleep(0.3)
+        if query == "fail":
+            raise RuntimeError("model unavailable")
+        if history is not None:
+            history.add_turn([{"role": "user", "content": query}])
+        words = ["answer ", "to ", query]
+        for word in words:
+            if on_text:
+                on_text(word)
+        return "".join(words)
+
+
+async def start(admission=None):
+    gateway = Gateway(StubClient(), admission or AdmissionController())
+    await gateway.start(port=0)
+    http = httpx.AsyncClient(base_url=f"http://127.0.0.1:{gateway.port}")
+    return gateway, http
+
+
+async def run_queries():
+    gateway, http = await start()
+    try:
+        response = await http.post("/v1/query", json={"query": "hi"})
+        assert response.status_code == 200
+        assert response.json()["answer"] == "answer to hi"
+
+        response = await http.post("/v1/query", json={"query": "fail"})
+        assert response.status_code == 500
+        assert response.json() == {"error": "model unavailable"}
+
+        response = await http.post("/v1/query", content=b"not json")
+        assert response.status_code == 400
+        assert (await http.get("/nowhere")).status_code == 404
+
+        events = []
+        async with http.stream(
+            "POST", "/v1/query", json={"query": "hi", "stream": True}
+        ) as response:
+            assert response.headers["content-type"] == "text/event-stream"
+            async for line in response.aiter_lines():
+                if line.startswith("data: "):
+                    events.append(json.loads(line[len("data: ") :]))
+        assert [e.get("text") for e in events[:-1]] == ["answer ", "to ", "hi"]
+        assert events[-1]["answer"] == "answer to hi"
+    finally:
+        await http.aclose()
+        await gateway.close()
+
+
+async def run_sessions():
+    gateway, http = await start()
+    gateway.max_sessions = 2
+    try:
+        for session in ["a", "a", "b", "a", "c"]:
+            response = await http.post(
+                "/v1/query", json={"query": "hi", "session": session}
+            )
+            assert response.status_code == 200
+        await http.post("/v1/query", json={"query": "stateless"})
+        # "b" was the least recently used when "c" arrived
+        assert list(gateway._sessions) == ["a", "c"]
+        assert len(gateway._sessions["a"].history.turns) == 3
+
+        response = await http.post("/v1/query", json={"query": "hi", "session": 7})
+        assert response.status_code == 400
+    finally:
+        await http.aclose()
+        await gateway.close()
+
+
+async def run_session_queue():
+    admission = AdmissionController(max_concurrency=2, max_queue=0)
+    gateway, http = await start(admission)
+    try:
+        queued = [
+            asyncio.ensure_future(
+                http.post("/v1/query", json={"query": "slow", "session": "s"})
+            )
+            for _ in range(2)
+        ]
+        await asyncio.sleep(0.1)
+        # The second "s" query waits for the first without taking a slot
+        assert admission.stats()["running"] == 1
+        other = await http.post(
+            "/v1/query", json={"query": "other"}, headers={"X-Tenant": "b"}
+        )
+        assert other.status_code == 200
+        assert [r.status_code for r in await asyncio.gather(*queued)] == [200, 200]
+    finally:
+        await http.aclose()
+        await gateway.close()
+
+
+async def run_tenant_limits():
+    admission = AdmissionController(tenant_concurrency=1, tenant_queue=0)
+    gateway, http = await start(admission)
+    try:
+        slow = asyncio.ensure_future(
+            http.post("/v1/query", json={"query": "slow"}, headers={"X-Tenant": "a"})
+        )
+        await asyncio.sleep(0.1)
+        same = await http.post(
+            "/v1/query", json={"query": "again"}, headers={"X-Tenant": "a"}
+        )
+        other = await http.post(
+            "/v1/query", json={"query": "other"}, headers={"X-Tenant": "b"}
+        )
+        assert same.status_code == 429
+        assert other.status_code == 200
+        assert (await slow).status_code == 200
+        assert admission.stats()["rejected"] == 1
+        assert admission.stats()["tenants"] == {}
+    finally:
+        await http.aclose()
+        await gateway.close()
+
+
+async def run_drain():
+    gateway, http = await start()
+    try:
+        slow = asyncio.ensure_future(http.post("/v1/query", json={"query": "slow"}))
+        await asyncio.sleep(0.1)
+        drain = asyncio.ensure_future(gateway.drain(timeout=5))
+        await asyncio.sleep(0)
+
+        refused = await http.post("/v1/query", json={"query": "late"})
+        health = await http.get("/healthz")
+        assert refused.status_code == 503
+        assert health.status_code == 503 and health.json()["status"] == "draining"
+
+        assert (await slow).json()["answer"] == "answer to slow"
+        await drain
+        assert gateway.client.queries == ["slow"]
+    finally:
+        await http.aclose()
+        await gateway.close()
+
+
+async def run_bad_content_length():
+    gateway, http = await start()
+    await http.aclose()
+    try:
+        for length in ("ten", "-5"):
+            reader, writer = await asyncio.open_connection("127.0.0.1", gateway.port)
+            writer.write(
+                b"POST /v1/query HTTP/1.1\r\nContent-Length: %s\r\n\r\n"
+                % length.encode()
+            )
+            response = await reader.read()
+            writer.close()
+            assert response.startswith(b"HTTP/1.1 400")
+            assert b"bad Content-Length" in response
+    finally:
+        await gateway.close()
+
+
+def test_queries_and_streaming():
+    asyncio.run(run_queries())
+
+
+def test_bad_content_length_is_rejected():
+    asyncio.run(run_bad_content_length())
+
+
+def test_sessions_keep_history():
+    asyncio.run(run_sessions())
+
+
+def test_session_queue_holds_no_slots():
+    asyncio.run(run_session_queue())
+
+
+def test_tenant_limits():
+    asyncio.run(run_tenant_limits())
+
+
+def test_drain_finishes_running_queries():
+    asyncio.run(run_drain())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+import asyncio
+
+from mcp_core.history import ConversationStore
+
+
+def openai_turn(i, payload):
+    return [
+        {"role": "user", "content": f"question {i}"},
+        {
+            "role": "assistant",
+            "content": "",
+            "tool_calls": [
+                {
+                    "id": f"call{i}",
+                    "type": "function",
+                    "function": {"name": "read_text_file", "arguments": "{}"},
+                }
+            ],
+        },
+        {"role": "tool", "tool_call_id": f"call{i}", "content": payload},
+        {"role": "assistant", "content": f"answer {i}"},
+    ]
+
+
+def test_old_tool_results_are_compacted_before_turns_are_dropped():
+    store = ConversationStore(max_tokens=2000, keep_turns=1)
+    for i in range(3):
+        store.add_turn(openai_turn(i, "x" * 4000))
+
+    asyncio.run(store.compact())
+
+    assert store.total_tokens <= 2000
+    messages = store.messages()
+    assert messages[0] == {"role": "user", "content": "question 0"}
+    tool_contents = [m["content"] for m in messages if m["role"] == "tool"]
+    assert tool_contents[0].startswith("[Earlier tool result")
+    assert tool_contents[1].startswith("[Earlier tool result")
+    # The most recent turn keeps its full tool result
+    assert tool_contents[2] == "x" * 4000
+
+
+def test_oldest_turns_are_dropped_whole_when_still_over_budget():
+    store = ConversationStore(max_tokens=1000, keep_turns=1)
+    for i in range(3):
+        store.add_turn(openai_turn(i, "y" * 4000))
+
+    asyncio.run(store.compact())
+
+    assert [t.messages[0]["content"] for t in store.turns] == ["question 2"]
+    assert store.total_tokens <= 1000
+
+
+def test_summarizer_replaces_anthropic_tool_results():
+    async def summarize(text):
+        return f"{len(text)} chars"
+
+    store = ConversationStore(max_tokens=500, keep_turns=0, summarizer=summarize)
+    store.add_turn(
+        [
+            {"role": "user", "content": "read it"},
+            {
+                "role": "user",
+                "content": [
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": "tu0",
+                        "content": [{"type": "text", "text": "z" * 3000}],
+                    }
+                ],
+            },
+        ]
+    )
+
+    asyncio.run(store.compact())
+
+    block = store.messages()[1]["content"][0]
+    assert block["tool_use_id"] == "tu0"
+    assert block["content"] == "[Summary of an earlier tool result] 3000 chars"
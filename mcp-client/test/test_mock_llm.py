@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import asyncio
+
+from anthropic import AsyncAnthropic
+from openai import AsyncOpenAI
+
+from bench.mock_llm import Latency, MockLLM, script_step
+from mcp_core.providers import AnthropicProvider, OpenAIProvider
+
+SCRIPT = [
+    {
+        "tool_calls": [
+            {"name": "read_text_file", "arguments": {"path": "/tmp/a"}},
+            {"name": "get_weather", "arguments": {"city": "Tokyo"}},
+        ]
+    },
+    {"content": "Both done."},
+]
+
+
+async def two_steps(make_provider, stream: bool):
+    mock = MockLLM(SCRIPT)
+    await mock.start()
+    provider = make_provider(mock)
+    started = []
+    on_text = (lambda text: None) if stream else None
+    try:
+        messages = [provider.user_message("go")]
+        first = await provider.complete(messages, [], on_text, started.append)
+        messages.append(first.message)
+        messages.extend(provider.tool_results(first.tool_calls, ["ok", "ok"]))
+        second = await provider.complete(messages, [], on_text, started.append)
+    finally:
+        await provider.close()
+        await mock.close()
+    return first, second, started
+
+
+def openai_provider(mock):
+    client = AsyncOpenAI(base_url=mock.base_url, api_key="mock", max_retries=0)
+    return OpenAIProvider("MOCK", "mock", client=client)
+
+
+def anthropic_provider(mock):
+    client = AsyncAnthropic(
+        base_url=mock.anthropic_base_url, api_key="mock", max_retries=0
+    )
+    return AnthropicProvider("MOCK", "mock", client=client)
+
+
+def test_both_protocols_with_and_without_streaming():
+    for make_provider in (openai_provider, anthropic_provider):
+        for stream in (False, True):
+            first, second, started = asyncio.run(two_steps(make_provider, stream))
+
+            assert [c.name for c in first.tool_calls] == [
+                "read_text_file",
+                "get_weather",
+            ]
+            assert first.tool_calls[1].arguments == {"city": "Tokyo"}
+            assert first.usage is not None
+            assert second.text == "Both done." and not second.tool_calls
+            if stream:
+                assert [c.name for c in started] == ["read_text_file", "get_weather"]
+
+
+def ask(text):
+    return [{"role": "user", "content": [{"type": "text", "text": text}]}]
+
+
+def test_patterns_and_latency_specs():
+    patterns = [
+        {"match": "weather", "steps": [{"content": "sunny"}]},
+        {"steps": [{"content": "fallback"}]},
+    ]
+    assert script_step(patterns, ask("weather in Rome")) == {"content": "sunny"}
+    assert script_step(patterns, ask("hello")) == {"content": "fallback"}
+    assert Latency.parse("uniform:0.1,0.2").kind == "uniform"
+    assert 0.1 <= Latency.parse("uniform:0.1,0.2").sample() <= 0.2
+    assert Latency.parse(0.5).sample() == 0.5
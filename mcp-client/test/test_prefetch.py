@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+import asyncio
+
+from mcp import types
+
+from mcp_core.prefetch import Prefetcher, PrefetchSession
+
+
+def text_result(text, is_error=False):
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=text)], isError=is_error
+    )
+
+
+class FakeFilesystem:
+    """Answers listings and reads like the filesystem server"""
+
+    def __init__(self):
+        self.calls = []
+        self.files = {
+            "/data/a.txt": "alpha",
+            "/data/b.md": "bravo",
+            "/data/c.py": "charlie",
+            "/data/big.log": "x" * 4096,
+        }
+
+    async def call_tool(self, name, arguments=None):
+        self.calls.append((name, arguments))
+        await asyncio.sleep(0.01)
+        if name.endswith("list_directory"):
+            return text_result(
+                "[DIR] sub\n[FILE] a.txt\n[FILE] b.md\n[FILE] image.png\n[FILE] c.py"
+            )
+        if name.endswith("list_directory_with_sizes"):
+            return text_result(
+                "[FILE] a.txt                              5 Bytes\n"
+                "[FILE] big.log                            4 KB\n"
+                "\nTotal: 2 files, 0 directories\nCombined size: 4.01 KB"
+            )
+        if name.endswith("search_files"):
+            return text_result("/data/c.py\n/data/a.txt")
+        if name.endswith("read_text_file"):
+            return text_result(self.files[arguments["path"]])
+        return text_result("ok")
+
+    def reads(self):
+        return [args["path"] for name, args in self.calls if "read" in name]
+
+
+async def run_listing_then_reads():
+    server = FakeFilesystem()
+    prefetcher = Prefetcher(max_files=2)
+    session = PrefetchSession(server, prefetcher)
+
+    await session.call_tool("filesystem__list_directory", {"path": "/data"})
+    await asyncio.sleep(0)
+    # Only the first two text files are read ahead, under the same prefix
+    assert server.reads() == ["/data/a.txt", "/data/b.md"]
+    assert server.calls[1][0] == "filesystem__read_text_file"
+
+    result = await session.call_tool(
+        "filesystem__read_text_file", {"path": "/data/a.txt"}
+    )
+    assert result.content[0].text == "alpha"
+    combined = await session.call_tool(
+        "filesystem__read_multiple_files", {"paths": ["/data/b.md"]}
+    )
+    assert combined.content[0].text == "/data/b.md:\nbravo\n"
+    assert len(server.calls) == 3
+    assert prefetcher.hits == 2
+
+    # Not prefetched: passed through to the server
+    await session.call_tool("filesystem__read_text_file", {"path": "/data/c.py"})
+    assert prefetcher.misses == 1 and len(server.calls) == 4
+    prefetcher.close()
+
+
+async def run_size_budget_and_invalidation():
+    server = FakeFilesystem()
+    prefetcher = Prefetcher(max_file_bytes=1024)
+    session = PrefetchSession(server, prefetcher)
+
+    await session.call_tool("list_directory_with_sizes", {"path": "/data"})
+    await asyncio.sleep(0)
+    assert server.reads() == ["/data/a.txt"]
+
+    await session.call_tool("search_files", {"path": "/data", "pattern": "*"})
+    await asyncio.sleep(0)
+    assert server.reads() == ["/data/a.txt", "/data/c.py"]
+    await asyncio.sleep(0.05)
+
+    await session.call_tool("write_file", {"path": "/data/c.py", "content": "new"})
+    assert "/data/c.py" not in prefetcher and "/data/a.txt" in prefetcher
+    await session.call_tool("read_text_file", {"path": "/data/c.py"})
+    assert server.reads()[-1] == "/data/c.py"
+    prefetcher.close()
+
+
+def test_listing_reads_are_prefetched():
+    asyncio.run(run_listing_then_reads())
+
+
+def test_size_limits_and_mutations():
+    asyncio.run(run_size_budget_and_invalidation())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import signal
+import threading
+
+from mcp_core.client import MCPClient
+from mcp_core.providers import OpenAIProvider
+from mcp_core.repl import BackgroundQueries, LineReader
+
+
+def scripted_input(monkeypatch, lines):
+    """Replace input() with one that returns lines from a list, then EOF"""
+    lines = list(lines)
+
+    def fake_input(prompt=""):
+        if not lines:
+            raise EOFError
+        line = lines.pop(0)
+        if callable(line):
+            line = line()
+        return line
+
+    monkeypatch.setattr("builtins.input", fake_input)
+
+
+def test_reader_keeps_one_pending_read(monkeypatch):
+    release = threading.Event()
+    reads = []
+
+    def slow_input(prompt=""):
+        reads.append(prompt)
+        release.wait(5)
+        return "hello"
+
+    monkeypatch.setattr("builtins.input", slow_input)
+
+    async def scenario():
+        reader = LineReader()
+        try:
+            await asyncio.wait_for(reader.readline("> "), 0.05)
+        except asyncio.TimeoutError:
+            pass
+        release.set()
+        assert await reader.readline("> ") == "hello"
+        assert reads == ["> "]
+
+    asyncio.run(scenario())
+
+
+def test_background_queries_can_be_cancelled():
+    async def scenario():
+        jobs = BackgroundQueries()
+        first = jobs.start("slow", asyncio.sleep(10))
+        jobs.start("fast", asyncio.sleep(0))
+        await asyncio.sleep(0.01)
+        assert jobs.describe() == [f"[{first}] running: slow"]
+        assert jobs.cancel(first) == 1
+        await asyncio.sleep(0.01)
+        assert len(jobs) == 0
+        await jobs.close()
+
+    asyncio.run(scenario())
+
+
+def test_chat_loop_cancels_and_runs_in_background(monkeypatch, capsys):
+    client = MCPClient(OpenAIProvider("TEST", "fake", client=object()), debug=False)
+    seen = []
+
+    async def fake_process_query(query, on_text=None, run=None, history=None):
+        seen.append((query, history is not None))
+        if query == "hang":
+            await asyncio.sleep(30)
+        if query == "later":
+            await asyncio.sleep(0.1)
+        return f"answer to {query}"
+
+    client.process_query = fake_process_query
+
+    def interrupt():
+        # Ctrl-C once the foreground query is running
+        threading.Timer(0.2, os.kill, (os.getpid(), signal.SIGINT)).start()
+        return "hang"
+
+    def wait_for_background():
+        threading.Event().wait(0.3)
+        return "jobs"
+
+    scripted_input(
+        monkeypatch, ["later &", interrupt, "hello", wait_for_background, "quit"]
+    )
+    asyncio.run(client.chat_loop())
+
+    out = capsys.readouterr().out
+    assert "[1] running in the background" in out
+    assert "[Query cancelled]" in out
+    assert "answer to hello" in out
+    assert "[Background query done: later]" in out
+    assert "No background queries." in out
+    assert seen == [("later", False), ("hang", True), ("hello", True)]
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import sys
+import tempfile
+import textwrap
+
+import pytest
+
+from mcp_core.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ConnectionLost,
+    ResiliencePolicy,
+    ToolTimeout,
+)
+from mcp_core.servers import ServerPool, ServerSpec
+
+FLAKY_SERVER = textwrap.dedent(
+    """
+    import os
+    import time
+
+    from mcp.server.fastmcp import FastMCP
+
+    mcp = FastMCP("flaky")
+
+    @mcp.tool()
+    def echo(text: str) -> str:
+        return f"{os.getpid()}:{text}"
+
+    @mcp.tool()
+    def hang(seconds: float) -> str:
+        time.sleep(seconds)
+        return "done"
+
+    @mcp.tool()
+    def crash() -> str:
+        os._exit(1)
+
+    mcp.run()
+    """
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_breaker_opens_and_lets_one_trial_through():
+    clock = FakeClock()
+    breaker = CircuitBreaker(threshold=2, reset_after=10, clock=clock)
+
+    assert breaker.failure() is False
+    assert breaker.failure() is True
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+    clock.now = 10
+    breaker.check()  # the trial call
+    with pytest.raises(CircuitOpenError):
+        breaker.check()  # only one at a time
+    breaker.failure()
+    assert breaker.state == "open" and breaker.trips == 1
+
+    # A trial that is cancelled gives the slot back
+    clock.now = 20
+    breaker.check()
+    breaker.release()
+    assert breaker.state == "half_open"
+    breaker.check()
+    breaker.success()
+    assert breaker.state == "closed"
+    breaker.check()
+
+
+def test_only_idempotent_tools_are_retried():
+    policy = ResiliencePolicy(retries=3, retry_delay=0.1, retry_max_delay=0.25)
+
+    assert policy.attempts("read_text_file") == 4
+    assert policy.attempts("write_file") == 1
+    assert all(0 <= policy.backoff(n) <= 0.25 for n in range(1, 10))
+
+
+def test_per_tool_deadline(monkeypatch):
+    monkeypatch.setenv("TOOL_TIMEOUT", "5")
+    monkeypatch.setenv("TOOL_TIMEOUT_DIRECTORY_TREE", "0")
+    policy = ResiliencePolicy.from_env()
+
+    assert policy.deadline("get_weather") == 5
+    assert policy.deadline("directory_tree") is None
+
+
+async def exercise_flaky_server(script):
+    policy = ResiliencePolicy(
+        timeout=0.5,
+        retries=1,
+        retry_delay=0.01,
+        idempotent=frozenset({"echo"}),
+        breaker_threshold=2,
+        breaker_reset=0.2,
+    )
+    pool = ServerPool(ServerSpec("flaky", sys.executable, [script]), policy)
+    await pool.start()
+    try:
+        first = await pool.call_tool("echo", {"text": "hi"})
+        pid = first.content[0].text.split(":")[0]
+
+        # A crashed subprocess fails the call in flight, then is respawned
+        with pytest.raises(ConnectionLost):
+            await pool.call_tool("crash", {})
+        second = await pool.call_tool("echo", {"text": "again"})
+        assert second.content[0].text.split(":")[0] != pid
+        assert pool.respawns == 1
+        assert [t.name for t in await pool.tool_catalog.tools()] == [
+            "echo",
+            "hang",
+            "crash",
+        ]
+
+        # A hung call misses its deadline; the second failure opens the
+        # breaker and later calls fail fast
+        with pytest.raises(ToolTimeout):
+            await pool.call_tool("hang", {"seconds": 30})
+        with pytest.raises(ToolTimeout):
+            await pool.call_tool("hang", {"seconds": 30})
+        with pytest.raises(CircuitOpenError):
+            await pool.call_tool("echo", {"text": "blocked"})
+
+        # A cancelled trial call does not keep the breaker shut
+        await asyncio.sleep(0.25)
+        trial = asyncio.ensure_future(pool.call_tool("echo", {"text": "trial"}))
+        await asyncio.sleep(0.05)
+        trial.cancel()
+        await asyncio.gather(trial, return_exceptions=True)
+        assert trial.cancelled()
+
+        # The next call is the trial; the hung process is replaced for it
+        third = await pool.call_tool("echo", {"text": "back"})
+        assert third.content[0].text.endswith(":back")
+        assert pool.breaker.state == "closed"
+    finally:
+        await pool.close()
+
+
+def test_pool_survives_crashes_and_hangs():
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "flaky.py")
+        with open(script, "w") as f:
+            f.write(FLAKY_SERVER)
+        asyncio.run(asyncio.wait_for(exercise_flaky_server(script), 60))
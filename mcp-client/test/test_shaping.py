@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+import asyncio
+import re
+
+import pytest
+from mcp import types
+
+from mcp_core.catalog import ToolCatalog
+from mcp_core.results import result_text
+from mcp_core.shaping import PAGE_TOOL, ResultShaper, ShapedSession, SpillStore
+
+
+def text_result(*texts):
+    return types.CallToolResult(
+        content=[types.TextContent(type="text", text=t) for t in texts]
+    )
+
+
+def image_result(size):
+    return types.CallToolResult(
+        content=[types.ImageContent(type="image", data="A" * size, mimeType="image/png")]
+    )
+
+
+class BigFileSession:
+    def __init__(self):
+        self.tool_catalog = ToolCatalog(self.fetch)
+
+    async def fetch(self):
+        return [types.Tool(name="read_text_file", inputSchema={"type": "object"})]
+
+    async def call_tool(self, name, arguments=None):
+        return text_result("".join(f"line {i}\n" for i in range(2000)))
+
+
+def test_large_results_are_spilled_and_paged(tmp_path):
+    shaper = ResultShaper(max_chars=500, store=SpillStore(str(tmp_path)))
+    session = ShapedSession(BigFileSession(), shaper)
+
+    async def scenario():
+        names = [t.name for t in await session.tool_catalog.tools()]
+        first = await session.call_tool("read_text_file", {"path": "big.log"})
+        text = first.content[0].text
+        ref = re.search(r'ref="([^"]+)"', text).group(1)
+        pages = [text[:500]]
+        offset = 500
+        while True:
+            page = await session.call_tool(PAGE_TOOL, {"ref": ref, "offset": offset})
+            body, _, note = page.content[0].text.partition("\n\n[")
+            pages.append(body)
+            offset += len(body)
+            if note.startswith("End of result"):
+                return names, text, "".join(pages)
+
+    names, first, paged = asyncio.run(scenario())
+
+    full = "".join(f"line {i}\n" for i in range(2000))
+    assert names == ["read_text_file", PAGE_TOOL]
+    assert first.startswith(full[:500])
+    assert f"of {len(full)} characters" in first
+    assert paged == full
+
+
+def test_small_results_pass_through_and_images_are_bounded(tmp_path):
+    shaper = ResultShaper(
+        max_chars=100,
+        limits={"directory_tree": 0},
+        max_image_bytes=1000,
+        store=SpillStore(str(tmp_path)),
+    )
+    small = text_result("ok")
+    unlimited = text_result("x" * 10_000)
+
+    def shape(name, result):
+        return asyncio.run(shaper.shape(name, result))
+
+    assert shape("read_text_file", small) is small
+    assert shape("fs__directory_tree", unlimited) is unlimited
+    assert shape("read_media_file", image_result(999)).content[0].type == "image"
+    omitted = shape("read_media_file", image_result(5000)).content[0]
+    assert omitted.type == "text" and "omitted" in omitted.text
+    assert "AAAA" not in result_text(image_result(5000))
+
+
+def test_spill_store_evicts_oldest_files(tmp_path):
+    store = SpillStore(str(tmp_path), max_bytes=150)
+
+    async def scenario():
+        first, _ = await store.spill(iter(["a" * 100]))
+        second, _ = await store.spill(iter(["b" * 100]))
+        assert await store.read(second, 10, 5) == ("bbbbb", 100)
+        assert len(list(tmp_path.iterdir())) == 1
+        with pytest.raises(KeyError):
+            await store.read(first, 0, 5)
+
+    asyncio.run(scenario())
+
+
+def test_spill_store_keeps_line_endings(tmp_path):
+    store = SpillStore(str(tmp_path))
+    text = "line1\r\nline2\r\nline3\rEND"
+
+    async def scenario():
+        ref, total = await store.spill(iter([text]))
+        assert total == len(text)
+        assert await store.read(ref, 0, 100) == (text, total)
+        assert await store.read(ref, 20, 10) == ("END", total)
+
+    asyncio.run(scenario())
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+import asyncio
+
+from mcp import types
+
+from mcp_core.singleflight import SingleflightSession
+from mcp_core.telemetry import Telemetry
+
+
+class SlowServer:
+    """Answers each call after a short delay with a call counter"""
+
+    def __init__(self):
+        self.calls = []
+        self.release = asyncio.Event()
+
+    async def call_tool(self, name, arguments=None):
+        self.calls.append((name, arguments))
+        number = len(self.calls)
+        await self.release.wait()
+        if name == "get_file_info" and arguments["path"] == "/missing":
+            raise RuntimeError("ENOENT")
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=f"call {number}")]
+        )
+
+
+def text(result):
+    return result.content[0].text
+
+
+async def run_collapse():
+    server = SlowServer()
+    telemetry = Telemetry()
+    session = SingleflightSession(server, telemetry=telemetry)
+    calls = [
+        session.call_tool("filesystem__directory_tree", {"path": "/project"}),
+        session.call_tool("filesystem__directory_tree", {"path": "/project"}),
+        session.call_tool("filesystem__list_allowed_directories", {}),
+        session.call_tool("filesystem__list_allowed_directories", None),
+        session.call_tool("filesystem__directory_tree", {"path": "/other"}),
+    ]
+    tasks = [asyncio.ensure_future(call) for call in calls]
+    await asyncio.sleep(0)
+    server.release.set()
+    results = [text(r) for r in await asyncio.gather(*tasks)]
+
+    assert results == ["call 1", "call 1", "call 2", "call 2", "call 3"]
+    assert session.stats() == {"calls": 3, "collapsed": 2, "in_flight": 0}
+    assert 'mcp_tool_calls_collapsed_total{tool="directory_tree"} 1' in (
+        telemetry.metrics_text()
+    )
+
+    # Once the shared call is done, a new call goes to the server
+    again = await session.call_tool("filesystem__directory_tree", {"path": "/project"})
+    assert text(again) == "call 4"
+
+
+async def run_errors_writes_and_cancellation():
+    server = SlowServer()
+    session = SingleflightSession(server)
+
+    failures = [
+        asyncio.ensure_future(session.call_tool("get_file_info", {"path": "/missing"}))
+        for _ in range(2)
+    ]
+    await asyncio.sleep(0)
+    server.release.set()
+    outcomes = await asyncio.gather(*failures, return_exceptions=True)
+    assert all(isinstance(e, RuntimeError) for e in outcomes)
+    assert len(server.calls) == 1
+
+    # A read issued after a write does not join a read from before it
+    server.release.clear()
+    before = asyncio.ensure_future(session.call_tool("read_text_file", {"path": "/a"}))
+    await asyncio.sleep(0)
+    write = asyncio.ensure_future(
+        session.call_tool("write_file", {"path": "/a", "content": "new"})
+    )
+    await asyncio.sleep(0)
+    after = asyncio.ensure_future(session.call_tool("read_text_file", {"path": "/a"}))
+    await asyncio.sleep(0)
+    server.release.set()
+    await asyncio.gather(before, write, after)
+    assert text(await before) != text(await after)
+    assert [name for name, _ in server.calls[1:]].count("read_text_file") == 2
+
+    # Writes are never shared
+    server.release.set()
+    await asyncio.gather(
+        session.call_tool("write_file", {"path": "/b", "content": "x"}),
+        session.call_tool("write_file", {"path": "/b", "content": "x"}),
+    )
+    assert len(server.calls) == 6
+
+    # The shared call survives one caller giving up
+    server.release.clear()
+    first = asyncio.ensure_future(session.call_tool("search_files", {"path": "/"}))
+    second = asyncio.ensure_future(session.call_tool("search_files", {"path": "/"}))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    server.release.set()
+    assert text(await second) == "call 7"
+
+    # A call right after the last caller gave up does not join the dying one
+    server.release.clear()
+    lone = asyncio.ensure_future(session.call_tool("search_files", {"path": "/"}))
+    await asyncio.sleep(0)
+    lone.cancel()
+    await asyncio.sleep(0)
+    fresh = asyncio.ensure_future(session.call_tool("search_files", {"path": "/"}))
+    await asyncio.sleep(0)
+    server.release.set()
+    assert lone.cancelled() and text(await fresh) == "call 9"
+
+
+def test_identical_calls_share_one_request():
+    asyncio.run(run_collapse())
+
+
+def test_errors_writes_and_cancellation():
+    asyncio.run(run_errors_writes_and_cancellation())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+import asyncio
+from types import SimpleNamespace
+
+from openai.types.chat import ChatCompletionChunk
+
+from mcp_core.streaming import stream_openai
+
+
+def chunk(content=None, tool_calls=None):
+    return ChatCompletionChunk.model_validate(
+        {
+            "id": "c",
+            "object": "chat.completion.chunk",
+            "created": 0,
+            "model": "m",
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": {"content": content, "tool_calls": tool_calls},
+                    "finish_reason": None,
+                }
+            ],
+        }
+    )
+
+
+def fragment(index, arguments, id=None, name=None):
+    function = {"arguments": arguments}
+    if name:
+        function["name"] = name
+    return [{"index": index, "id": id, "type": "function", "function": function}]
+
+
+class FakeClient:
+    def __init__(self, chunks, events):
+        self.events = events
+
+        async def create(**request):
+            async def stream():
+                for c in chunks:
+                    self.events.append("chunk")
+                    yield c
+
+            return stream()
+
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=create))
+
+
+def test_tool_calls_start_as_soon_as_arguments_complete():
+    events = []
+    client = FakeClient(
+        [
+            chunk(content="Reading "),
+            chunk(content="files"),
+            chunk(tool_calls=fragment(0, '{"path": ', id="a", name="read_text_file")),
+            chunk(tool_calls=fragment(0, '"a.txt"}')),
+            chunk(tool_calls=fragment(1, '{"path": "b', id="b", name="read_text_file")),
+            chunk(tool_calls=fragment(1, '.txt"}')),
+        ],
+        events,
+    )
+    text = []
+
+    def on_tool_call(tc):
+        events.append(tc.id)
+
+    response = asyncio.run(
+        stream_openai(client, text.append, on_tool_call, model="m", messages=[])
+    )
+    message = response.choices[0].message
+
+    assert text == ["Reading ", "files"]
+    assert message.content == "Reading files"
+    assert [tc.function.arguments for tc in message.tool_calls] == [
+        '{"path": "a.txt"}',
+        '{"path": "b.txt"}',
+    ]
+    # The first call is announced before the second one finishes streaming
+    assert events == ["chunk"] * 4 + ["a"] + ["chunk"] * 2 + ["b"]
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+import asyncio
+import os
+import signal
+import sys
+import tempfile
+import textwrap
+
+import httpx
+
+from mcp_core.supervisor import Supervisor
+
+# A gateway whose answers name the worker's pid and the session's turn count
+STUB_WORKER = textwrap.dedent(
+    """
+    import asyncio
+    import os
+    import signal
+
+    from mcp_core.gateway import AdmissionController, Gateway
+    from mcp_core.history import ConversationStore
+    from mcp_core.telemetry import Telemetry
+
+    class Client:
+        def __init__(self):
+            self.telemetry = Telemetry()
+            self.history = ConversationStore()
+
+        async def process_query(self, query, on_text=None, run=None, history=None):
+            turns = 0
+            if history is not None:
+                history.add_turn([{"role": "user", "content": query}])
+                turns = len(history.turns)
+            return f"{os.getpid()} {turns}"
+
+    async def main():
+        gateway = Gateway(Client(), AdmissionController())
+        await gateway.start(port=0)
+        stop = asyncio.Event()
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, stop.set)
+        print(f"Serving on http://127.0.0.1:{gateway.port}", flush=True)
+        await stop.wait()
+        await gateway.drain(5)
+        await gateway.close()
+
+    asyncio.run(main())
+    """
+)
+
+
+async def ask(http, session=None):
+    response = await http.post("/v1/query", json={"query": "hi", "session": session})
+    assert response.status_code == 200
+    pid, turns = response.json()["answer"].split()
+    return int(pid), int(turns)
+
+
+async def wait_until(condition, timeout=10.0):
+    for _ in range(int(timeout / 0.05)):
+        if condition():
+            return
+        await asyncio.sleep(0.05)
+    raise AssertionError("condition not met in time")
+
+
+async def run_supervisor(script):
+    supervisor = Supervisor(
+        [sys.executable, script], workers=2, health_interval=0.1, health_failures=1
+    )
+    await supervisor.start(port=0)
+    http = httpx.AsyncClient(base_url=f"http://127.0.0.1:{supervisor.port}")
+    try:
+        pids = {w.process.pid for w in supervisor.workers}
+        assert len(pids) == 2
+
+        # A session sticks to one worker and keeps its history there
+        answers = [await ask(http, "alice") for _ in range(3)]
+        assert len({pid for pid, _ in answers}) == 1
+        assert [turns for _, turns in answers] == [1, 2, 3]
+        alice = supervisor.pick("alice")
+        others = [f"s{i}" for i in range(20)]
+        assert {supervisor.pick(s).slot for s in others} == {0, 1}
+
+        health = (await http.get("/healthz")).json()
+        assert health["status"] == "ok" and len(health["workers"]) == 2
+        metrics = await http.get(f"/workers/{alice.slot}/metrics")
+        assert metrics.status_code == 200
+
+        # A worker that dies is replaced; its sessions start over
+        os.kill(alice.process.pid, signal.SIGKILL)
+        await wait_until(lambda: alice.restarts == 1 and alice.ready)
+        pid, turns = await ask(http, "alice")
+        assert pid == alice.process.pid and pid not in pids and turns == 1
+
+        # Rolling restart replaces every worker while requests keep working
+        before = {w.process.pid for w in supervisor.workers}
+        rolling = asyncio.ensure_future(supervisor.rolling_restart())
+        while not rolling.done():
+            await ask(http)
+            await asyncio.sleep(0.02)
+        await rolling
+        after = {w.process.pid for w in supervisor.workers}
+        assert not before & after
+        assert all(w.ready for w in supervisor.workers)
+    finally:
+        await http.aclose()
+        await supervisor.drain()
+    assert all(w.exited for w in supervisor.workers)
+
+
+def test_affinity_health_checks_and_rolling_restart():
+    with tempfile.TemporaryDirectory() as tmp:
+        script = os.path.join(tmp, "worker.py")
+        with open(script, "w") as f:
+            f.write(STUB_WORKER)
+        asyncio.run(run_supervisor(script))
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+import asyncio
+import json
+
+from mcp.types import CallToolResult, TextContent
+
+from mcp_core.telemetry import JsonlSpanExporter, Telemetry, TracedSession
+
+
+class EchoSession:
+    async def call_tool(self, name, arguments=None):
+        return CallToolResult(content=[TextContent(type="text", text="héllo")])
+
+
+def test_spans_nest_and_export_as_otlp_json(tmp_path):
+    path = tmp_path / "spans.jsonl"
+    telemetry = Telemetry([JsonlSpanExporter(str(path))])
+    session = TracedSession(EchoSession(), telemetry)
+
+    async def query():
+        with telemetry.span("query"):
+            await asyncio.create_task(session.call_tool("read", {"path": "a"}))
+
+    asyncio.run(query())
+    asyncio.run(telemetry.close())
+
+    tool, parent = [json.loads(line) for line in path.read_text().splitlines()]
+    assert tool["name"] == "tool_call" and parent["name"] == "query"
+    assert tool["traceId"] == parent["traceId"]
+    assert tool["parentSpanId"] == parent["spanId"]
+    attributes = {a["key"]: a["value"] for a in tool["attributes"]}
+    assert attributes["response_bytes"] == {"intValue": "6"}
+    assert attributes["request_bytes"] == {"intValue": str(len('{"path": "a"}'))}
+
+
+def test_metrics_are_served_in_prometheus_format():
+    telemetry = Telemetry(port=0)
+    with telemetry.span("llm_call", provider="claude", model="m") as span:
+        span.set(input_tokens=120, output_tokens=30)
+
+    async def scrape():
+        await telemetry.start()
+        port = telemetry._server.sockets[0].getsockname()[1]
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        writer.write(b"GET /metrics HTTP/1.0\r\n\r\n")
+        response = (await reader.read()).decode()
+        writer.close()
+        await telemetry.close()
+        return response
+
+    response = asyncio.run(scrape())
+
+    assert response.startswith("HTTP/1.0 200 OK")
+    assert 'mcp_stage_duration_seconds_count{stage="llm_call"} 1' in response
+    assert (
+        'mcp_llm_tokens_total{provider="claude",model="m",type="input"} 120'
+        in response
+    )
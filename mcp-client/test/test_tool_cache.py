@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+import asyncio
+
+from mcp import types
+
+from mcp_core.cache import CachedSession, ToolResultCache
+
+
+class CountingSession:
+    def __init__(self):
+        self.calls = []
+
+    async def call_tool(self, name, arguments=None):
+        self.calls.append(name)
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=f"{name} #{len(self.calls)}")]
+        )
+
+
+def test_repeated_reads_are_served_from_cache():
+    inner = CountingSession()
+    session = CachedSession(inner, ToolResultCache())
+
+    async def scenario():
+        first = await session.call_tool(
+            "read_text_file", {"path": "/a/b.txt", "head": 10}
+        )
+        # Same arguments in a different key order hit the same entry
+        again = await session.call_tool(
+            "read_text_file", {"head": 10, "path": "/a/b.txt"}
+        )
+        await session.call_tool("get_weather", {"city": "Tokyo"})
+        return first, again
+
+    first, again = asyncio.run(scenario())
+
+    assert first is again
+    assert inner.calls == ["read_text_file", "get_weather"]
+    assert session.cache.stats()["hits"] == 1
+
+
+def test_writes_invalidate_overlapping_paths():
+    inner = CountingSession()
+    cache = ToolResultCache()
+    session = CachedSession(inner, cache)
+
+    async def scenario():
+        await session.call_tool("filesystem__list_directory", {"path": "/a"})
+        await session.call_tool("filesystem__read_text_file", {"path": "/a/b.txt"})
+        await session.call_tool("filesystem__read_text_file", {"path": "/c/d.txt"})
+        await session.call_tool(
+            "filesystem__write_file", {"path": "/a/b.txt", "content": "new"}
+        )
+        await session.call_tool("filesystem__list_directory", {"path": "/a"})
+        await session.call_tool("filesystem__read_text_file", {"path": "/c/d.txt"})
+
+    asyncio.run(scenario())
+
+    assert inner.calls.count("filesystem__list_directory") == 2
+    assert inner.calls.count("filesystem__read_text_file") == 2
+    assert cache.stats()["invalidations"] == 2
+
+
+def test_lru_eviction_and_ttl():
+    cache = ToolResultCache(ttls={"read_text_file": 30.0, "get_weather": 0}, max_entries=2)
+    for name in ("a", "b", "c"):
+        cache.put("read_text_file", {"path": name}, name)
+    cache.put("get_weather", {"city": "Tokyo"}, "sunny")
+
+    assert cache.get("read_text_file", {"path": "a"}) is None
+    assert cache.get("read_text_file", {"path": "c"}) == "c"
+    assert cache.get("get_weather", {"city": "Tokyo"}) is None
+    assert cache.evictions == 1
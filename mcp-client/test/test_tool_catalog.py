@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+import asyncio
+
+from mcp import types
+
+from mcp_core.catalog import ToolCatalog
+
+
+def make_tool(name):
+    return types.Tool(name=name, description=None, inputSchema={"type": "object"})
+
+
+def test_payloads_are_cached_until_invalidated():
+    fetches = []
+
+    async def fetch():
+        fetches.append(1)
+        return [make_tool(f"tool{len(fetches)}")]
+
+    async def scenario():
+        catalog = ToolCatalog(fetch)
+        first = await catalog.openai_tools()
+        again = await catalog.openai_tools()
+        anthropic = await catalog.anthropic_tools()
+        catalog.invalidate()
+        refreshed = await catalog.anthropic_tools()
+        return first, again, anthropic, refreshed
+
+    first, again, anthropic, refreshed = asyncio.run(scenario())
+
+    assert first is again
+    assert first[0]["function"]["name"] == "tool1"
+    assert anthropic[0] == {
+        "name": "tool1",
+        "description": "Tool for tool1",
+        "input_schema": {"type": "object"},
+    }
+    assert refreshed[0]["name"] == "tool2"
+    assert len(fetches) == 2
+
+
+def test_invalidation_during_fetch_triggers_refetch():
+    fetches = []
+
+    async def scenario():
+        async def fetch():
+            fetches.append(1)
+            if len(fetches) == 1:
+                # The server changes its tools while the first list is in flight
+                catalog.invalidate()
+            return [make_tool(f"tool{len(fetches)}")]
+
+        catalog = ToolCatalog(fetch)
+        return await catalog.tools()
+
+    tools = asyncio.run(scenario())
+
+    assert [tool.name for tool in tools] == ["tool2"]
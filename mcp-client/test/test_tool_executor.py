@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+import asyncio
+
+from mcp_core.executor import ToolExecutor
+
+
+class SlowSession:
+    """Fake session whose calls finish in reverse order of submission"""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def call_tool(self, name, arguments=None):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01 * (10 - arguments["i"]))
+        self.in_flight -= 1
+        if name == "boom":
+            raise RuntimeError("boom")
+        return f"{name}:{arguments['i']}"
+
+
+def test_results_keep_call_order():
+    session = SlowSession()
+    executor = ToolExecutor(session, max_concurrency=3)
+    calls = [("read", {"i": i}) for i in range(6)]
+
+    results = asyncio.run(executor.run(calls))
+
+    assert results == [f"read:{i}" for i in range(6)]
+    assert session.peak == 3
+
+
+def test_failures_are_returned_in_place():
+    executor = ToolExecutor(SlowSession(), max_concurrency=2)
+    calls = [("read", {"i": 0}), ("boom", {"i": 1}), ("read", {"i": 2})]
+
+    results = asyncio.run(executor.run(calls))
+
+    assert results[0] == "read:0"
+    assert isinstance(results[1], RuntimeError)
+    assert results[2] == "read:2"
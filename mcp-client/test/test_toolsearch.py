@@ -0,0 +1,164 @@
+#!/usr/bin/env python3
+import asyncio
+from types import SimpleNamespace
+
+from mcp import types
+from openai.types.chat import ChatCompletion
+
+from mcp_core.catalog import ToolCatalog
+from mcp_core.client import MCPClient
+from mcp_core.executor import ToolExecutor
+from mcp_core.providers import OpenAIProvider
+from mcp_core.toolsearch import SEARCH_TOOL, ToolSearchSession, called_tools
+
+TOOLS = {
+    "filesystem__read_text_file": "Read the complete contents of a file as text.",
+    "filesystem__read_multiple_files": "Read the contents of multiple files at once.",
+    "filesystem__write_file": "Create a new file or overwrite an existing file.",
+    "filesystem__edit_file": "Make line-based edits to a text file.",
+    "filesystem__create_directory": "Create a new directory.",
+    "filesystem__list_directory": "List all files and directories in a path.",
+    "filesystem__move_file": "Move or rename files and directories.",
+    "filesystem__search_files": "Recursively search for files matching a pattern.",
+    "filesystem__get_file_info": "Retrieve metadata about a file or directory.",
+    "weather__get_alerts": "Get weather alerts for a US state.",
+    "weather__get_forecast": "Get the weather forecast for a location.",
+}
+
+
+def completion(content=None, tool_calls=None):
+    return ChatCompletion(
+        id="c",
+        object="chat.completion",
+        created=0,
+        model="fake",
+        choices=[
+            {
+                "index": 0,
+                "message": {
+                    "role": "assistant",
+                    "content": content,
+                    "tool_calls": tool_calls,
+                },
+                "finish_reason": "tool_calls" if tool_calls else "stop",
+            }
+        ],
+    )
+
+
+def tool_call(id, name, arguments):
+    return {
+        "id": id,
+        "type": "function",
+        "function": {"name": name, "arguments": arguments},
+    }
+
+
+class ScriptedLLM:
+    """Fake AsyncOpenAI client replaying a fixed list of replies"""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.requests = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    async def create(self, **request):
+        self.requests.append(request)
+        return self.replies.pop(0)
+
+    async def close(self):
+        pass
+
+
+class FakeServers:
+    def __init__(self, tools=TOOLS):
+        self.tools = tools
+        self.calls = []
+        self.tool_catalog = ToolCatalog(self.fetch)
+
+    async def fetch(self):
+        return [
+            types.Tool(
+                name=name,
+                description=description,
+                inputSchema={"type": "object", "properties": {"path": {}}},
+            )
+            for name, description in self.tools.items()
+        ]
+
+    async def call_tool(self, name, arguments=None):
+        self.calls.append(name)
+        return types.CallToolResult(
+            content=[types.TextContent(type="text", text=f"{name} ok")]
+        )
+
+
+async def run_selection():
+    session = ToolSearchSession(FakeServers())
+    session.index.top_k = 3
+    selection = await session.index.select("Read the text in notes.txt")
+    assert "filesystem__read_text_file" in selection.names
+    assert SEARCH_TOOL in selection.names and len(selection.names) == 4
+    sent, saved = selection.tokens()
+    assert 0 < sent < saved
+
+    result = await session.call_tool(SEARCH_TOOL, {"query": "weather forecast"})
+    assert "weather__get_forecast" in result.content[0].text
+
+    # Small catalogs go out whole, without the search tool
+    session.index.top_k = 20
+    selection = await session.index.select("hello")
+    assert selection.names == set(TOOLS)
+
+
+def test_rank_select_and_search():
+    asyncio.run(run_selection())
+
+
+def test_called_tools_in_both_formats():
+    messages = [
+        {"role": "assistant", "tool_calls": [tool_call("1", "a__x", "{}")]},
+        {"role": "assistant", "content": [{"type": "tool_use", "name": "b__y"}]},
+        {"role": "user", "content": "hi"},
+    ]
+    assert called_tools(messages) == {"a__x", "b__y"}
+
+
+async def run_query_with_search():
+    llm = ScriptedLLM(
+        [
+            completion(
+                tool_calls=[
+                    tool_call("1", SEARCH_TOOL, '{"query": "weather forecast"}')
+                ]
+            ),
+            completion(tool_calls=[tool_call("2", "weather__get_forecast", "{}")]),
+            completion(content="Sunny."),
+        ]
+    )
+    client = MCPClient(OpenAIProvider("TEST", "fake", client=llm), debug=False)
+    servers = FakeServers()
+    client.session = ToolSearchSession(servers)
+    client.tool_index = client.session.index
+    client.tool_index.top_k = 2
+    client.executor = ToolExecutor(client.session)
+
+    answer = await client.process_query("Read the file notes.txt")
+    assert answer.endswith("Sunny.")
+    offered = [
+        {tool["function"]["name"] for tool in request["tools"]}
+        for request in llm.requests
+    ]
+    assert "weather__get_forecast" not in offered[0]
+    assert "weather__get_forecast" in offered[1]
+    assert servers.calls == ["weather__get_forecast"]
+    stats = client.tool_index.stats()
+    assert stats["searches"] == 1 and stats["misses"] == 1
+    assert stats["tokens_saved"] > stats["tokens_sent"] > 0
+    metrics = client.telemetry.metrics_text()
+    assert 'mcp_tool_subset_misses_total{provider="test",model="fake"} 1' in metrics
+    await client.cleanup()
+
+
+def test_search_adds_tools_to_the_next_call():
+    asyncio.run(run_query_with_search())